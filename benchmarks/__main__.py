@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+
+import peewee
+
+from benchmarks.datasets import SHAPES, build_dataset, format_size, parse_size
+from benchmarks.suite import BENCHMARKS, run_benchmarks
+from datamanager_app.db.profiles import DEFAULT_PROFILE, PROFILES
+
+REPORT_SCHEMA = 1
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "peewee": peewee.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def _print_progress(shape, done, total):
+    print(f"\r  gerando {shape}: {done}/{total}", end="", file=sys.stderr, flush=True)
+    if done == total:
+        print(file=sys.stderr)
+
+
+def _describe(result):
+    if "skipped" in result:
+        return f"{result['id']:<40} pulado: {result['skipped']}"
+    line = f"{result['id']:<40} {result['seconds'] * 1000:10.2f} ms"
+    if "rate" in result:
+        line += f"  {result['rate']:14,.0f} {result['unit']}"
+    return line
+
+
+def cmd_run(args):
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    shapes = args.shapes.split(",")
+    only = args.only.split(",") if args.only else None
+    for shape in shapes:
+        if shape not in SHAPES:
+            raise SystemExit(f"Formato desconhecido: {shape}")
+    for name in only or []:
+        if name not in BENCHMARKS:
+            raise SystemExit(f"Benchmark desconhecido: {name}")
+    if args.repeat < 1:
+        raise SystemExit("--repeat deve ser pelo menos 1")
+
+    started = time.time()
+    results = []
+    for shape in shapes:
+        for rows in sizes:
+            path = build_dataset(
+                args.data_dir,
+                shape,
+                rows,
+                seed=args.seed,
+                blob_bytes=args.blob_bytes,
+                progress=_print_progress,
+            )
+            print(f"{shape} / {format_size(rows)} linhas ({os.path.getsize(path) / 1e6:.1f} MB)")
+            for result in run_benchmarks(path, shape, rows, args, only=only):
+                print("  " + _describe(result))
+                results.append(result)
+
+    report = {
+        "schema": REPORT_SCHEMA,
+        "label": args.label,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(started)),
+        "duration_seconds": time.time() - started,
+        "environment": _environment(),
+        "config": {
+            "sizes": sizes,
+            "shapes": shapes,
+            "benchmarks": only or list(BENCHMARKS),
+            "repeat": args.repeat,
+            "ops": args.ops,
+            "seed": args.seed,
+            "blob_bytes": args.blob_bytes,
+            "profile": args.profile,
+            "select_all_max": args.select_all_max,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Relatorio salvo em {args.output}")
+    return 0
+
+
+def cmd_compare(args):
+    # Lower time is better; anything slower than the threshold is a regression.
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = {item["id"]: item for item in json.load(fh)["results"]}
+    with open(args.current, encoding="utf-8") as fh:
+        current = json.load(fh)["results"]
+    regressions = 0
+    for item in current:
+        before = baseline.get(item["id"])
+        if not before or not before.get("seconds") or not item.get("seconds"):
+            continue
+        change = item["seconds"] / before["seconds"] - 1
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSAO"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  melhora"
+        print(
+            f"{item['id']:<40} {before['seconds'] * 1000:10.2f} ms -> "
+            f"{item['seconds'] * 1000:10.2f} ms  {change:+7.1%}{flag}"
+        )
+    print(f"{regressions} regressao(oes) acima de {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmarks do caminho de dados e da renderizacao do DataManager.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="gera os bancos sinteticos e mede")
+    run.add_argument("--sizes", default="10k,100k", help="ex.: 10k,100k,1m,10m")
+    run.add_argument("--shapes", default=",".join(SHAPES), help="narrow, wide e/ou blob")
+    run.add_argument("--only", default=None, help=f"subconjunto de: {', '.join(BENCHMARKS)}")
+    run.add_argument("--repeat", type=int, default=3, help="repeticoes por medida (usa a mediana)")
+    run.add_argument("--ops", type=int, default=500, help="operacoes por rodada de CRUD")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--blob-bytes", type=int, default=1024, help="tamanho do BLOB/TEXT no formato blob")
+    run.add_argument("--profile", default=DEFAULT_PROFILE, choices=sorted(PROFILES))
+    run.add_argument(
+        "--select-all-max",
+        type=parse_size,
+        default=1000000,
+        help="select_all carrega tudo na memoria; tabelas maiores sao puladas",
+    )
+    run.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    run.add_argument("--label", default=None, help="nome da versao medida")
+    run.add_argument("-o", "--output", default="benchmark-report.json")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="compara dois relatorios")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10, help="variacao tolerada (0.10 = 10%%)")
+    compare.set_defaults(func=cmd_compare)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
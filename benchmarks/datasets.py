@@ -0,0 +1,126 @@
+import os
+import random
+import sqlite3
+
+# Synthetic tables. Every shape has an INTEGER PRIMARY KEY so rows can be
+# addressed by rowid, like most tables students create in the app.
+SHAPES = ("narrow", "wide", "blob")
+WIDE_COLUMNS = 40
+INSERT_BATCH = 10000
+
+
+def parse_size(text):
+    # "10k" -> 10000, "1m" -> 1000000, "2500" -> 2500
+    text = text.strip().lower()
+    factor = 1
+    if text.endswith("k"):
+        factor, text = 1000, text[:-1]
+    elif text.endswith("m"):
+        factor, text = 1000000, text[:-1]
+    return int(float(text) * factor)
+
+
+def format_size(rows):
+    if rows >= 1000000 and rows % 1000000 == 0:
+        return f"{rows // 1000000}m"
+    if rows >= 1000 and rows % 1000 == 0:
+        return f"{rows // 1000}k"
+    return str(rows)
+
+
+def wide_columns():
+    kinds = ("TEXT", "INTEGER", "REAL")
+    return [(f"c{index:02d}", kinds[index % len(kinds)]) for index in range(1, WIDE_COLUMNS + 1)]
+
+
+def table_ddl(shape):
+    if shape == "narrow":
+        columns = [("name", "TEXT"), ("value", "REAL"), ("qty", "INTEGER"), ("created", "TEXT")]
+    elif shape == "wide":
+        columns = wide_columns()
+    elif shape == "blob":
+        columns = [("name", "TEXT"), ("body", "TEXT"), ("payload", "BLOB")]
+    else:
+        raise ValueError(f"Formato desconhecido: {shape}")
+    cols_sql = ", ".join(f"{name} {kind}" for name, kind in columns)
+    return f"CREATE TABLE bench (id INTEGER PRIMARY KEY, {cols_sql})", [name for name, _kind in columns]
+
+
+def row_factory(shape, seed, blob_bytes):
+    rng = random.Random(seed)
+    words = [f"w{index:04d}" for index in range(2000)]
+    text_words = max(blob_bytes // 12, 1)
+
+    if shape == "narrow":
+
+        def make(index):
+            return (
+                f"{rng.choice(words)} {rng.choice(words)}",
+                round(rng.uniform(0, 10000), 2),
+                rng.randint(0, 1000),
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            )
+
+    elif shape == "wide":
+        kinds = [kind for _name, kind in wide_columns()]
+
+        def make(index):
+            values = []
+            for kind in kinds:
+                if kind == "TEXT":
+                    values.append(rng.choice(words))
+                elif kind == "INTEGER":
+                    values.append(rng.randint(0, 100000))
+                else:
+                    values.append(rng.random() * 1000)
+            return tuple(values)
+
+    else:
+
+        def make(index):
+            return (
+                f"doc {index}",
+                " ".join(rng.choice(words) for _ in range(text_words)),
+                rng.randbytes(blob_bytes),
+            )
+
+    return make
+
+
+def dataset_path(directory, shape, rows, seed, blob_bytes):
+    suffix = f"-{blob_bytes}b" if shape == "blob" else ""
+    return os.path.join(directory, f"bench-{shape}-{format_size(rows)}-s{seed}{suffix}.db")
+
+
+def build_dataset(directory, shape, rows, seed=42, blob_bytes=1024, progress=None):
+    # Generated once per (shape, rows, seed) and reused by later runs; the
+    # same seed always produces the same file contents.
+    os.makedirs(directory, exist_ok=True)
+    path = dataset_path(directory, shape, rows, seed, blob_bytes)
+    if os.path.exists(path):
+        return path
+    partial = path + ".partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    ddl, columns = table_ddl(shape)
+    make = row_factory(shape, seed, blob_bytes)
+    sql = f"INSERT INTO bench ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    conn = sqlite3.connect(partial, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(ddl)
+        conn.execute("BEGIN")
+        done = 0
+        while done < rows:
+            count = min(INSERT_BATCH, rows - done)
+            conn.executemany(sql, (make(index) for index in range(done, done + count)))
+            done += count
+            if progress:
+                progress(shape, done, rows)
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(partial, path)
+    return path
@@ -0,0 +1,288 @@
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+from datamanager_app.db.manager import DatabaseManager
+from datamanager_app.db.timing import tracer
+
+
+def _median(samples):
+    return statistics.median(samples) if samples else None
+
+
+def _result(benchmark, shape, rows, samples, count=None, unit="rows/s", **extra):
+    seconds = _median(samples)
+    result = {
+        "id": f"{benchmark}/{shape}/{rows}",
+        "benchmark": benchmark,
+        "shape": shape,
+        "rows": rows,
+        "seconds": seconds,
+        "samples": samples,
+    }
+    if count is not None and seconds:
+        result["count"] = count
+        result["rate"] = count / seconds
+        result["unit"] = unit
+    result.update(extra)
+    return result
+
+
+def _skipped(benchmark, shape, rows, reason):
+    return {
+        "id": f"{benchmark}/{shape}/{rows}",
+        "benchmark": benchmark,
+        "shape": shape,
+        "rows": rows,
+        "skipped": reason,
+    }
+
+
+def _open(path, profile):
+    manager = DatabaseManager()
+    manager.connect_sqlite(path, profile=profile)
+    return manager
+
+
+def _close(manager):
+    manager.current.database.close()
+
+
+def bench_select_all(path, shape, rows, repeat, profile, max_rows):
+    if rows > max_rows:
+        return _skipped("select_all", shape, rows, f"acima de --select-all-max ({max_rows} linhas)")
+    manager = _open(path, profile)
+    samples = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _columns, fetched = manager.select_all("bench")
+            samples.append(time.perf_counter() - started)
+            del fetched
+    finally:
+        _close(manager)
+    return _result("select_all", shape, rows, samples, count=rows)
+
+
+def bench_pages(path, shape, rows, repeat, profile):
+    # First page and a page seeked to the middle of the table; with keyset
+    # pagination both should cost the same regardless of table size. Each
+    # page is measured read from the file (the page cache is emptied before
+    # every sample) and, as `*_cached`, served again from the cache.
+    manager = _open(path, profile)
+    results = []
+    try:
+        for name, after in (("page_first", None), ("page_middle", (rows // 2,))):
+            read_page = lambda: sum(len(chunk) for _cols, _pos, chunk in manager.iter_page("bench", after=after))
+            for suffix, cached in (("", False), ("_cached", True)):
+                samples = []
+                fetched = read_page() if cached else 0
+                for _ in range(repeat):
+                    if not cached:
+                        manager.pages.clear()
+                    started = time.perf_counter()
+                    fetched = read_page()
+                    samples.append(time.perf_counter() - started)
+                results.append(_result(name + suffix, shape, rows, samples, count=fetched))
+    finally:
+        _close(manager)
+    return results
+
+
+def bench_crud(path, shape, rows, repeat, profile, ops):
+    # Autocommit inserts, updates and deletes on the dataset itself (the rows
+    # added are removed again), then the same cycle inside one transaction
+    # that is rolled back, so the file is left as it was generated.
+    manager = _open(path, profile)
+    columns = [col.name for col in manager.get_columns("bench") if col.name != "id"]
+    sample_row = manager.current.database.execute_sql("SELECT * FROM bench LIMIT 1").fetchone()
+    template = dict(zip(columns, sample_row[1:]))
+    first_column = columns[0]
+    results = []
+
+    def cycle():
+        timings = {}
+        started = time.perf_counter()
+        new_ids = [manager.insert("bench", template) for _ in range(ops)]
+        timings["insert"] = time.perf_counter() - started
+        started = time.perf_counter()
+        # A fresh value per row: SQLite skips the write when nothing changed.
+        for index, row_id in enumerate(new_ids):
+            manager.update("bench", "id", row_id, {first_column: index})
+        timings["update"] = time.perf_counter() - started
+        started = time.perf_counter()
+        for row_id in new_ids:
+            manager.delete("bench", "id", row_id)
+        timings["delete"] = time.perf_counter() - started
+        return timings
+
+    try:
+        for mode in ("autocommit", "transaction"):
+            samples = {"insert": [], "update": [], "delete": []}
+            for _ in range(repeat):
+                if mode == "transaction":
+                    manager.begin()
+                    try:
+                        timings = cycle()
+                    finally:
+                        manager.rollback()
+                else:
+                    timings = cycle()
+                for op, seconds in timings.items():
+                    samples[op].append(seconds)
+            for op, op_samples in samples.items():
+                results.append(
+                    _result(f"{op}_{mode}", shape, rows, op_samples, count=ops, unit="ops/s", profile=profile)
+                )
+    finally:
+        _close(manager)
+    return results
+
+
+def bench_introspection(path, shape, rows, repeat, profile, iterations=50):
+    # "cold" drops the schema cache before every lookup; "warm" is served by it.
+    manager = _open(path, profile)
+    results = []
+
+    def lookup():
+        manager.get_tables()
+        manager.get_columns("bench")
+        manager.get_primary_keys("bench")
+        manager.get_indexes("bench")
+        manager.get_foreign_keys("bench")
+
+    try:
+        for mode in ("cold", "warm"):
+            samples = []
+            for _ in range(repeat):
+                lookup()
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    if mode == "cold":
+                        manager.current.schema.invalidate()
+                    lookup()
+                samples.append((time.perf_counter() - started) / iterations)
+            results.append(_result(f"introspection_{mode}", shape, rows, samples))
+    finally:
+        _close(manager)
+    return results
+
+
+@contextmanager
+def headless_display():
+    # Uses the current $DISPLAY, or starts a private Xvfb server for the run.
+    if os.environ.get("DISPLAY"):
+        yield os.environ["DISPLAY"]
+        return
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        yield None
+        return
+    display = f":{os.getpid() % 500 + 100}"
+    server = subprocess.Popen(
+        [xvfb, display, "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    os.environ["DISPLAY"] = display
+    try:
+        time.sleep(0.5)
+        yield display if server.poll() is None else None
+    finally:
+        del os.environ["DISPLAY"]
+        server.terminate()
+        server.wait()
+
+
+def _pump_until(root, done, timeout):
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("A interface nao terminou a tempo")
+        root.update()
+        time.sleep(0.001)
+
+
+def bench_load_table(path, shape, rows, repeat, profile, timeout=600):
+    # DBBrowser.load_table from the click to the last rendered row, in a real
+    # Tk window; the tracer splits the time into query, fetch and render.
+    try:
+        import tkinter as tk
+    except ImportError:
+        return _skipped("load_table", shape, rows, "tkinter indisponivel")
+    from datamanager_app.db.manager import db_manager
+    from datamanager_app.ui.browser import DBBrowser
+
+    with headless_display() as display:
+        if display is None:
+            return _skipped("load_table", shape, rows, "sem $DISPLAY e Xvfb nao encontrado")
+        settings_dir = tempfile.mkdtemp(prefix="datamanager-bench-")
+        previous_appdata = os.environ.get("APPDATA")
+        os.environ["APPDATA"] = settings_dir
+        root = tk.Tk()
+        spans = []
+        listener = lambda span: span.name == "load_table" and spans.append(span)
+        tracer.listeners.append(listener)
+        try:
+            app = DBBrowser(root)
+            root.update()
+            db_manager.connect_sqlite(path, profile=profile)
+            app.current_table = None
+            app.table_grid.reset()
+            _pump_until(root, lambda: not app.tasks.busy, timeout)
+            samples = []
+            for _ in range(repeat):
+                # Every sample reads the table again instead of reusing the
+                # pages cached by the previous one.
+                db_manager.pages.clear()
+                app.table_grid.reset()
+                started = time.perf_counter()
+                app.current_table = "bench"
+                app.load_table()
+                _pump_until(root, lambda: not app.tasks.busy and spans, timeout)
+                root.update_idletasks()
+                samples.append(time.perf_counter() - started)
+                last = spans.pop()
+            breakdown = {f"{phase}_seconds": seconds for phase, seconds in last.phases.items()}
+            return _result(
+                "load_table",
+                shape,
+                rows,
+                samples,
+                count=len(app.tree.get_children()),
+                **breakdown,
+            )
+        finally:
+            tracer.listeners.remove(listener)
+            db_manager.current.database.close()
+            root.destroy()
+            if previous_appdata is None:
+                os.environ.pop("APPDATA", None)
+            else:
+                os.environ["APPDATA"] = previous_appdata
+            shutil.rmtree(settings_dir, ignore_errors=True)
+
+
+BENCHMARKS = ("select_all", "pages", "crud", "introspection", "load_table")
+
+
+def run_benchmarks(path, shape, rows, options, only=None):
+    only = only or BENCHMARKS
+    results = []
+    if "select_all" in only:
+        results.append(
+            bench_select_all(path, shape, rows, options.repeat, options.profile, options.select_all_max)
+        )
+    if "pages" in only:
+        results.extend(bench_pages(path, shape, rows, options.repeat, options.profile))
+    if "crud" in only:
+        results.extend(bench_crud(path, shape, rows, options.repeat, options.profile, options.ops))
+    if "introspection" in only:
+        results.extend(bench_introspection(path, shape, rows, options.repeat, options.profile))
+    if "load_table" in only:
+        results.append(bench_load_table(path, shape, rows, options.repeat, options.profile))
+    return results
@@ -1,5 +1,19 @@
-﻿from datamanager_app.app import main
+﻿import sys
+
+from datamanager_app.cli import COMMANDS
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Command-line jobs never load tkinter or the UI; only the window does.
+    if argv and argv[0] in COMMANDS:
+        from datamanager_app.cli import main as cli_main
+
+        return cli_main(argv)
+    from datamanager_app.app import main as app_main
+
+    return app_main(argv)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,12 +1,34 @@
-﻿import tkinter as tk
+﻿import sys
+import time
 
-from datamanager_app.ui.browser import DBBrowser
+_STARTED = time.perf_counter()
 
+from datamanager_app.startup import StartupProfiler  # noqa: E402
 
-def main():
-    root = tk.Tk()
-    app = DBBrowser(root)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    profiler = StartupProfiler(started=_STARTED)
+
+    # tkinter and the UI are imported here rather than at module level so
+    # their cost shows up as separate phases of the startup profile.
+    with profiler.phase("import tkinter"):
+        import tkinter as tk
+    with profiler.phase("import ui"):
+        from datamanager_app.ui.browser import DBBrowser
+    with profiler.phase("create root"):
+        root = tk.Tk()
+    if "--profile-startup" in argv:
+        profiler.on_settled = lambda settled: _finish_profile(settled, root)
+    app = DBBrowser(root, profiler=profiler)
     root.mainloop()
+    # Writes any settings change still waiting for its debounce timer.
+    app.settings.flush()
+
+
+def _finish_profile(profiler, root):
+    print(profiler.report(), flush=True)
+    root.after(0, root.destroy)
 
 
 if __name__ == "__main__":
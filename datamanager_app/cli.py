@@ -0,0 +1,226 @@
+import json
+import os
+import sys
+
+# Commands that run without a window; datamanager.py checks the first
+# argument against these before deciding whether to import the UI at all.
+COMMANDS = ("import", "export", "query", "vacuum", "stats")
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_INTERRUPTED = 130
+
+
+def _progress(progress, quiet):
+    # Progress goes to stderr so stdout stays clean for data and summaries.
+    if quiet or not sys.stderr.isatty():
+        return
+    line = f"\r  {progress.get('rows', 0)} linhas | {progress['rate']:.0f} linhas/s | {progress['seconds']:.1f} s"
+    if progress.get("total_bytes"):
+        line += f" | {progress['bytes'] / progress['total_bytes']:.0%}"
+    print(line, end="", file=sys.stderr, flush=True)
+
+
+def _end_progress(quiet):
+    if not quiet and sys.stderr.isatty():
+        print(file=sys.stderr)
+
+
+def _drain(generator, quiet):
+    # Runs a progress-yielding job to the end and returns its last progress
+    # dict. Closing it on the way out (Ctrl+C, errors) rolls back imports and
+    # removes partial exports, as cancelling the job does in the app.
+    result = None
+    try:
+        for result in generator:
+            _progress(result, quiet)
+    finally:
+        generator.close()
+        _end_progress(quiet)
+    return result
+
+
+def _open(args, create=False):
+    from datamanager_app.db.manager import db_manager
+
+    if not create and not os.path.exists(args.database):
+        raise FileNotFoundError(f"Arquivo nao encontrado: {args.database}")
+    read_only = getattr(args, "read_only", False)
+    db_manager.connect_sqlite(args.database, profile=args.profile, read_only=read_only)
+    return db_manager
+
+
+def cmd_import(args):
+    from datamanager_app.db.importer import iter_import_csv
+
+    manager = _open(args, create=True)
+    result = _drain(
+        iter_import_csv(
+            manager,
+            args.csv,
+            args.table,
+            batch_size=args.batch_size,
+            create_table=args.create,
+            has_header=not args.no_header,
+            delimiter=args.delimiter,
+            encoding=args.encoding,
+        ),
+        args.quiet,
+    )
+    rows = result["rows"] if result else 0
+    print(f"{rows} linhas importadas em {args.table}")
+    return EXIT_OK
+
+
+def cmd_export(args):
+    from datamanager_app.db.exporter import iter_export
+
+    manager = _open(args)
+    result = _drain(
+        iter_export(
+            manager,
+            args.output,
+            table=args.table,
+            query=args.query,
+            fmt=args.format,
+            compress=args.gzip,
+        ),
+        args.quiet,
+    )
+    rows = result["rows"] if result else 0
+    print(f"{rows} linhas exportadas para {args.output}")
+    return EXIT_OK
+
+
+def cmd_query(args):
+    # Rows are written chunk by chunk as the cursor yields them.
+    from datamanager_app.db.exporter import row_writer
+
+    manager = _open(args)
+    params = json.loads(args.params) if args.params else None
+    # The csv module writes its own line endings.
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(newline="")
+    stream = manager.iter_query(args.sql, params)
+    write = None
+    try:
+        while True:
+            try:
+                columns, rows = next(stream)
+            except StopIteration as stop:
+                result = stop.value
+                break
+            if write is None:
+                write = row_writer(sys.stdout, args.format, columns, header=not args.no_header)
+            write(rows)
+    finally:
+        stream.close()
+    sys.stdout.flush()
+    if result["rowcount"] >= 0 and not args.quiet:
+        print(f"{result['rowcount']} linha(s) afetada(s)", file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_vacuum(args):
+    manager = _open(args)
+    before = os.path.getsize(args.database)
+    manager.vacuum(into=args.into)
+    if args.analyze and not args.into:
+        manager.analyze()
+    target = args.into or args.database
+    print(f"{args.database} ({before} bytes) -> {target} ({os.path.getsize(target)} bytes)")
+    return EXIT_OK
+
+
+def cmd_stats(args):
+    manager = _open(args)
+    stats = manager.get_table_stats()
+    sizes = manager.get_table_sizes() or {}
+    for table, info in stats.items():
+        if args.exact or info["rows"] is None:
+            info = {"rows": manager.count_rows(table), "exact": True}
+        if args.json:
+            line = json.dumps({"table": table, "rows": info["rows"], "exact": info["exact"], "bytes": sizes.get(table)})
+        else:
+            rows = f"{'' if info['exact'] else '~'}{info['rows']}"
+            size = sizes.get(table)
+            line = f"{table}\t{rows}\t{'' if size is None else size}"
+        print(line, flush=True)
+    return EXIT_OK
+
+
+def build_parser():
+    import argparse
+
+    from datamanager_app.db.profiles import DEFAULT_PROFILE, PROFILES
+
+    parser = argparse.ArgumentParser(
+        prog="datamanager",
+        description="Operacoes do DataManager sem interface grafica.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, func, help_text, read_only=True):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("database", help="arquivo .db")
+        command.add_argument("--profile", default=DEFAULT_PROFILE, choices=sorted(PROFILES))
+        if read_only:
+            command.add_argument("--read-only", action="store_true", help="abre com mode=ro")
+        command.add_argument("-q", "--quiet", action="store_true", help="sem progresso no stderr")
+        command.set_defaults(func=func)
+        return command
+
+    imp = add_command("import", cmd_import, "importa um CSV para uma tabela", read_only=False)
+    imp.add_argument("csv")
+    imp.add_argument("--table", required=True)
+    imp.add_argument("--create", action="store_true", help="cria a tabela se nao existir")
+    imp.add_argument("--no-header", action="store_true", help="o CSV nao tem cabecalho")
+    imp.add_argument("--delimiter", default=",")
+    imp.add_argument("--encoding", default="utf-8-sig")
+    imp.add_argument("--batch-size", type=int, default=5000)
+
+    exp = add_command("export", cmd_export, "exporta uma tabela ou consulta para CSV / JSON Lines")
+    exp.add_argument("output")
+    source = exp.add_mutually_exclusive_group(required=True)
+    source.add_argument("--table")
+    source.add_argument("--query")
+    exp.add_argument("--format", default="csv", choices=("csv", "jsonl"))
+    exp.add_argument("--gzip", action="store_true")
+
+    query = add_command("query", cmd_query, "executa um comando SQL e escreve as linhas no stdout")
+    query.add_argument("sql")
+    query.add_argument("--params", default=None, help='parametros em JSON, ex.: \'[1, "a"]\'')
+    query.add_argument("--format", default="csv", choices=("csv", "tsv", "jsonl"))
+    query.add_argument("--no-header", action="store_true")
+
+    vacuum = add_command("vacuum", cmd_vacuum, "compacta o arquivo (VACUUM)")
+    vacuum.add_argument("--into", default=None, help="grava uma copia compactada (VACUUM INTO)")
+    vacuum.add_argument("--analyze", action="store_true", help="atualiza as estatisticas (ANALYZE)")
+
+    stats = add_command("stats", cmd_stats, "linhas e tamanho por tabela")
+    stats.add_argument("--exact", action="store_true", help="conta com COUNT(*) em vez de estimar")
+    stats.add_argument("--json", action="store_true", help="uma linha JSON por tabela")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        print("interrompido", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return EXIT_ERROR
+    except Exception as exc:
+        # Missing files, bad arguments and sqlite3 / peewee errors (syntax,
+        # constraint, locked database) alike: one line on stderr.
+        print(f"erro: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import re
+import threading
+
+from datamanager_app.db.importer import column_affinity
+
+# Operators an index can seek on. LIKE patterns ("contains", "starts") are
+# left out: SQLite only uses an index for them with case_sensitive_like.
+EQUALITY_OPERATORS = ("=", "is_null")
+RANGE_OPERATORS = ("<", "<=", ">", ">=")
+
+
+def index_name(table, columns):
+    # Column names may hold spaces or punctuation ("e-mail"); the generated
+    # name keeps only word characters.
+    return re.sub(r"\W", "_", f"ix_{table}_{'_'.join(columns)}")
+
+
+class IndexAdvisor:
+    # Remembers the WHERE / ORDER BY shapes the grid actually runs, keyed by
+    # (table, equality columns, range column, sort column), together with the
+    # last statement of that shape so it can be checked with EXPLAIN QUERY PLAN.
+    MAX_PATTERNS = 64
+    # A covering index copies the selected columns; past this many extra
+    # columns, or when one of them is TEXT or BLOB (long values would be
+    # duplicated into the index), only the seek columns are proposed.
+    MAX_COVERING_EXTRA = 4
+    UNCOVERABLE_AFFINITIES = ("TEXT", "BLOB")
+
+    def __init__(self):
+        self._patterns = {}
+        self._lock = threading.Lock()
+
+    def record(self, table, filters, sort_col, sql, params):
+        equality = sorted({col for col, op, _value in filters or [] if op in EQUALITY_OPERATORS})
+        ranges = sorted({col for col, op, _value in filters or [] if op in RANGE_OPERATORS})
+        if not equality and not ranges and not sort_col:
+            return
+        pattern = (table, tuple(equality), ranges[0] if ranges else None, sort_col)
+        with self._lock:
+            entry = self._patterns.get(pattern)
+            if entry is None:
+                if len(self._patterns) >= self.MAX_PATTERNS:
+                    rarest = min(self._patterns, key=lambda item: self._patterns[item]["count"])
+                    del self._patterns[rarest]
+                entry = self._patterns[pattern] = {"count": 0}
+            entry["count"] += 1
+            entry["sql"] = sql
+            entry["params"] = list(params)
+
+    def patterns(self):
+        with self._lock:
+            items = [(pattern, dict(entry)) for pattern, entry in self._patterns.items()]
+        return sorted(items, key=lambda item: item[1]["count"], reverse=True)
+
+    def forget(self, table=None):
+        with self._lock:
+            if table is None:
+                self._patterns.clear()
+                return
+            for pattern in [p for p in self._patterns if p[0] == table]:
+                del self._patterns[pattern]
+
+    def propose(self, pattern, table_columns):
+        # Equality columns first, then at most one range or sort column, which
+        # is the order in which a B-tree can satisfy both the seek and ORDER BY.
+        # table_columns are the (name, declared type) pairs the grid selects.
+        _table, equality, range_col, sort_col = pattern
+        columns = list(equality)
+        for col in (range_col, sort_col):
+            if col and col not in columns and col != "rowid":
+                columns.append(col)
+                break
+        if not columns:
+            return None, False
+        extra = [(col, data_type) for col, data_type in table_columns if col not in columns]
+        covering = len(extra) <= self.MAX_COVERING_EXTRA and not any(
+            column_affinity(data_type) in self.UNCOVERABLE_AFFINITIES for _col, data_type in extra
+        )
+        if covering:
+            columns.extend(col for col, _data_type in extra)
+        return columns, covering
+
+
+def needs_index(steps, table, filtered):
+    # A full scan of the table, a filtered walk of a whole index, or a temp
+    # B-tree built only to sort the rows. The plan names a table the way the
+    # statement did: "SCAN t", or "SCAN a.t" for one in an attached file.
+    bare = table.partition(".")[2] or table
+    for step in steps:
+        detail = step["detail"]
+        if step["kind"] == "scan" and detail.split(" ")[1:2] in ([table], [bare]):
+            if "USING" not in detail or filtered:
+                return True
+        if "TEMP B-TREE FOR" in detail and "ORDER BY" in detail:
+            return True
+    return False
@@ -0,0 +1,267 @@
+import asyncio
+import inspect
+import threading
+
+from datamanager_app.db.manager import DatabaseManager
+from datamanager_app.db.worker import QueryWorker
+
+# Methods that write, or keep a transaction open from one call to the next,
+# all run on the first worker: our own connections never compete for the
+# write lock, and begin/insert/commit share one connection.
+WRITER_METHODS = frozenset(
+    {
+        "analyze",
+        "apply_batch",
+        "begin",
+        "commit",
+        "copy_table",
+        "create_fts_index",
+        "create_index",
+        "create_table",
+        "delete",
+        "drop_fts_index",
+        "drop_index",
+        "drop_table",
+        "insert",
+        "replace_value",
+        "rollback",
+        "update",
+        "vacuum",
+    }
+)
+
+# Generators known not to write. Any other stream (the CSV import, or
+# iter_query, which may run DML) goes to the writer unless told otherwise.
+READ_ONLY_STREAMS = frozenset({"iter_export", "iter_page", "iter_search", "iter_value"})
+
+
+class _LoopEvents:
+    # Stands in for the events queue of a QueryWorker: instead of being
+    # polled by Tk, each (job, kind, payload) is handed to the event loop.
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def put(self, event):
+        job, kind, payload = event
+        callback = {"chunk": job.on_chunk, "done": job.on_done, "error": job.on_error}[kind]
+        if callback is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(callback, payload)
+        except RuntimeError:
+            # The loop was closed while the job was still running.
+            pass
+
+
+class _Worker:
+    # One QueryWorker thread and, through peewee's per-thread state, one
+    # SQLite connection of its own.
+
+    def __init__(self, events):
+        self.queue = QueryWorker(events)
+        self.load = 0
+        self.connection = None
+
+
+def _paced(generator, credits):
+    # Lets a streaming job run at most `credits` chunks ahead of its reader,
+    # so a slow consumer holds back the cursor instead of filling memory.
+    try:
+        while True:
+            credits.acquire()
+            try:
+                chunk = next(generator)
+            except StopIteration as stop:
+                return stop.value
+            yield chunk
+    finally:
+        generator.close()
+
+
+class AsyncDatabaseManager:
+    # asyncio facade over a DatabaseManager of its own (not the app's
+    # db_manager). Calls run on a fixed pool of worker threads, each with a
+    # dedicated connection; at most `max_pending` jobs are queued or running
+    # at once. Methods of the manager are available as coroutines, and its
+    # generator methods (iter_page, iter_query, iter_value...) as async
+    # iterators:
+    #
+    #     async with AsyncDatabaseManager("dados.db") as adb:
+    #         rows = await adb.select_row("clientes", ["id"], (1,))
+    #         async for columns, chunk in adb.iter_query("SELECT * FROM clientes"):
+    #             ...
+    #
+    # Cancelling the awaiting task (or leaving an async for early) cancels
+    # the job: a statement still running is interrupted, and a stream is
+    # closed, which rolls back imports and value replacements.
+    WORKERS = 4
+    PENDING_PER_WORKER = 4
+    STREAM_BUFFER = 8
+
+    def __init__(
+        self,
+        path,
+        workers=None,
+        max_pending=None,
+        profile=None,
+        read_only=False,
+        immutable=False,
+        manager=None,
+    ):
+        self.manager = manager or DatabaseManager()
+        self.manager.connect_sqlite(path, profile=profile, read_only=read_only, immutable=immutable)
+        self.workers = workers or self.WORKERS
+        self.max_pending = max_pending or self.workers * self.PENDING_PER_WORKER
+        self._loop = None
+        self._pool = []
+        self._slots = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __getattr__(self, name):
+        # Only reached for names AsyncDatabaseManager does not define itself.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(self.manager, name)
+        if not callable(method):
+            return method
+        if inspect.isgeneratorfunction(method):
+            return lambda *args, **kwargs: self.stream(method, *args, **kwargs)
+        writer = name in WRITER_METHODS
+        return lambda *args, **kwargs: self.call(method, *args, writer=writer, **kwargs)
+
+    def _ensure_pool(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+            events = _LoopEvents(loop)
+            self._pool = [_Worker(events) for _ in range(self.workers)]
+            self._slots = asyncio.Semaphore(self.max_pending)
+        elif self._loop is not loop:
+            raise RuntimeError("AsyncDatabaseManager usado em outro event loop")
+
+    def _run_on(self, worker, fn, args, kwargs, credits):
+        # Runs on the worker thread; remembers its connection so a running
+        # statement can be interrupted from the event loop.
+        worker.connection = self.manager.current.database.connection()
+        result = fn(*args, **kwargs)
+        if credits is not None and inspect.isgenerator(result):
+            return _paced(result, credits)
+        return result
+
+    async def _start(self, fn, args, kwargs, writer=False, worker=None, on_chunk=None, credits=None):
+        self._ensure_pool()
+        await self._slots.acquire()
+        if worker is None:
+            worker = self._pool[0] if writer else min(self._pool, key=lambda item: item.load)
+        done = self._loop.create_future()
+
+        # The slot is given back when the worker is really done with the
+        # job, which for a cancelled one may be a little later.
+        def on_done(result):
+            worker.load -= 1
+            self._slots.release()
+            if not done.done():
+                done.set_result(result)
+
+        def on_error(exc):
+            worker.load -= 1
+            self._slots.release()
+            if not done.done():
+                done.set_exception(exc)
+
+        worker.load += 1
+        job = worker.queue.submit(
+            self._run_on,
+            worker,
+            fn,
+            args,
+            kwargs,
+            credits,
+            on_chunk=on_chunk,
+            on_done=on_done,
+            on_error=on_error,
+            detached=True,
+        )
+        return worker, job, done
+
+    def _cancel(self, worker, job, done):
+        job.cancel()
+        done.cancel()
+        if job.started_at is not None and job.finished_at is None and worker.connection is not None:
+            worker.connection.interrupt()
+
+    async def call(self, fn, *args, writer=False, **kwargs):
+        # Runs fn(*args, **kwargs) on a worker and returns its result.
+        worker, job, done = await self._start(fn, args, kwargs, writer=writer)
+        try:
+            return await done
+        except asyncio.CancelledError:
+            self._cancel(worker, job, done)
+            raise
+
+    async def stream(self, fn, *args, writer=None, **kwargs):
+        # Async iterator over the chunks of a generator function run on a
+        # worker, e.g. stream(iter_export, adb.manager, "saida.csv", table="t").
+        if writer is None:
+            writer = getattr(fn, "__name__", None) not in READ_ONLY_STREAMS
+        chunks = asyncio.Queue()
+        credits = threading.Semaphore(self.STREAM_BUFFER)
+        finished = object()
+        worker, job, done = await self._start(
+            fn, args, kwargs, writer=writer, on_chunk=chunks.put_nowait, credits=credits
+        )
+        # Chunks and the end of the job reach the loop in the order they
+        # were sent, so the marker always comes after the last chunk.
+        done.add_done_callback(lambda _future: chunks.put_nowait(finished))
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is finished:
+                    break
+                credits.release()
+                yield chunk
+            done.result()
+        finally:
+            if not done.done():
+                self._cancel(worker, job, done)
+                # Wakes a job waiting for credits so it sees the cancellation.
+                credits.release()
+
+    async def _broadcast(self, fn, *args, skip=None):
+        for worker in self._pool:
+            if worker is not skip:
+                _worker, _job, done = await self._start(fn, args, {}, worker=worker)
+                await done
+
+    async def attach_database(self, path, alias=None):
+        # peewee attaches the file to every connection it opens from now on;
+        # the other workers reconnect to pick it up.
+        alias = await self.call(self.manager.attach_database, path, alias, writer=True)
+        await self._broadcast(self.manager.current.database.close, skip=self._pool[0])
+        return alias
+
+    async def detach_database(self, alias):
+        await self.call(self.manager.detach_database, alias, writer=True)
+        await self._broadcast(self.manager.current.database.close, skip=self._pool[0])
+
+    async def set_profile(self, profile):
+        previous = self.manager.current.database
+        conn = await self.call(self.manager.set_profile, profile, writer=True)
+        await self._broadcast(previous.close, skip=self._pool[0])
+        return conn
+
+    async def close(self):
+        # Closes every worker's connection and stops the threads.
+        if self._loop is None:
+            return
+        await self._broadcast(self.manager.current.database.close)
+        for worker in self._pool:
+            worker.queue.stop()
+        self._pool = []
+        self._loop = None
@@ -0,0 +1,58 @@
+import os
+import threading
+
+
+class ChangeTracker:
+    # Tells caches whether the data behind them may have moved. Writes made
+    # through DatabaseManager bump the generation of the table they touched
+    # (or of every table, for statements it cannot attribute, such as the SQL
+    # console or a rollback); commits by other connections show up in
+    # PRAGMA data_version. A token captured before a read stays valid until
+    # any of them changes.
+
+    def __init__(self):
+        # data_version is kept per schema; attached files are checked too.
+        self.schemas = ("main",)
+        self.generation = 0
+        self._everything = 0
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def touch(self, table=None):
+        with self._lock:
+            self.generation += 1
+            if table is None:
+                self._everything = self.generation
+            else:
+                self._tables[table] = self.generation
+
+    def data_version(self, db):
+        # data_version only compares within one connection, and peewee keeps
+        # one per thread, so the connection is part of the value.
+        conn = db.connection()
+        versions = tuple(conn.execute(f'PRAGMA "{schema}".data_version').fetchone()[0] for schema in self.schemas)
+        return id(conn), versions
+
+    def token(self, db, table=None):
+        with self._lock:
+            if table is None:
+                generation = self.generation
+            else:
+                generation = (self._everything, self._tables.get(table, 0))
+        return self.data_version(db), generation
+
+
+def file_signature(paths):
+    # Size and mtime of each database file and of its -wal: cheap to read
+    # without touching SQLite, and they move whenever anyone commits (our
+    # own writes included, which data_version then tells apart).
+    signature = []
+    for path in paths:
+        for name in (path, f"{path}-wal"):
+            try:
+                stat = os.stat(name)
+            except OSError:
+                signature.append(None)
+                continue
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
@@ -0,0 +1,122 @@
+﻿import csv
+import gzip
+import json
+import os
+import time
+
+FORMATS = ("csv", "jsonl")
+
+
+def _plain(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return str(value)
+
+
+def _open_output(path, compress):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _execute_read_only(db, sql, params):
+    # An export only reads: with query_only on, SQLite refuses any statement
+    # that would write (DELETE, INSERT ... RETURNING, ...) before it changes
+    # a row. Statements that write make all their changes when executed, so
+    # the pragma can be restored right after.
+    previous = db.execute_sql("PRAGMA query_only").fetchone()[0]
+    db.execute_sql("PRAGMA query_only = 1")
+    try:
+        return db.execute_sql(sql, params or ())
+    except Exception as exc:
+        if "readonly" in str(exc):
+            raise ValueError("A consulta de exportacao nao pode alterar dados") from exc
+        raise
+    finally:
+        db.execute_sql(f"PRAGMA query_only = {int(previous)}")
+
+
+def row_writer(fh, fmt, columns, header=True):
+    # Returns write(rows) for one output format; the CSV header (if any) is
+    # written right away. "tsv" is CSV with tabs.
+    if fmt == "jsonl":
+
+        def write(rows):
+            fh.writelines(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+                for row in rows
+            )
+
+        return write
+    writer = csv.writer(fh, delimiter="\t" if fmt == "tsv" else ",")
+    if header:
+        writer.writerow(columns)
+
+    def write(rows):
+        writer.writerows([[_plain(value) for value in row] for row in rows])
+
+    return write
+
+
+def iter_export(
+    manager,
+    path,
+    table=None,
+    query=None,
+    params=None,
+    fmt="csv",
+    compress=False,
+    chunk_size=1000,
+):
+    # Writes a table or an arbitrary query to CSV / JSON Lines, reading the
+    # cursor with fetchmany so only one chunk is ever held in memory. Yields a
+    # progress dict per chunk; closing the generator removes the partial file.
+    if not manager.current:
+        raise RuntimeError("Nenhum banco conectado")
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato nao suportado: {fmt}")
+    if not table and not query:
+        raise ValueError("Informe uma tabela ou uma consulta")
+    db = manager.current.database
+    db.connect(reuse_if_open=True)
+    sql = query or f"SELECT * FROM {table}"
+    cursor = _execute_read_only(db, sql, params)
+    if cursor.description is None:
+        raise ValueError("A consulta nao retorna linhas")
+    columns = [desc[0] for desc in cursor.description]
+    started = time.perf_counter()
+    rows_done = 0
+
+    def progress():
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": rows_done,
+            "seconds": elapsed,
+            "rate": rows_done / elapsed if elapsed else 0.0,
+        }
+
+    completed = False
+    try:
+        with _open_output(path, compress) as fh:
+            write = row_writer(fh, fmt, columns)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                write(rows)
+                rows_done += len(rows)
+                yield progress()
+        completed = True
+    finally:
+        cursor.close()
+        if not completed and os.path.exists(path):
+            os.remove(path)
+    result = progress()
+    result["path"] = path
+    return result
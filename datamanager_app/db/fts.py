@@ -0,0 +1,84 @@
+FTS_SUFFIX = "__fts"
+
+
+def fts_table_name(table):
+    return f"{table}{FTS_SUFFIX}"
+
+
+def is_fts_table(name):
+    # The FTS5 virtual table and its shadow tables (_data, _idx, _docsize, _config).
+    return FTS_SUFFIX in name
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _trigger(table, suffix):
+    return _quote(f"{fts_table_name(table)}_{suffix}")
+
+
+def get_fts_columns(db, table):
+    fts = fts_table_name(table)
+    exists = db.execute_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (fts,),
+    ).fetchone()
+    if not exists:
+        return None
+    return [row[1] for row in db.execute_sql(f"PRAGMA table_info({_quote(fts)})").fetchall()]
+
+
+def create_fts_index(db, table, columns):
+    # External-content FTS5 index: the text lives only in `table`, the index
+    # is kept in sync by triggers and built once with 'rebuild'.
+    fts = _quote(fts_table_name(table))
+    source = _quote(table)
+    cols_sql = ", ".join(_quote(col) for col in columns)
+    new_sql = ", ".join(f"new.{_quote(col)}" for col in columns)
+    old_sql = ", ".join(f"old.{_quote(col)}" for col in columns)
+    # content= is a string option; FTS5 quotes the table name itself.
+    content = table.replace("'", "''")
+    with db.atomic():
+        drop_fts_index(db, table)
+        db.execute_sql(f"CREATE VIRTUAL TABLE {fts} USING fts5({cols_sql}, content='{content}')")
+        db.execute_sql(
+            f"CREATE TRIGGER {_trigger(table, 'ai')} AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols_sql}) VALUES (new.rowid, {new_sql}); END"
+        )
+        db.execute_sql(
+            f"CREATE TRIGGER {_trigger(table, 'ad')} AFTER DELETE ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols_sql}) VALUES ('delete', old.rowid, {old_sql}); END"
+        )
+        db.execute_sql(
+            f"CREATE TRIGGER {_trigger(table, 'au')} AFTER UPDATE ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols_sql}) VALUES ('delete', old.rowid, {old_sql}); "
+            f"INSERT INTO {fts}(rowid, {cols_sql}) VALUES (new.rowid, {new_sql}); END"
+        )
+        db.execute_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def drop_fts_index(db, table):
+    for suffix in ("ai", "ad", "au"):
+        db.execute_sql(f"DROP TRIGGER IF EXISTS {_trigger(table, suffix)}")
+    db.execute_sql(f"DROP TABLE IF EXISTS {_quote(fts_table_name(table))}")
+
+
+def build_search_query(table, conditions, backward=False, inclusive=False, seek=False, columns=None):
+    # Ranked results are paged by (rank, rowid), the same keyset idea as the grid.
+    fts = _quote(fts_table_name(table))
+    table = _quote(table)
+    columns = columns or f"{table}.*"
+    where = [f"{fts} MATCH ?"] + list(conditions)
+    if seek:
+        op = "<" if backward else ">"
+        if inclusive:
+            op += "="
+        where.append(f"({fts}.rank, {table}.rowid) {op} (?, ?)")
+    order = "DESC" if backward else "ASC"
+    return (
+        f"SELECT {fts}.rank, {table}.rowid, {columns} FROM {fts} "
+        f"JOIN {table} ON {table}.rowid = {fts}.rowid "
+        f"WHERE {' AND '.join(where)} "
+        f"ORDER BY {fts}.rank {order}, {table}.rowid {order} LIMIT ?"
+    )
@@ -0,0 +1,194 @@
+﻿import csv
+import os
+import time
+
+
+def column_affinity(declared_type):
+    # SQLite type affinity rules (https://sqlite.org/datatype3.html, section 3.1).
+    declared = (declared_type or "").upper()
+    if "INT" in declared:
+        return "INTEGER"
+    if "CHAR" in declared or "CLOB" in declared or "TEXT" in declared:
+        return "TEXT"
+    if not declared or "BLOB" in declared:
+        return "BLOB"
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return "REAL"
+    return "NUMERIC"
+
+
+def _to_integer(value):
+    if value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return _to_numeric(value)
+
+
+def _to_real(value):
+    if value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _to_numeric(value):
+    if value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() and "e" not in value.lower() else number
+
+
+def _to_text(value):
+    return value
+
+
+def _to_blob(value):
+    return None if value == "" else value
+
+
+COERCERS = {
+    "INTEGER": _to_integer,
+    "REAL": _to_real,
+    "NUMERIC": _to_numeric,
+    "TEXT": _to_text,
+    "BLOB": _to_blob,
+}
+
+
+def _quote(name):
+    # CSV headers are arbitrary text, so they are always quoted as identifiers.
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _infer_type(values):
+    kinds = set()
+    for value in values:
+        if value == "":
+            continue
+        try:
+            int(value)
+            kinds.add("INTEGER")
+            continue
+        except ValueError:
+            pass
+        try:
+            float(value)
+            kinds.add("REAL")
+        except ValueError:
+            return "TEXT"
+    if kinds == {"INTEGER"}:
+        return "INTEGER"
+    if kinds:
+        return "REAL"
+    return "TEXT"
+
+
+def iter_import_csv(
+    manager,
+    path,
+    table,
+    batch_size=5000,
+    create_table=False,
+    has_header=True,
+    delimiter=",",
+    encoding="utf-8-sig",
+):
+    # Streams `path` into `table` with executemany batches inside a single
+    # transaction. Yields a progress dict after every batch; closing the
+    # generator (job cancellation) rolls the whole import back.
+    manager.check_writable()
+    if batch_size <= 0:
+        raise ValueError("Tamanho de lote invalido")
+    db = manager.current.database
+    db.connect(reuse_if_open=True)
+    total_bytes = os.path.getsize(path)
+    started = time.perf_counter()
+    rows_done = 0
+
+    with open(path, "r", encoding=encoding, newline="") as fh:
+        reader = csv.reader(fh, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return {"rows": 0, "seconds": 0.0}
+        if has_header:
+            header = [name.strip() for name in header]
+            pending = []
+        else:
+            pending = [header]
+            header = None
+
+        existing = {}
+        if table in manager.get_tables():
+            existing = {col.name: col.data_type for col in manager.get_columns(table)}
+        if not existing:
+            if not create_table:
+                raise ValueError(f"Tabela nao encontrada: {table}")
+            if header is None:
+                raise ValueError("Cabecalho necessario para criar a tabela")
+            # Column types are inferred from the first batch only, so memory stays bounded.
+            for row in reader:
+                if not row:
+                    continue
+                pending.append(row)
+                if len(pending) >= batch_size:
+                    break
+            types = [_infer_type(row[idx] for row in pending if idx < len(row)) for idx in range(len(header))]
+            manager.create_table(table, [f"{_quote(name)} {col_type}" for name, col_type in zip(header, types)])
+            existing = dict(zip(header, types))
+
+        columns = header or list(existing)
+        unknown = [name for name in columns if name not in existing]
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas em {table}: {', '.join(unknown)}")
+        coercers = [COERCERS[column_affinity(existing[name])] for name in columns]
+        width = len(columns)
+        cols_sql = ", ".join(_quote(name) for name in columns)
+        marks = ", ".join(["?"] * width)
+        sql = f"INSERT INTO {table} ({cols_sql}) VALUES ({marks})"
+
+        def convert(row):
+            if len(row) != width:
+                row = (row + [""] * width)[:width]
+            return [coerce(value) for coerce, value in zip(coercers, row)]
+
+        def progress():
+            elapsed = time.perf_counter() - started
+            return {
+                "rows": rows_done,
+                "bytes": fh.buffer.tell(),
+                "total_bytes": total_bytes,
+                "seconds": elapsed,
+                "rate": rows_done / elapsed if elapsed else 0.0,
+            }
+
+        with db.atomic():
+            batch = [convert(row) for row in pending]
+            pending = None
+            for row in reader:
+                if not row:
+                    continue
+                batch.append(convert(row))
+                if len(batch) >= batch_size:
+                    db.connection().executemany(sql, batch)
+                    rows_done += len(batch)
+                    batch = []
+                    yield progress()
+            if batch:
+                db.connection().executemany(sql, batch)
+                rows_done += len(batch)
+        manager.note_write(table)
+        result = progress()
+        result["bytes"] = total_bytes
+        yield result
+    return result
@@ -1,40 +1,243 @@
 ﻿import os
+import re
+import time
 
-from peewee import SqliteDatabase
+from datamanager_app.db import fts, plan
+from datamanager_app.db.advisor import IndexAdvisor, index_name, needs_index
+from datamanager_app.db.changes import ChangeTracker
+from datamanager_app.db.pages import PageCache
+from datamanager_app.db.profiles import DEFAULT_PROFILE, INSPECTED_PRAGMAS, profile_pragmas, read_only_uri
+from datamanager_app.db.schema import SchemaCache
+from datamanager_app.db.statements import StatementCache
+from datamanager_app.db.stats import TableStats
+from datamanager_app.db.timing import timed, timed_database
+from datamanager_app.db.values import (
+    CHUNK_BYTES,
+    decode_chunks,
+    iter_blob,
+    previewed_columns,
+    select_list,
+    wrap_previews,
+)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _like_escape(value):
+    return str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+FILTER_OPERATORS = {
+    "=": ("{col} = ?", lambda value: value),
+    "!=": ("{col} != ?", lambda value: value),
+    "<": ("{col} < ?", lambda value: value),
+    "<=": ("{col} <= ?", lambda value: value),
+    ">": ("{col} > ?", lambda value: value),
+    ">=": ("{col} >= ?", lambda value: value),
+    "contains": ("{col} LIKE ? ESCAPE '\\'", lambda value: f"%{_like_escape(value)}%"),
+    "starts": ("{col} LIKE ? ESCAPE '\\'", lambda value: f"{_like_escape(value)}%"),
+    "is_null": ("{col} IS NULL", None),
+    "not_null": ("{col} IS NOT NULL", None),
+}
+
+
+def _schema_alias(name, taken):
+    # Schema names double as table prefixes ("alias.table"), so keep them
+    # plain identifiers and away from SQLite's own "main" and "temp".
+    alias = re.sub(r"\W", "_", name).strip("_") or "db"
+    if alias[0].isdigit():
+        alias = f"db_{alias}"
+    taken = {item.lower() for item in taken} | {"main", "temp"}
+    candidate, suffix = alias, 2
+    while candidate.lower() in taken:
+        candidate = f"{alias}_{suffix}"
+        suffix += 1
+    return candidate
+
+
+def _take_bytes(chunks, limit):
+    for chunk in chunks:
+        if limit <= 0:
+            break
+        yield chunk[:limit]
+        limit -= len(chunk)
+
+
+def _byte_progress(done, total, started):
+    elapsed = time.perf_counter() - started
+    return {
+        "bytes": done,
+        "total_bytes": total,
+        "seconds": elapsed,
+        "rate": done / elapsed if elapsed else 0.0,
+    }
+
+
+_CREATE_TABLE = re.compile(
+    r'^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:"[^"]+"|\[[^\]]+\]|`[^`]+`|[\w.]+)',
+    re.IGNORECASE,
+)
 
 
 class DatabaseConnection:
-    def __init__(self, db_type, name, database):
+    def __init__(
+        self, db_type, name, database, path=None, profile=DEFAULT_PROFILE, read_only=False, immutable=False
+    ):
         self.db_type = db_type
         self.name = name
         self.database = database
+        self.path = path
+        self.profile = profile
+        self.read_only = read_only or immutable
+        self.immutable = immutable
+        # {alias: absolute path} of the files ATTACHed to this connection.
+        self.attached = {}
+        self.schema = SchemaCache()
+        self.advisor = IndexAdvisor()
+        self.changes = ChangeTracker()
+        self.stats = TableStats(self.changes)
 
 
 class DatabaseManager:
-    def __init__(self):
+    PAGE_SIZE = 200
+    STATEMENT_CACHE_SIZE = 256
+    PAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, statement_cache_size=None, page_cache_bytes=None):
         self.connections = {}
         self.current = None
+        self.statement_cache_size = statement_cache_size or self.STATEMENT_CACHE_SIZE
+        self.statements = StatementCache(self.statement_cache_size)
+        # Shared by every open file so the memory budget holds overall.
+        self.pages = PageCache(page_cache_bytes or self.PAGE_CACHE_BYTES)
 
-    def connect_sqlite(self, path):
+    @timed
+    def connect_sqlite(self, path, profile=None, read_only=False, immutable=False):
+        # Keyed by absolute path: two data.db files in different folders are
+        # different databases. Read-only opens go through a file: URI so
+        # SQLite itself refuses writes and never takes a write lock.
+        path = os.path.abspath(path)
         name = os.path.basename(path)
-        db = SqliteDatabase(path)
-        conn = DatabaseConnection("sqlite", name, db)
-        self.connections[name] = conn
+        profile = profile or DEFAULT_PROFILE
+        read_only = read_only or immutable
+        if read_only:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Arquivo nao encontrado: {path}")
+            db = timed_database(
+                read_only_uri(path, immutable),
+                uri=True,
+                pragmas=profile_pragmas(profile, read_only=True),
+                cached_statements=self.statement_cache_size,
+            )
+        else:
+            db = timed_database(
+                path,
+                pragmas=profile_pragmas(profile),
+                cached_statements=self.statement_cache_size,
+            )
+        conn = DatabaseConnection(
+            "sqlite", name, db, path=path, profile=profile, read_only=read_only, immutable=immutable
+        )
+        self.pages.discard(path)
+        self.connections[path] = conn
         self.current = conn
         return conn
 
-    def create_sqlite(self, path, overwrite=False):
+    @timed
+    def attach_database(self, path, alias=None):
+        # ATTACH is per SQLite connection; peewee remembers the file and
+        # attaches it to every connection it opens later (one per thread).
+        # Its tables are then addressed as "alias.table", in the grid as well
+        # as in SQL that joins or copies across files.
+        if not self.current:
+            raise RuntimeError("Nenhum banco conectado")
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Arquivo nao encontrado: {path}")
+        if path == self.current.path or path in self.current.attached.values():
+            raise ValueError(f"Banco ja aberto: {path}")
+        alias = _schema_alias(alias or os.path.splitext(os.path.basename(path))[0], self.current.attached)
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        # Files attached to a read-only connection are opened read-only too.
+        db.attach(read_only_uri(path, self.current.immutable) if self.current.read_only else path, alias)
+        self.current.attached[alias] = path
+        self._schemas_changed()
+        return alias
+
+    @timed
+    def detach_database(self, alias):
+        if not self.current or alias not in self.current.attached:
+            raise ValueError(f"Banco anexado desconhecido: {alias}")
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        db.detach(alias)
+        del self.current.attached[alias]
+        self._schemas_changed()
+
+    def check_writable(self):
+        if not self.current:
+            raise RuntimeError("Nenhum banco conectado")
+        if self.current.read_only:
+            raise PermissionError("Banco aberto somente para leitura")
+
+    def _schemas_changed(self):
+        schemas = ("main",) + tuple(self.current.attached)
+        self.current.schema.schemas = schemas
+        self.current.schema.invalidate()
+        self.current.changes.schemas = schemas
+        self.current.changes.touch()
+
+    def _split_table(self, table):
+        # "alias.table" -> ("alias", "table") for attached files; tables of
+        # the main file have no schema.
+        schema, dot, name = table.partition(".")
+        if dot and self.current and schema in self.current.attached:
+            return schema, name
+        if dot and schema.lower() == "main":
+            return None, name
+        return None, table
+
+    def _quote_qualified(self, name):
+        schema, bare = self._split_table(name)
+        return f"{_quote(schema)}.{_quote(bare)}" if schema else _quote(bare)
+
+    @timed
+    def set_profile(self, profile):
+        # PRAGMAs are applied when a connection opens, so switching profiles
+        # reconnects with a fresh database object.
+        if not self.current:
+            raise RuntimeError("Nenhum banco conectado")
+        previous = self.current
+        conn = self.connect_sqlite(
+            previous.path, profile=profile, read_only=previous.read_only, immutable=previous.immutable
+        )
+        previous.database.close()
+        for alias, path in previous.attached.items():
+            self.attach_database(path, alias)
+        return conn
+
+    @timed
+    def get_pragmas(self):
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        return {name: db.execute_sql(f"PRAGMA {name}").fetchone()[0] for name in INSPECTED_PRAGMAS}
+
+    @timed
+    def create_sqlite(self, path, overwrite=False, profile=None):
         if os.path.exists(path) and not overwrite:
             raise FileExistsError(f"Arquivo ja existe: {path}")
         os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
         if not os.path.exists(path):
             with open(path, "w", encoding="utf-8"):
                 pass
-        return self.connect_sqlite(path)
+        return self.connect_sqlite(path, profile=profile)
 
+    @timed
     def create_table(self, table_name, columns):
-        if not self.current:
-            raise RuntimeError("Nenhum banco conectado")
+        self.check_writable()
         if not table_name:
             raise ValueError("Nome da tabela vazio")
         if not columns:
@@ -44,20 +247,207 @@ class DatabaseManager:
         db = self.current.database
         db.connect(reuse_if_open=True)
         db.execute_sql(f"CREATE TABLE IF NOT EXISTS {sanitized} ({cols_sql})")
+        self.current.changes.touch(sanitized)
 
+    @timed
     def get_tables(self):
         if not self.current:
             return []
         db = self.current.database
         db.connect(reuse_if_open=True)
-        # Hide SQLite internal tables (ex.: sqlite_sequence) from the UI.
-        return [name for name in db.get_tables() if not name.lower().startswith("sqlite_")]
+        return self._visible_tables(self.current.schema.tables(db))
+
+    @timed
+    def get_attached(self):
+        # [(alias, path, tables)] for every attached file.
+        if not self.current:
+            return []
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        return [
+            (alias, path, self._visible_tables(self.current.schema.tables(db, alias)))
+            for alias, path in self.current.attached.items()
+        ]
 
+    def _visible_tables(self, tables):
+        # Hide SQLite internal tables (ex.: sqlite_sequence) and FTS indexes from the UI.
+        return [
+            name
+            for name in tables
+            if not name.lower().startswith("sqlite_") and not fts.is_fts_table(name)
+        ]
+
+    @timed
     def get_columns(self, table):
         db = self.current.database
         db.connect(reuse_if_open=True)
-        return db.get_columns(table)
+        schema, name = self._split_table(table)
+        return self.current.schema.columns(db, name, schema)
+
+    @timed
+    def get_primary_keys(self, table):
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        schema, name = self._split_table(table)
+        return self.current.schema.primary_keys(db, name, schema)
+
+    @timed
+    def get_indexes(self, table):
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        schema, name = self._split_table(table)
+        return self.current.schema.indexes(db, name, schema)
+
+    @timed
+    def create_index(self, table, columns, name=None, unique=False):
+        self.check_writable()
+        if not columns:
+            raise ValueError("Nenhuma coluna definida")
+        self._check_columns(table, columns)
+        schema, bare = self._split_table(table)
+        name = (name or index_name(bare, columns)).strip().replace(" ", "_")
+        if schema and not name.startswith(f"{schema}."):
+            # The schema goes on the index name; the table stays unqualified.
+            name = f"{schema}.{name}"
+        quoted = self._quote_qualified(name)
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        db.execute_sql(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {quoted} "
+            f"ON {_quote(bare)} ({', '.join(_quote(col) for col in columns)})"
+        )
+        # Fresh statistics let the planner pick the new index right away.
+        db.execute_sql(f"ANALYZE {quoted}")
+        self.current.changes.touch(table)
+        return name
+
+    @timed
+    def drop_index(self, name):
+        self.check_writable()
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        db.execute_sql(f"DROP INDEX IF EXISTS {self._quote_qualified(name)}")
+        self.current.changes.touch()
+
+    @timed
+    def advise_indexes(self):
+        # Replays the recorded WHERE / ORDER BY shapes through EXPLAIN QUERY
+        # PLAN and proposes an index for each one that scans or sorts.
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        tables = set(self.get_tables())
+        tables.update(f"{alias}.{table}" for alias, _path, attached in self.get_attached() for table in attached)
+        suggestions = {}
+        for pattern, entry in self.current.advisor.patterns():
+            table = pattern[0]
+            if table not in tables:
+                self.current.advisor.forget(table)
+                continue
+            try:
+                steps = plan.explain_query_plan(db, entry["sql"], entry["params"])
+            except Exception:
+                continue
+            filtered = bool(pattern[1] or pattern[2])
+            if not needs_index(steps, table, filtered):
+                continue
+            # Every index already carries the rowid, so its alias is never copied.
+            alias = self._rowid_alias(table)
+            table_columns = [(col.name, col.data_type) for col in self.get_columns(table) if col.name != alias]
+            columns, covering = self.current.advisor.propose(pattern, table_columns)
+            if not columns:
+                continue
+            seek = len(pattern[1]) + (1 if pattern[2] or pattern[3] else 0)
+            if any(index.columns[:seek] == columns[:seek] for index in self.get_indexes(table)):
+                continue
+            name = index_name(table, columns[:seek])
+            if name in suggestions:
+                suggestions[name]["count"] += entry["count"]
+                continue
+            suggestions[name] = {
+                "name": name,
+                "table": table,
+                "columns": columns,
+                "covering": covering,
+                "count": entry["count"],
+                "plan": [step["detail"] for step in steps],
+            }
+        return sorted(suggestions.values(), key=lambda item: item["count"], reverse=True)
+
+    @timed
+    def get_foreign_keys(self, table):
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        schema, name = self._split_table(table)
+        return self.current.schema.foreign_keys(db, name, schema)
 
+    @timed
+    def copy_table(self, source, target):
+        # INSERT ... SELECT run by SQLite itself, so rows move between files
+        # (or tables) without passing through Python. A missing target is
+        # created from the source's CREATE TABLE statement; an existing one
+        # receives the columns both tables have in common.
+        self.check_writable()
+        src_schema, src_name = self._split_table(source)
+        dst_schema, dst_name = self._split_table(target)
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        source_columns = [col.name for col in self.get_columns(source)]
+        if not source_columns:
+            raise ValueError(f"Tabela nao encontrada: {source}")
+        exists = dst_name in self.current.schema.tables(db, dst_schema)
+        with self.transaction():
+            if exists:
+                target_columns = {col.name for col in self.get_columns(target)}
+                columns = [col for col in source_columns if col in target_columns]
+                if not columns:
+                    raise ValueError(f"Nenhuma coluna em comum entre {source} e {target}")
+            else:
+                master = f"{src_schema}.sqlite_master" if src_schema else "sqlite_master"
+                ddl = db.execute_sql(
+                    f"SELECT sql FROM {master} WHERE type = 'table' AND name = ?", (src_name,)
+                ).fetchone()[0]
+                prefix = f"{dst_schema}." if dst_schema else ""
+                db.execute_sql(_CREATE_TABLE.sub(f'CREATE TABLE {prefix}"{dst_name}"', ddl, count=1))
+                columns = source_columns
+            cols_sql = ", ".join(f'"{col}"' for col in columns)
+            cursor = db.execute_sql(f"INSERT INTO {target} ({cols_sql}) SELECT {cols_sql} FROM {source}")
+        self.note_write(target)
+        return cursor.rowcount
+
+    @timed
+    def get_table_stats(self):
+        # Row counts that cost nothing to show: exact ones still cached, or
+        # the estimates left by ANALYZE in sqlite_stat1.
+        if not self.current:
+            return {}
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        stats = self.current.stats.overview(db, self.get_tables())
+        for alias, _path, tables in self.get_attached():
+            stats.update(self.current.stats.overview(db, tables, alias))
+        return stats
+
+    @timed
+    def count_rows(self, table):
+        # Exact COUNT(*), cached until the table changes.
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        schema, name = self._split_table(table)
+        return self.current.stats.count(db, name, schema)
+
+    @timed
+    def get_table_sizes(self):
+        # {table: bytes} including indexes, or None without dbstat.
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        sizes = self.current.stats.sizes(db)
+        if sizes is None:
+            return None
+        for alias in self.current.attached:
+            sizes = {**sizes, **(self.current.stats.sizes(db, alias) or {})}
+        return sizes
+
+    @timed
     def select_all(self, table):
         db = self.current.database
         cursor = db.execute_sql(f"SELECT * FROM {table}")
@@ -65,42 +455,646 @@ class DatabaseManager:
         rows = cursor.fetchall()
         return columns, rows
 
-    def insert(self, table, data):
+    @timed
+    def iter_query(self, sql, params=None, chunk_size=None, max_rows=None):
+        # Runs one arbitrary statement and streams (columns, rows) chunks.
+        # Rows past `max_rows` are still read, so the final count and rate
+        # cover the whole result, but they are not sent to the caller.
         db = self.current.database
-        columns = ", ".join(data.keys())
-        placeholders = ", ".join(["?"] * len(data))
-        values = list(data.values())
-        db.execute_sql(
-            f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
-            values,
+        db.connect(reuse_if_open=True)
+        chunk_size = chunk_size or self.PAGE_SIZE
+        changes_before = db.connection().total_changes
+        started = time.perf_counter()
+        cursor = db.execute_sql(sql.strip().rstrip(";"), params or ())
+        total = 0
+        try:
+            if cursor.description is None:
+                # sqlite3 only reports rowcount for statements that start with
+                # INSERT/UPDATE/DELETE/REPLACE; `WITH ... INSERT` reports -1.
+                rowcount = cursor.rowcount
+                if rowcount < 0:
+                    rowcount = db.connection().total_changes - changes_before
+            else:
+                columns = [desc[0] for desc in cursor.description]
+                rowcount = -1
+                emitted = False
+                for chunk in iter(lambda: cursor.fetchmany(chunk_size), []):
+                    kept = chunk
+                    if max_rows is not None:
+                        kept = chunk[: max(max_rows - total, 0)]
+                    total += len(chunk)
+                    if kept or not emitted:
+                        emitted = True
+                        yield columns, kept
+                if not emitted:
+                    yield columns, []
+        finally:
+            # DML with RETURNING writes while its rows are fetched; DDL changes
+            # no rows but may still change what a table's pages hold.
+            changed = cursor.description is None or db.connection().total_changes != changes_before
+            cursor.close()
+            if changed:
+                self.current.changes.touch()
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": total,
+            "rowcount": rowcount,
+            "changed": changed,
+            "truncated": max_rows is not None and total > max_rows,
+            "seconds": elapsed,
+            "rate": total / elapsed if elapsed else 0.0,
+        }
+
+    @timed
+    def explain_query_plan(self, sql, params=None):
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        return plan.explain_query_plan(db, sql.strip().rstrip(";"), params)
+
+    @timed
+    def vacuum(self, into=None):
+        # Rebuilds the file without free pages. VACUUM INTO writes a compacted
+        # copy instead and also works on a read-only connection.
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        if into:
+            if os.path.exists(into):
+                raise FileExistsError(f"Arquivo ja existe: {into}")
+            if not self.current.read_only:
+                db.execute_sql("VACUUM INTO ?", (os.path.abspath(into),))
+                return
+            # query_only refuses VACUUM INTO too; mode=ro still guards the file.
+            db.execute_sql("PRAGMA query_only = 0")
+            try:
+                db.execute_sql("VACUUM INTO ?", (os.path.abspath(into),))
+            finally:
+                db.execute_sql("PRAGMA query_only = 1")
+            return
+        self.check_writable()
+        db.execute_sql("VACUUM")
+        self.current.changes.touch()
+
+    @timed
+    def analyze(self):
+        # Refreshes sqlite_stat1 (planner statistics and row estimates).
+        self.check_writable()
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        db.execute_sql("ANALYZE")
+        self.current.changes.touch()
+
+    @timed
+    def begin(self):
+        if not self.current:
+            raise RuntimeError("Nenhum banco conectado")
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        db.begin()
+
+    @timed
+    def commit(self):
+        self.current.database.commit()
+
+    @timed
+    def rollback(self):
+        self.current.database.rollback()
+        self.current.changes.touch()
+
+    def in_transaction(self):
+        if not self.current or self.current.database.is_closed():
+            return False
+        return self.current.database.connection().in_transaction
+
+    def transaction(self):
+        # Context manager: commits on success, rolls back on error. Inside an
+        # explicit begin() it becomes a savepoint instead of a new transaction.
+        if not self.current:
+            raise RuntimeError("Nenhum banco conectado")
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        if db.connection().in_transaction:
+            return db.savepoint()
+        return db.atomic()
+
+    @timed
+    def get_row_key(self, table):
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        return list(self.current.schema.get(db, "row_key", table, lambda: self._load_row_key(db, table)))
+
+    def note_write(self, table):
+        # Called after rows of `table` were written. Triggers and foreign key
+        # actions may have written to other tables as well; for tables that
+        # have any, every table is invalidated, not just this one.
+        self.current.changes.touch(None if self._writes_elsewhere(table) else table)
+
+    def _writes_elsewhere(self, table):
+        db = self.current.database
+        return self.current.schema.get(db, "writes_elsewhere", table, lambda: self._load_writes_elsewhere(db, table))
+
+    def _load_writes_elsewhere(self, db, table):
+        schema, name = self._split_table(table)
+        prefix = f"{_quote(schema)}." if schema else ""
+        # The triggers that keep an FTS index in sync only write to the index.
+        fts_prefix = f"{fts.fts_table_name(name)}_"
+        triggers = db.execute_sql(
+            f"SELECT name FROM {prefix}sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (name,)
+        ).fetchall()
+        if any(not trigger.startswith(fts_prefix) for (trigger,) in triggers):
+            return True
+        for other in self.current.schema.tables(db, schema):
+            for fk in db.execute_sql(f"PRAGMA {prefix}foreign_key_list({_quote(other)})").fetchall():
+                if fk[2] == name and (fk[5] not in ("NO ACTION", "RESTRICT") or fk[6] not in ("NO ACTION", "RESTRICT")):
+                    return True
+        return False
+
+    def _load_row_key(self, db, table):
+        try:
+            db.execute_sql(f"SELECT rowid FROM {table} LIMIT 0")
+            return ["rowid"]
+        except Exception:
+            # WITHOUT ROWID tables: seek by the (possibly composite) primary key.
+            pks = self.get_primary_keys(table)
+            if not pks:
+                raise
+            return list(pks)
+
+    @timed
+    def select_page(self, table, key=None, after=None, before=None, limit=None):
+        columns = []
+        keys = []
+        rows = []
+        for columns, chunk_keys, chunk_rows in self.iter_page(table, key, after, before, limit):
+            keys.extend(chunk_keys)
+            rows.extend(chunk_rows)
+        return columns, keys, rows
+
+    @timed
+    def iter_page(
+        self,
+        table,
+        key=None,
+        after=None,
+        before=None,
+        limit=None,
+        chunk_size=100,
+        inclusive=False,
+        sort=None,
+        filters=None,
+    ):
+        # Keyset pagination: seek past the last/first position of the current
+        # window instead of using OFFSET, so every page costs the same on large
+        # tables. With `sort=(column, descending)` the position is
+        # (sort value, *key); ORDER BY column, key can walk an index on column.
+        # Pages already read are served from the page cache while the table
+        # is unchanged, so going back to a table does not query it again.
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        key = key or self.get_row_key(table)
+        limit = limit or self.PAGE_SIZE
+        cache_key = (
+            self.current.path,
+            table,
+            tuple(key),
+            tuple(sort) if sort else None,
+            repr(filters or []),
+            tuple(after) if after is not None else None,
+            tuple(before) if before is not None else None,
+            limit,
+            inclusive,
+        )
+        token = self.current.changes.token(db, table)
+        cached = self.pages.get(cache_key, token)
+        if cached is not None:
+            for columns, positions, rows in cached:
+                yield columns, list(positions), list(rows)
+            return
+        sort_col, descending = sort if sort else (None, False)
+        self._check_columns(table, [sort_col] if sort_col else [])
+        conditions, params = self.build_filters(table, filters)
+        backward = before is not None
+        position = after if after is not None else before
+        if position is not None:
+            seek_sql, seek_params = self._seek_clause(
+                key,
+                sort_col,
+                position,
+                ascending=descending == backward,
+                inclusive=inclusive,
+            )
+            conditions.append(seek_sql)
+            params.extend(seek_params)
+        order = "DESC" if descending != backward else "ASC"
+        order_cols = [_quote(col) for col in ([sort_col] if sort_col else []) + list(key)]
+        order_sql = ", ".join(f"{col} {order}" for col in order_cols)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        columns, previewed = self._preview_columns(table)
+        sql = (
+            f"SELECT {', '.join(order_cols)}, {select_list(columns, previewed)} "
+            f"FROM {table} {where} ORDER BY {order_sql} LIMIT ?"
+        )
+        self.current.advisor.record(table, filters, sort_col, sql, params)
+        cursor = db.execute_sql(sql, params)
+        width = len(order_cols)
+        if backward:
+            # Backward pages are read in reverse order, so they are flipped in one piece.
+            chunks = [cursor.fetchall()[::-1]]
+        else:
+            chunks = iter(lambda: cursor.fetchmany(chunk_size), [])
+        read = []
+        for chunk in chunks:
+            page = (
+                columns,
+                [tuple(row[:width]) for row in chunk],
+                [wrap_previews(columns, previewed, row[width:]) for row in chunk],
+            )
+            read.append(page)
+            yield page[0], list(page[1]), list(page[2])
+        if not read:
+            read.append((columns, [], []))
+            yield columns, [], []
+        # Only pages read to the end are kept.
+        self.pages.put(cache_key, token, read)
+
+    def _preview_columns(self, table):
+        # Grid reads carry only the head of long TEXT and of every BLOB.
+        table_columns = self.get_columns(table)
+        return [col.name for col in table_columns], previewed_columns(table_columns)
+
+    @timed
+    def iter_search(
+        self,
+        table,
+        query,
+        after=None,
+        before=None,
+        limit=None,
+        chunk_size=100,
+        inclusive=False,
+        filters=None,
+    ):
+        # Ranked full-text search through the table's FTS5 index, paged by
+        # (rank, rowid). Yields the same (columns, positions, rows) chunks as iter_page.
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        limit = limit or self.PAGE_SIZE
+        conditions, params = self.build_filters(table, filters, prefix=f"{_quote(table)}.")
+        backward = before is not None
+        position = after if after is not None else before
+        columns, previewed = self._preview_columns(table)
+        sql = fts.build_search_query(
+            table,
+            conditions,
+            backward=backward,
+            inclusive=inclusive,
+            seek=position is not None,
+            columns=select_list(columns, previewed, prefix=f"{_quote(table)}."),
+        )
+        params = [query] + params
+        if position is not None:
+            params.extend(position)
+        params.append(limit)
+        cursor = db.execute_sql(sql, params)
+        if backward:
+            chunks = [cursor.fetchall()[::-1]]
+        else:
+            chunks = iter(lambda: cursor.fetchmany(chunk_size), [])
+        emitted = False
+        for chunk in chunks:
+            emitted = True
+            yield (
+                columns,
+                [tuple(row[:2]) for row in chunk],
+                [wrap_previews(columns, previewed, row[2:]) for row in chunk],
+            )
+        if not emitted:
+            yield columns, [], []
+
+    @timed
+    def get_fts_columns(self, table):
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        return fts.get_fts_columns(db, table)
+
+    @timed
+    def create_fts_index(self, table, columns):
+        self.check_writable()
+        if not columns:
+            raise ValueError("Nenhuma coluna selecionada")
+        self._check_columns(table, columns)
+        if self._split_table(table)[0]:
+            raise ValueError("Busca textual disponivel apenas para tabelas do banco principal")
+        if self.get_row_key(table) != ["rowid"]:
+            raise ValueError("Busca textual requer uma tabela com rowid")
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        fts.create_fts_index(db, table, columns)
+        self.current.changes.touch(table)
+
+    @timed
+    def drop_fts_index(self, table):
+        self.check_writable()
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        fts.drop_fts_index(db, table)
+        self.current.changes.touch(table)
+
+    def build_filters(self, table, filters, prefix=""):
+        # Compiles [(column, operator, value), ...] into parameterized
+        # conditions; column names are checked against the table schema.
+        filters = filters or []
+        self._check_columns(table, [column for column, _op, _value in filters])
+        conditions = []
+        params = []
+        for column, op, value in filters:
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Operador invalido: {op}")
+            template, transform = FILTER_OPERATORS[op]
+            conditions.append(template.format(col=f"{prefix}{_quote(column)}"))
+            if transform is not None:
+                params.append(transform(value))
+        return conditions, params
+
+    def _check_columns(self, table, columns):
+        if not columns:
+            return
+        known = {col.name for col in self.get_columns(table)} | {"rowid"}
+        unknown = [col for col in columns if col not in known]
+        if unknown:
+            raise ValueError(f"Coluna desconhecida: {', '.join(unknown)}")
+
+    def _seek_clause(self, key, sort_col, position, ascending, inclusive=False):
+        # Rows strictly after `position` in the given direction. SQLite sorts
+        # NULLs first ascending and last descending, which the NULL branches mirror.
+        op = ">" if ascending else "<"
+        if inclusive:
+            op += "="
+        key_sql = ", ".join(_quote(col) for col in key)
+        sort_col = _quote(sort_col) if sort_col else None
+        marks = ", ".join(["?"] * len(key))
+        if not sort_col:
+            return f"({key_sql}) {op} ({marks})", list(position)
+        value, key_value = position[0], list(position[1:])
+        if value is None:
+            if ascending:
+                return (
+                    f"(({sort_col} IS NULL AND ({key_sql}) {op} ({marks})) OR {sort_col} IS NOT NULL)",
+                    key_value,
+                )
+            return f"({sort_col} IS NULL AND ({key_sql}) {op} ({marks}))", key_value
+        row_sql = f"({sort_col}, {key_sql}) {op} (?, {marks})"
+        if ascending:
+            return row_sql, [value] + key_value
+        return f"({row_sql} OR {sort_col} IS NULL)", [value] + key_value
+
+    @timed
+    def select_row(self, table, key, key_value):
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        columns, previewed = self._preview_columns(table)
+        sql = self.statements.get(
+            "select_row",
+            table,
+            tuple(key) + ("|",) + tuple(columns),
+            lambda: self._build_select_row(table, key, select_list(columns, previewed)),
         )
+        cursor = db.execute_sql(sql, list(key_value))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        width = len(key)
+        return tuple(row[:width]), wrap_previews(columns, previewed, row[width:])
+
+    @timed
+    def get_value_info(self, table, column, key, key_value):
+        # Type, size in bytes and rowid of one cell, without reading it.
+        self._check_columns(table, [column])
+        if self.get_row_key(table) != ["rowid"]:
+            raise ValueError("Leitura incremental requer uma tabela com rowid")
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        row = db.execute_sql(
+            f"SELECT typeof({_quote(column)}), length(CAST({_quote(column)} AS BLOB)), rowid "
+            f"FROM {table} WHERE {self._key_where(self._key_columns(key))}",
+            self._key_values(key, key_value),
+        ).fetchone()
+        if row is None:
+            raise LookupError("Registro nao encontrado")
+        return {"type": row[0], "size": row[1] or 0, "rowid": row[2]}
+
+    @timed
+    def iter_value(self, table, column, rowid, chunk_size=CHUNK_BYTES, limit=None):
+        # Streams a TEXT (decoded) or BLOB (bytes) value with incremental blob
+        # I/O; `limit` stops after that many bytes.
+        self._check_columns(table, [column])
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        schema, name = self._split_table(table)
+        kind = db.execute_sql(f"SELECT typeof({_quote(column)}) FROM {table} WHERE rowid = ?", (rowid,)).fetchone()
+        if kind is None or kind[0] not in ("text", "blob"):
+            return 0
+        chunks = iter_blob(db.connection(), name, column, rowid, schema or "main", chunk_size)
+        if limit is not None:
+            chunks = _take_bytes(chunks, limit)
+        if kind[0] == "text":
+            chunks = decode_chunks(chunks, final=limit is None)
+        sent = 0
+        for chunk in chunks:
+            sent += len(chunk)
+            yield chunk
+        return sent
+
+    @timed
+    def save_value(self, table, column, rowid, path, chunk_size=CHUNK_BYTES):
+        # Writes a value to a file chunk by chunk; yields progress dicts.
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        schema, name = self._split_table(table)
+        self._check_columns(table, [column])
+        total = db.execute_sql(
+            f"SELECT length(CAST({_quote(column)} AS BLOB)) FROM {table} WHERE rowid = ?", (rowid,)
+        ).fetchone()
+        total = (total[0] if total else 0) or 0
+        started = time.perf_counter()
+        done = 0
+        with open(path, "wb") as fh:
+            for chunk in iter_blob(db.connection(), name, column, rowid, schema or "main", chunk_size):
+                fh.write(chunk)
+                done += len(chunk)
+                yield _byte_progress(done, total, started)
+        result = _byte_progress(done, total, started)
+        yield result
+        return result
+
+    @timed
+    def replace_value(self, table, column, rowid, path, chunk_size=CHUNK_BYTES):
+        # Sets a cell to the contents of a file: zeroblob(size) reserves the
+        # space, then the file is copied in chunks through a writable blob
+        # handle, all in one transaction (closing the generator rolls back).
+        self.check_writable()
+        self._check_columns(table, [column])
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        schema, name = self._split_table(table)
+        total = os.path.getsize(path)
+        started = time.perf_counter()
+        done = 0
+        with self.transaction():
+            cursor = db.execute_sql(f"UPDATE {table} SET {_quote(column)} = zeroblob(?) WHERE rowid = ?", (total, rowid))
+            if cursor.rowcount != 1:
+                raise LookupError("Registro nao encontrado")
+            with open(path, "rb") as fh, db.connection().blobopen(
+                name, column, rowid, readonly=False, name=schema or "main"
+            ) as blob:
+                for chunk in iter(lambda: fh.read(chunk_size), b""):
+                    blob.write(chunk)
+                    done += len(chunk)
+                    yield _byte_progress(done, total, started)
+        self.note_write(table)
+        result = _byte_progress(done, total, started)
+        yield result
+        return result
+
+    @timed
+    def resolve_key(self, table, key, key_value, data):
+        # Seek key of a row after `data` was written to it. The rowid follows
+        # the table's INTEGER PRIMARY KEY column when that column is assigned.
+        if list(key) == ["rowid"]:
+            alias = self._rowid_alias(table)
+            if alias and data.get(alias) not in (None, ""):
+                return (data[alias],)
+            return tuple(key_value)
+        return tuple(data.get(col, value) for col, value in zip(key, key_value))
+
+    def _rowid_alias(self, table):
+        pks = [col for col in self.get_columns(table) if col.primary_key]
+        if len(pks) == 1 and pks[0].data_type.upper() == "INTEGER":
+            return pks[0].name
+        return None
+
+    @timed
+    def insert(self, table, data):
+        self.check_writable()
+        db = self.current.database
+        sql = self.statements.get("insert", table, data.keys(), lambda: self._build_insert(table, data))
+        cursor = db.execute_sql(sql, list(data.values()))
+        self.note_write(table)
+        return cursor.lastrowid
 
+    @timed
     def update(self, table, pk_name, pk_value, data):
+        self.check_writable()
         db = self.current.database
-        set_clause = ", ".join([f"{k}=?" for k in data])
-        values = list(data.values())
-        values.append(pk_value)
-        db.execute_sql(
-            f"UPDATE {table} SET {set_clause} WHERE {pk_name}=?",
-            values,
+        key = self._key_columns(pk_name)
+        sql = self.statements.get(
+            "update",
+            table,
+            tuple(data.keys()) + ("|",) + key,
+            lambda: self._build_update(table, key, data),
         )
+        values = list(data.values())
+        values.extend(self._key_values(pk_name, pk_value))
+        cursor = db.execute_sql(sql, values)
+        self.note_write(table)
+        return cursor.rowcount
 
+    @timed
     def delete(self, table, pk_name, pk_value):
+        self.check_writable()
         db = self.current.database
-        db.execute_sql(
-            f"DELETE FROM {table} WHERE {pk_name}=?",
-            (pk_value,),
-        )
+        key = self._key_columns(pk_name)
+        sql = self.statements.get("delete", table, key, lambda: self._build_delete(table, key))
+        cursor = db.execute_sql(sql, self._key_values(pk_name, pk_value))
+        self.note_write(table)
+        return cursor.rowcount
+
+    def get_data_version(self):
+        # Moves only when another connection commits (see ChangeTracker).
+        db = self.current.database
+        db.connect(reuse_if_open=True)
+        return self.current.changes.data_version(db)
+
+    def watched_files(self):
+        if not self.current or not self.current.path:
+            return ()
+        return (self.current.path, *self.current.attached.values())
+
+    def statement_stats(self):
+        return self.statements.stats()
+
+    def page_cache_stats(self):
+        return self.pages.stats()
 
+    def _key_columns(self, pk_name):
+        # Rows are addressed either by a single column or by a composite key.
+        if isinstance(pk_name, (list, tuple)):
+            return tuple(pk_name)
+        return (pk_name,)
+
+    def _key_values(self, pk_name, pk_value):
+        if isinstance(pk_name, (list, tuple)):
+            return list(pk_value)
+        return [pk_value]
+
+    def _key_where(self, key):
+        if len(key) == 1:
+            return f"{_quote(key[0])}=?"
+        key_sql = ", ".join(_quote(col) for col in key)
+        marks = ", ".join(["?"] * len(key))
+        return f"({key_sql}) = ({marks})"
+
+    def _build_select_row(self, table, key, columns_sql="*"):
+        key_sql = ", ".join(_quote(col) for col in key)
+        marks = ", ".join(["?"] * len(key))
+        return f"SELECT {key_sql}, {columns_sql} FROM {table} WHERE ({key_sql}) = ({marks})"
+
+    def _build_insert(self, table, data):
+        columns = ", ".join(_quote(col) for col in data)
+        placeholders = ", ".join(["?"] * len(data))
+        return f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+    def _build_update(self, table, key, data):
+        set_clause = ", ".join([f"{_quote(k)}=?" for k in data])
+        return f"UPDATE {table} SET {set_clause} WHERE {self._key_where(key)}"
+
+    def _build_delete(self, table, key):
+        return f"DELETE FROM {table} WHERE {self._key_where(key)}"
+
+    @timed
+    def apply_batch(self, changes):
+        # Applies queued row changes in a single transaction (one commit/fsync).
+        try:
+            with self.transaction():
+                for change in changes:
+                    op = change["op"]
+                    if op == "insert":
+                        self.insert(change["table"], change["data"])
+                    elif op == "update":
+                        self.update(change["table"], change["key"], change["key_value"], change["data"])
+                    elif op == "delete":
+                        self.delete(change["table"], change["key"], change["key_value"])
+                    else:
+                        raise ValueError(f"Operacao desconhecida: {op}")
+        except Exception:
+            # Rolled back: the rows touched above are back to what they were.
+            self.current.changes.touch()
+            raise
+        return len(changes)
+
+    @timed
     def drop_table(self, table_name):
-        if not self.current:
-            raise RuntimeError("Nenhum banco conectado")
+        self.check_writable()
         if not table_name:
             raise ValueError("Nome da tabela vazio")
         sanitized = table_name.strip().replace(" ", "_")
         db = self.current.database
         db.connect(reuse_if_open=True)
+        # Dropping a table deletes its rows first, which runs FK actions;
+        # checked before the table (and its schema) is gone.
+        elsewhere = self._writes_elsewhere(sanitized)
         db.execute_sql(f"DROP TABLE IF EXISTS {sanitized}")
+        self.current.changes.touch(None if elsewhere else sanitized)
 
 
 db_manager = DatabaseManager()
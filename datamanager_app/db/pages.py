@@ -0,0 +1,78 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+def _estimate_size(chunks):
+    # Rough footprint of a page in memory: the row tuples and their values.
+    size = 0
+    for columns, positions, rows in chunks:
+        size += sys.getsizeof(positions) + sys.getsizeof(rows)
+        for row in positions:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+        for row in rows:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class PageCache:
+    # LRU of pages already read for the grid, keyed by (database, table, seek
+    # key, sort, filters, position, limit) and bounded by an estimate of the
+    # memory they hold. Each page keeps the ChangeTracker token read before
+    # its query; a page whose token no longer matches is dropped, never shown.
+
+    def __init__(self, budget=64 * 1024 * 1024):
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, token):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == token:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key, token, chunks):
+        size = _estimate_size(chunks)
+        if size > self.budget:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (token, chunks, size)
+            self.used += size
+            while self.used > self.budget:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, database):
+        # Drops every page of one database file (it was reopened or closed).
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == database]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used = 0
+
+    def _remove(self, key):
+        self.used -= self._entries.pop(key)[2]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "bytes": self.used,
+                "budget": self.budget,
+            }
@@ -0,0 +1,18 @@
+def step_kind(detail):
+    # "SCAN t" reads the whole table; "SCAN t USING COVERING INDEX" still
+    # visits every index entry. "SEARCH" seeks through an index or the rowid.
+    if detail.startswith("SEARCH"):
+        return "search"
+    if detail.startswith("SCAN") and "CONSTANT ROW" not in detail:
+        return "scan"
+    if "TEMP B-TREE" in detail:
+        return "temp"
+    return "other"
+
+
+def explain_query_plan(db, sql, params=None):
+    cursor = db.execute_sql(f"EXPLAIN QUERY PLAN {sql}", params or ())
+    return [
+        {"id": row[0], "parent": row[1], "detail": row[3], "kind": step_kind(row[3])}
+        for row in cursor.fetchall()
+    ]
@@ -0,0 +1,61 @@
+import pathlib
+
+DEFAULT_PROFILE = "safe"
+
+# PRAGMAs applied by peewee on every new connection (including the worker's).
+PROFILES = {
+    # SQLite defaults: rollback journal with a full fsync on every commit.
+    "safe": {
+        "journal_mode": "delete",
+        "synchronous": "full",
+    },
+    # WAL lets readers and the writer run concurrently; NORMAL only fsyncs at
+    # checkpoints, which is still durable against application crashes.
+    "fast-write": {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+    },
+    # For large imports: big page cache and in-memory temp tables/indexes.
+    "bulk-load": {
+        "journal_mode": "wal",
+        "synchronous": "off",
+        "cache_size": -262144,
+        "temp_store": "memory",
+    },
+    # For browsing: memory-mapped reads avoid copying pages into the cache.
+    "read-heavy": {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+    },
+}
+
+# Read-only opens replace the profile: journal_mode and synchronous cannot be
+# changed on a read-only file, and a map as large as the file (SQLite caps it
+# at its compile-time limit) lets reads use the OS page cache directly.
+READ_ONLY_PRAGMAS = {
+    "query_only": 1,
+    "cache_size": -65536,
+    "temp_store": "memory",
+    "mmap_size": 1 << 40,
+}
+
+INSPECTED_PRAGMAS = ("journal_mode", "synchronous", "cache_size", "temp_store", "mmap_size", "query_only")
+
+
+def profile_pragmas(profile, read_only=False):
+    if profile not in PROFILES:
+        raise ValueError(f"Perfil desconhecido: {profile}")
+    if read_only:
+        return dict(READ_ONLY_PRAGMAS)
+    return dict(PROFILES[profile])
+
+
+def read_only_uri(path, immutable=False):
+    # mode=ro never takes a write lock; immutable=1 also skips the shared
+    # locks and change detection, so it is only safe for files nobody writes.
+    uri = pathlib.Path(path).absolute().as_uri() + "?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return uri
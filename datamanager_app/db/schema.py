@@ -0,0 +1,63 @@
+import threading
+
+
+def qualified_name(table, schema=None):
+    return f"{schema}.{table}" if schema else table
+
+
+class SchemaCache:
+    # Catalog metadata for one database file and the files attached to it.
+    # Every lookup first reads PRAGMA schema_version of each schema, which
+    # SQLite bumps on any schema change made by any connection, and drops
+    # everything cached when one of them moved.
+
+    def __init__(self):
+        self.schemas = ("main",)
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+            self._entries.clear()
+
+    def get(self, db, kind, table, loader):
+        version = tuple(
+            db.execute_sql(f'PRAGMA "{schema}".schema_version').fetchone()[0] for schema in self.schemas
+        )
+        entry_key = (kind, table)
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            if entry_key in self._entries:
+                self.hits += 1
+                return self._entries[entry_key]
+            self.misses += 1
+        value = loader()
+        with self._lock:
+            if self.version == version:
+                self._entries[entry_key] = value
+        return value
+
+    def tables(self, db, schema=None):
+        return self.get(db, "tables", schema, lambda: db.get_tables(schema))
+
+    def columns(self, db, table, schema=None):
+        return self.get(db, "columns", qualified_name(table, schema), lambda: db.get_columns(table, schema))
+
+    def primary_keys(self, db, table, schema=None):
+        return self.get(
+            db, "primary_keys", qualified_name(table, schema), lambda: db.get_primary_keys(table, schema)
+        )
+
+    def indexes(self, db, table, schema=None):
+        return self.get(db, "indexes", qualified_name(table, schema), lambda: db.get_indexes(table, schema))
+
+    def foreign_keys(self, db, table, schema=None):
+        return self.get(
+            db, "foreign_keys", qualified_name(table, schema), lambda: db.get_foreign_keys(table, schema)
+        )
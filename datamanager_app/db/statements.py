@@ -0,0 +1,45 @@
+import threading
+from collections import OrderedDict
+
+
+class StatementCache:
+    # LRU of generated SQL strings keyed by (operation, table, columns). The
+    # strings are reused verbatim, so sqlite3's own prepared-statement cache
+    # (sized by `cached_statements`) also hits instead of re-parsing.
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, op, table, columns, builder):
+        key = (op, table, tuple(columns))
+        with self._lock:
+            sql = self._entries.get(key)
+            if sql is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return sql
+            self.misses += 1
+        sql = builder()
+        with self._lock:
+            self._entries[key] = sql
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return sql
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+            }
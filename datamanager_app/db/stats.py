@@ -0,0 +1,121 @@
+import threading
+
+from datamanager_app.db.schema import qualified_name
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def estimated_counts(db, schema="main"):
+    # Row counts recorded by the last ANALYZE. Every sqlite_stat1 row starts
+    # with the number of rows in the table (for an index entry) or is just
+    # that number (for a table without indexes).
+    found = db.execute_sql(
+        f"SELECT 1 FROM {_quote(schema)}.sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    if not found:
+        return {}
+    counts = {}
+    for table, stat in db.execute_sql(f"SELECT tbl, stat FROM {_quote(schema)}.sqlite_stat1").fetchall():
+        try:
+            rows = int(str(stat).split()[0])
+        except (IndexError, ValueError):
+            continue
+        counts[table] = max(rows, counts.get(table, 0))
+    return counts
+
+
+def table_sizes(db, schema="main"):
+    # Bytes on disk per table, its indexes included, from the dbstat virtual
+    # table. Returns None when SQLite was built without it.
+    owners = dict(
+        db.execute_sql(
+            f"SELECT name, tbl_name FROM {_quote(schema)}.sqlite_master WHERE type IN ('table', 'index')"
+        ).fetchall()
+    )
+    try:
+        rows = db.execute_sql(
+            "SELECT name, pgsize FROM dbstat WHERE schema = ? AND aggregate = TRUE", (schema,)
+        ).fetchall()
+    except Exception as exc:
+        if "no such table" in str(exc):
+            return None
+        # SQLite older than 3.31 has dbstat without the aggregate column.
+        rows = db.execute_sql(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE schema = ? GROUP BY name", (schema,)
+        ).fetchall()
+    sizes = {}
+    for name, size in rows:
+        table = owners.get(name, name)
+        sizes[table] = sizes.get(table, 0) + (size or 0)
+    return sizes
+
+
+def count_rows(db, table, schema=None):
+    source = f"{_quote(schema)}.{_quote(table)}" if schema else _quote(table)
+    return db.execute_sql(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
+
+
+class TableStats:
+    # Exact row counts and sizes of one database file (and the files attached
+    # to it), each kept with the ChangeTracker token read before it was
+    # computed: an exact count lives until its table changes, the sizes until
+    # anything does. Tables of attached schemas are keyed as "schema.table".
+
+    def __init__(self, changes):
+        self.changes = changes
+        self._counts = {}
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._counts.clear()
+            self._sizes.clear()
+
+    def cached_count(self, db, table, schema=None):
+        key = qualified_name(table, schema)
+        with self._lock:
+            entry = self._counts.get(key)
+        if entry is None or entry[0] != self.changes.token(db, key):
+            return None
+        return entry[1]
+
+    def count(self, db, table, schema=None):
+        key = qualified_name(table, schema)
+        token = self.changes.token(db, key)
+        with self._lock:
+            entry = self._counts.get(key)
+        if entry is not None and entry[0] == token:
+            return entry[1]
+        rows = count_rows(db, table, schema)
+        with self._lock:
+            self._counts[key] = (token, rows)
+        return rows
+
+    def sizes(self, db, schema=None):
+        token = self.changes.token(db)
+        with self._lock:
+            entry = self._sizes.get(schema)
+        if entry is not None and entry[0] == token:
+            return entry[1]
+        sizes = table_sizes(db, schema or "main")
+        if sizes is not None:
+            sizes = {qualified_name(table, schema): size for table, size in sizes.items()}
+        with self._lock:
+            self._sizes[schema] = (token, sizes)
+        return sizes
+
+    def overview(self, db, tables, schema=None):
+        # What can be shown right away: exact counts still valid in the cache,
+        # otherwise the ANALYZE estimate (or None when there is neither).
+        estimates = estimated_counts(db, schema or "main")
+        result = {}
+        for table in tables:
+            rows = self.cached_count(db, table, schema)
+            if rows is not None:
+                result[qualified_name(table, schema)] = {"rows": rows, "exact": True}
+            else:
+                result[qualified_name(table, schema)] = {"rows": estimates.get(table), "exact": False}
+        return result
@@ -0,0 +1,239 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PHASES = ("query", "fetch", "render")
+
+
+class Span:
+    # One timed operation. `phases` splits the work into statement execution
+    # (query), reading rows from the cursor (fetch) and Tk updates (render);
+    # `active` is the time actually spent inside the span, which for streamed
+    # results and async UI actions is less than the wall time.
+
+    def __init__(self, name, kind, attrs=None):
+        self.name = name
+        self.kind = kind
+        self.attrs = dict(attrs or {})
+        self.thread = threading.current_thread().name
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.finished = None
+        self.active = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.rows = 0
+        self.error = None
+        self.pending = 0
+
+    @property
+    def wall(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "thread": self.thread,
+            "started_at": self.started_at,
+            "wall_ms": round(self.wall * 1000, 3),
+            "active_ms": round(self.active * 1000, 3),
+            **{f"{phase}_ms": round(seconds * 1000, 3) for phase, seconds in self.phases.items()},
+            "rows": self.rows,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    # Collects spans from the UI thread and the worker. Each thread keeps a
+    # stack of the spans it is currently working for; query/fetch time is
+    # added to every span on that stack, so a UI action sees the database
+    # work done on its behalf on the worker thread.
+    MAX_SPANS = 5000
+
+    def __init__(self, max_spans=None):
+        self.spans = deque(maxlen=max_spans or self.MAX_SPANS)
+        self.listeners = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def start(self, name, kind="action", **attrs):
+        return Span(name, kind, attrs)
+
+    def finish(self, span, error=None):
+        if span.finished is not None:
+            return
+        span.finished = time.perf_counter()
+        if error is not None:
+            span.error = str(error)
+        with self._lock:
+            self.spans.append(span)
+        for listener in list(self.listeners):
+            listener(span)
+
+    @contextmanager
+    def activate(self, span):
+        if span is None:
+            yield None
+            return
+        stack = self._stack()
+        stack.append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            with self._lock:
+                span.active += elapsed
+
+    @contextmanager
+    def action(self, name, **attrs):
+        # A UI action; it finishes once the jobs it submitted are done.
+        span = self.start(name, "action", **attrs)
+        try:
+            with self.activate(span):
+                yield span
+        except Exception as exc:
+            self.finish(span, error=exc)
+            raise
+        if not span.pending:
+            self.finish(span)
+
+    def add(self, phase, seconds, rows=0):
+        stack = self._stack()
+        if not stack:
+            return
+        with self._lock:
+            for span in stack:
+                span.phases[phase] += seconds
+                # Actions count the rows delivered to the UI, not every
+                # metadata row read on their behalf.
+                if span.kind == "db":
+                    span.rows += rows
+
+    def add_to(self, span, phase, seconds):
+        with self._lock:
+            span.phases[phase] += seconds
+
+    def export(self, path):
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"spans": spans}, fh, ensure_ascii=False, indent=2)
+        return len(spans)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+tracer = Tracer()
+
+
+def timed(fn):
+    # Wraps a DatabaseManager method in a "db" span named after it. Generator
+    # methods are only timed while they run, not while the caller holds them.
+    name = fn.__name__
+
+    if inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def stream(*args, **kwargs):
+            span = tracer.start(name, "db")
+            generator = fn(*args, **kwargs)
+            error = None
+            try:
+                while True:
+                    with tracer.activate(span):
+                        try:
+                            chunk = next(generator)
+                        except StopIteration as stop:
+                            return stop.value
+                    yield chunk
+            except Exception as exc:
+                error = exc
+                raise
+            finally:
+                generator.close()
+                tracer.finish(span, error=error)
+
+        return stream
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        span = tracer.start(name, "db")
+        try:
+            with tracer.activate(span):
+                result = fn(*args, **kwargs)
+        except Exception as exc:
+            tracer.finish(span, error=exc)
+            raise
+        tracer.finish(span)
+        return result
+
+    return wrapper
+
+
+class TimedCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        rows = fetch(*args)
+        count = 0 if rows is None else 1 if not isinstance(rows, list) else len(rows)
+        tracer.add("fetch", time.perf_counter() - started, rows=count)
+        return rows
+
+    def fetchone(self):
+        return self._timed_fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed_fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed_fetch(self._cursor.fetchall)
+
+
+_database_class = None
+
+
+def timed_database(path, **kwargs):
+    # peewee is only imported when the first database is opened, which
+    # happens on the worker after the window has painted.
+    global _database_class
+    if _database_class is None:
+        from peewee import SqliteDatabase
+
+        class TimedSqliteDatabase(SqliteDatabase):
+            # Splits statement time from fetch time for whatever span is active.
+            def execute_sql(self, sql, params=None):
+                started = time.perf_counter()
+                cursor = super().execute_sql(sql, params)
+                tracer.add("query", time.perf_counter() - started)
+                return TimedCursor(cursor)
+
+        _database_class = TimedSqliteDatabase
+    return _database_class(path, **kwargs)
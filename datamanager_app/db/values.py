@@ -0,0 +1,99 @@
+import codecs
+
+from datamanager_app.db.importer import column_affinity
+
+# The grid only receives the head of long TEXT values and of every BLOB; the
+# whole value is read on demand through incremental blob I/O.
+PREVIEW_CHARS = 200
+PREVIEW_BYTES = 16
+CHUNK_BYTES = 64 * 1024
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class Preview(str):
+    # What the grid shows in place of a large value: a plain string (so the
+    # Treeview and the forms keep working) that remembers the real type and
+    # size of the value it stands for.
+
+    def __new__(cls, head, kind, size):
+        if kind == "blob":
+            text = f"<BLOB {size} bytes> {head.hex(' ').upper()}{' …' if size > len(head) else ''}"
+        else:
+            text = f"{head}…"
+        preview = super().__new__(cls, text)
+        preview.kind = kind
+        preview.size = size
+        return preview
+
+
+def previewed_columns(columns):
+    # Columns that may hold large values. INTEGER/REAL columns can in theory
+    # store a BLOB too, but reading them as-is keeps number columns cheap.
+    return [col.name for col in columns if column_affinity(col.data_type) in ("TEXT", "BLOB", "NUMERIC")]
+
+
+def select_list(columns, previewed, prefix=""):
+    # One expression per column, then a last column with the size of every
+    # truncated value ("" where the value came through whole), e.g. ",1048576,".
+    # Truncated columns get an alias no column can have: named after the
+    # column, ORDER BY and the keyset WHERE would resolve to the truncated
+    # value instead of the column (and its index).
+    exprs = []
+    sizes = []
+    for index, col in enumerate(columns):
+        ref = f"{prefix}{_quote(col)}"
+        if col not in previewed:
+            exprs.append(ref)
+            continue
+        truncated = f"(typeof({ref}) = 'blob' OR (typeof({ref}) = 'text' AND length({ref}) > {PREVIEW_CHARS}))"
+        exprs.append(
+            f"CASE WHEN typeof({ref}) = 'blob' THEN substr({ref}, 1, {PREVIEW_BYTES}) "
+            f"WHEN {truncated} THEN substr({ref}, 1, {PREVIEW_CHARS}) ELSE {ref} END AS __preview_{index}"
+        )
+        sizes.append(f"CASE WHEN {truncated} THEN length({ref}) ELSE '' END")
+    exprs.append(" || ',' || ".join(sizes) if sizes else "''")
+    return ", ".join(exprs)
+
+
+def wrap_previews(columns, previewed, row):
+    # Turns the truncated cells of a row read with select_list into Previews
+    # and drops the trailing sizes column.
+    *values, sizes = row
+    if not sizes:
+        return tuple(values)
+    for col, size in zip(previewed, str(sizes).split(",")):
+        if size:
+            index = columns.index(col)
+            head = values[index]
+            kind = "blob" if isinstance(head, bytes) else "text"
+            values[index] = Preview(head, kind, int(size))
+    return tuple(values)
+
+
+def iter_blob(conn, table, column, rowid, schema="main", chunk_size=CHUNK_BYTES):
+    # Streams one value straight from its pages (sqlite3 Blob, Python 3.11+).
+    with conn.blobopen(table, column, rowid, readonly=True, name=schema) as blob:
+        while True:
+            chunk = blob.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def decode_chunks(chunks, encoding="utf-8", final=True):
+    # TEXT read through blob I/O arrives as bytes cut at arbitrary points.
+    # With final=False the bytes were cut on purpose (a byte limit), so a
+    # character left incomplete at the end is dropped instead of replaced.
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    if not final:
+        return
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
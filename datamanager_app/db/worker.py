@@ -0,0 +1,110 @@
+﻿import inspect
+import queue
+import threading
+import time
+
+from datamanager_app.db.timing import tracer
+
+
+class QueryJob:
+    def __init__(self, fn, args, kwargs, on_chunk=None, on_done=None, on_error=None, detached=False):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_chunk = on_chunk
+        self.on_done = on_done
+        self.on_error = on_error
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.first_row_at = None
+        self.finished_at = None
+        self.rows = 0
+        # The UI action this job works for; its query/fetch time is added there.
+        # Detached jobs (background statistics) belong to no action.
+        self.span = None if detached else tracer.current()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def time_to_first_row(self):
+        if self.first_row_at is None:
+            return None
+        return self.first_row_at - self.submitted_at
+
+    def elapsed(self):
+        end = self.finished_at or time.perf_counter()
+        return end - self.submitted_at
+
+
+# Runs database calls on a single background thread. peewee keeps connection
+# state per thread, so everything executed here goes through the worker's own
+# SQLite connection. Results are posted to `events` as (job, kind, payload)
+# tuples, where kind is "chunk", "done" or "error".
+class QueryWorker:
+    def __init__(self, events=None):
+        self.jobs = queue.Queue()
+        self.events = events if events is not None else queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="DataManagerWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, on_chunk=None, on_done=None, on_error=None, detached=False, **kwargs):
+        job = QueryJob(fn, args, kwargs, on_chunk, on_done, on_error, detached=detached)
+        self.jobs.put(job)
+        return job
+
+    def stop(self):
+        self.jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            if job.cancelled:
+                self.events.put((job, "done", None))
+                continue
+            job.started_at = time.perf_counter()
+            try:
+                with tracer.activate(job.span):
+                    result = job.fn(*job.args, **job.kwargs)
+                    if inspect.isgenerator(result):
+                        result = self._stream(job, result)
+                job.finished_at = time.perf_counter()
+                self.events.put((job, "done", result))
+            except Exception as exc:
+                job.finished_at = time.perf_counter()
+                self.events.put((job, "error", exc))
+
+    def _stream(self, job, generator):
+        # Generators stream their chunks as they are produced; the return value
+        # of the generator (if any) becomes the payload of the "done" event.
+        try:
+            while True:
+                if job.cancelled:
+                    generator.close()
+                    return None
+                try:
+                    chunk = next(generator)
+                except StopIteration as stop:
+                    return stop.value
+                size = _chunk_size(chunk)
+                if size and job.first_row_at is None:
+                    job.first_row_at = time.perf_counter()
+                job.rows += size
+                self.events.put((job, "chunk", chunk))
+        finally:
+            generator.close()
+
+
+def _chunk_size(chunk):
+    # Chunks are either a list of rows or a tuple whose last item is the row list.
+    if isinstance(chunk, tuple) and chunk and isinstance(chunk[-1], list):
+        return len(chunk[-1])
+    if isinstance(chunk, list):
+        return len(chunk)
+    return 0
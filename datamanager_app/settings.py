@@ -0,0 +1,101 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+
+
+class SettingsStore:
+    # settings.json held in memory. The file is read once; changes are
+    # written by a timer thread after `delay` seconds without further
+    # changes, through a temp file renamed over the original so a crash
+    # mid-write never leaves a truncated file behind.
+    DELAY = 0.5
+
+    def __init__(self, path, delay=None):
+        self.path = path
+        self.delay = self.DELAY if delay is None else delay
+        self._data = self._read()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        atexit.register(self.flush)
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            if self._data.get(key, object()) == value:
+                return
+            self._data[key] = value
+        self._schedule()
+
+    def pop(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            value = self._data.pop(key)
+        self._schedule()
+        return value
+
+    def set_item(self, key, item, value):
+        # For dict-valued settings such as {"db_profiles": {path: profile}}.
+        with self._lock:
+            mapping = self._data.get(key)
+            if not isinstance(mapping, dict):
+                mapping = {}
+            if mapping.get(item, object()) == value:
+                return
+            self._data[key] = {**mapping, item: value}
+        self._schedule()
+
+    def _schedule(self):
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        # The snapshot is taken under _write_lock, so payloads reach the file
+        # in order, and a flush that finds nothing dirty still waits for a
+        # write another thread is in the middle of (the one at exit must).
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                payload = json.dumps(self._data, ensure_ascii=True, indent=2)
+            self._write(payload)
+
+    def _write(self, payload):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(payload)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(temp_path, self.path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            with self._lock:
+                self._dirty = True
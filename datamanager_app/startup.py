@@ -0,0 +1,43 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    # Per-phase costs of the cold start, measured from `started` (the moment
+    # the app module was imported). `marks` are points in time such as the
+    # first paint; `phases` are durations of the steps that lead to them.
+
+    def __init__(self, started=None, on_settled=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.on_settled = on_settled
+        self.phases = []
+        self.marks = {}
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - begin))
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.started
+
+    def settle(self):
+        self.mark("settled")
+        if self.on_settled:
+            callback, self.on_settled = self.on_settled, None
+            callback(self)
+
+    def report(self):
+        lines = ["Startup profile (ms desde o import do app)"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<28}{seconds * 1000:9.1f}")
+        for name, seconds in sorted(self.marks.items(), key=lambda item: item[1]):
+            lines.append(f"  @ {name:<26}{seconds * 1000:9.1f}")
+        if getattr(sys, "frozen", False):
+            lines.append("  (executavel PyInstaller: o tempo de descompactacao vem antes destas medidas)")
+        return "\n".join(lines)
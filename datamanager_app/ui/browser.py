@@ -1,13 +1,35 @@
 ﻿
-import json
 import os
 import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from tkinter import font as tkfont
 
-from datamanager_app.db.manager import db_manager
+from datamanager_app.db.exporter import FORMATS as EXPORT_FORMATS
+from datamanager_app.db.exporter import iter_export
+from datamanager_app.db.importer import column_affinity, iter_import_csv
+from datamanager_app.db.manager import FILTER_OPERATORS, db_manager
+from datamanager_app.db.profiles import DEFAULT_PROFILE, PROFILES
+from datamanager_app.db.timing import tracer
+from datamanager_app.settings import SettingsStore
+from datamanager_app.startup import StartupProfiler
+from datamanager_app.ui.console import SqlConsole
+from datamanager_app.ui.grid import TableGrid
+from datamanager_app.ui.tasks import TaskRunner
 from datamanager_app.ui.theme import theme
+from datamanager_app.ui.watcher import LiveRefresh
+
+# How much of a value the viewer window loads into its Text widget.
+VALUE_VIEW_TEXT_BYTES = 1024 * 1024
+VALUE_VIEW_BLOB_BYTES = 64 * 1024
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            break
+        size /= 1024
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
 
 
 class RoundedButton(tk.Canvas):
@@ -121,7 +143,7 @@ class RoundedButton(tk.Canvas):
             text_x,
             height // 2,
             text=display_text,
-            fill=self._colors.get("fg", "#ffffff"),
+            fill=self._colors.get("disabled_fg" if self._state == "disabled" else "fg", "#ffffff"),
             font=self._font,
             anchor=anchor,
         )
@@ -135,6 +157,11 @@ class RoundedButton(tk.Canvas):
         self._text = text
         self._draw()
 
+    def set_state(self, state):
+        if state != self._state:
+            self._state = state
+            self._draw()
+
     def _on_enter(self, _event):
         if self._state != "disabled":
             self.itemconfig(self._rect_id, fill=self._colors.get("hover", "#1b3f5c"))
@@ -180,15 +207,68 @@ class DBBrowser:
             "btn_insert": "Inserir",
             "btn_edit": "Editar",
             "btn_delete": "Excluir",
+            "btn_value": "Valor",
+            "btn_batch": "Modo lote",
+            "btn_batch_on": "Modo lote: ativo",
+            "btn_apply": "Aplicar",
+            "btn_revert": "Reverter",
+            "pending_changes": "{count} alteracoes pendentes",
+            "filter_label": "Filtro",
+            "btn_filter": "Filtrar",
+            "btn_clear_filter": "Limpar",
+            "filter_none": "Sem filtros",
+            "op_contains": "contem",
+            "op_starts": "comeca com",
+            "op_is_null": "e nulo",
+            "op_not_null": "nao e nulo",
+            "btn_search": "Buscar",
+            "btn_search_index": "Indice de busca",
+            "tab_table": "Tabela",
+            "tab_sql": "Console SQL",
+            "btn_run": "Executar",
+            "btn_plan": "Plano",
+            "btn_stop": "Parar",
+            "plan_label": "Plano de execucao (EXPLAIN QUERY PLAN)",
+            "console_rows": "{rows} linhas em {ms} ms ({rate} linhas/s)",
+            "console_truncated": " | exibindo as primeiras {shown}",
+            "console_affected": "{count} linhas afetadas em {ms} ms",
+            "console_running": "{rows} linhas recebidas...",
             "db_none_open": "Nenhum banco aberto",
             "sidebar_tables": "Tabelas",
+            "sidebar_indexes": "Indices",
+            "btn_index_add": "Novo",
+            "btn_index_drop": "Remover",
+            "btn_index_advice": "Sugestoes",
             "footer_credit": "By Jayks <3",
+            "status_loading": "Carregando...",
+            "status_rows": "{rows} linhas | primeira linha em {first} ms | total {total} ms",
             "menu_options": "Opcoes",
             "menu_file": "Arquivo",
             "menu_theme": "Tema",
             "menu_language": "Idioma",
+            "menu_profile": "Perfil de desempenho",
+            "menu_show_pragmas": "Ver PRAGMAs ativos",
+            "menu_live_refresh": "Atualizar quando outro programa gravar",
+            "profile_safe": "Seguro",
+            "profile_fast-write": "Escrita rapida",
+            "profile_bulk-load": "Carga em massa",
+            "profile_read-heavy": "Leitura intensa",
             "menu_create_db": "Criar DB",
             "menu_open_db": "Abrir DB",
+            "menu_open_db_ro": "Abrir somente leitura...",
+            "menu_open_db_immutable": "Abrir imutavel (arquivo estatico)...",
+            "db_read_only": "somente leitura",
+            "db_immutable": "imutavel",
+            "menu_attach_db": "Anexar banco...",
+            "menu_detach_db": "Desanexar banco",
+            "menu_copy_table": "Copiar tabela...",
+            "menu_import_csv": "Importar CSV",
+            "menu_export_timings": "Exportar tempos (JSON)",
+            "timing_last": "{name}: {total} ms ({phases}) | {rows} linhas",
+            "timing_query": "consulta",
+            "timing_fetch": "leitura",
+            "timing_render": "tela",
+            "menu_export": "Exportar dados",
             "theme_dark": "Escuro",
             "theme_divas": "For Divas",
             "lang_pt": "Portugues",
@@ -205,15 +285,68 @@ class DBBrowser:
             "btn_insert": "Insert",
             "btn_edit": "Edit",
             "btn_delete": "Delete",
+            "btn_value": "Value",
+            "btn_batch": "Batch mode",
+            "btn_batch_on": "Batch mode: on",
+            "btn_apply": "Apply",
+            "btn_revert": "Revert",
+            "pending_changes": "{count} pending changes",
+            "filter_label": "Filter",
+            "btn_filter": "Filter",
+            "btn_clear_filter": "Clear",
+            "filter_none": "No filters",
+            "op_contains": "contains",
+            "op_starts": "starts with",
+            "op_is_null": "is null",
+            "op_not_null": "is not null",
+            "btn_search": "Search",
+            "btn_search_index": "Search index",
+            "tab_table": "Table",
+            "tab_sql": "SQL console",
+            "btn_run": "Run",
+            "btn_plan": "Plan",
+            "btn_stop": "Stop",
+            "plan_label": "Query plan (EXPLAIN QUERY PLAN)",
+            "console_rows": "{rows} rows in {ms} ms ({rate} rows/s)",
+            "console_truncated": " | showing the first {shown}",
+            "console_affected": "{count} rows affected in {ms} ms",
+            "console_running": "{rows} rows received...",
             "db_none_open": "No database open",
             "sidebar_tables": "Tables",
+            "sidebar_indexes": "Indexes",
+            "btn_index_add": "New",
+            "btn_index_drop": "Drop",
+            "btn_index_advice": "Advice",
             "footer_credit": "By Jayks <3",
+            "status_loading": "Loading...",
+            "status_rows": "{rows} rows | first row in {first} ms | total {total} ms",
             "menu_options": "Options",
             "menu_file": "File",
             "menu_theme": "Theme",
             "menu_language": "Language",
+            "menu_profile": "Performance profile",
+            "menu_show_pragmas": "Show active PRAGMAs",
+            "menu_live_refresh": "Refresh when another program writes",
+            "profile_safe": "Safe",
+            "profile_fast-write": "Fast write",
+            "profile_bulk-load": "Bulk load",
+            "profile_read-heavy": "Read heavy",
             "menu_create_db": "Create DB",
             "menu_open_db": "Open DB",
+            "menu_open_db_ro": "Open read-only...",
+            "menu_open_db_immutable": "Open immutable (static file)...",
+            "db_read_only": "read-only",
+            "db_immutable": "immutable",
+            "menu_attach_db": "Attach database...",
+            "menu_detach_db": "Detach database",
+            "menu_copy_table": "Copy table...",
+            "menu_import_csv": "Import CSV",
+            "menu_export_timings": "Export timings (JSON)",
+            "timing_last": "{name}: {total} ms ({phases}) | {rows} rows",
+            "timing_query": "query",
+            "timing_fetch": "fetch",
+            "timing_render": "render",
+            "menu_export": "Export data",
             "theme_dark": "Dark",
             "theme_divas": "For Divas",
             "lang_pt": "Portuguese",
@@ -230,15 +363,68 @@ class DBBrowser:
             "btn_insert": "Inserir",
             "btn_edit": "Editar",
             "btn_delete": "Excluir",
+            "btn_value": "Valor",
+            "btn_batch": "Modo lote",
+            "btn_batch_on": "Modo lote: ativo",
+            "btn_apply": "Aplicar",
+            "btn_revert": "Reverter",
+            "pending_changes": "{count} alteracoes pendentes",
+            "filter_label": "Filtro",
+            "btn_filter": "Filtrar",
+            "btn_clear_filter": "Limpar",
+            "filter_none": "Sem filtros",
+            "op_contains": "contem",
+            "op_starts": "comeca com",
+            "op_is_null": "e nulo",
+            "op_not_null": "nao e nulo",
+            "btn_search": "Buscar",
+            "btn_search_index": "Indice de busca",
+            "tab_table": "Tabela",
+            "tab_sql": "Console SQL",
+            "btn_run": "Executar",
+            "btn_plan": "Plano",
+            "btn_stop": "Parar",
+            "plan_label": "Plano de execucao (EXPLAIN QUERY PLAN)",
+            "console_rows": "{rows} linhas em {ms} ms ({rate} linhas/s)",
+            "console_truncated": " | exibindo as primeiras {shown}",
+            "console_affected": "{count} linhas afetadas em {ms} ms",
+            "console_running": "{rows} linhas recebidas...",
             "db_none_open": "Nenhum banco aberto",
             "sidebar_tables": "Tabelas",
+            "sidebar_indexes": "Indices",
+            "btn_index_add": "Novo",
+            "btn_index_drop": "Remover",
+            "btn_index_advice": "Sugestoes",
             "footer_credit": "By Jayks <3",
+            "status_loading": "Carregando...",
+            "status_rows": "{rows} linhas | primeira linha em {first} ms | total {total} ms",
             "menu_options": "Opcoes",
             "menu_file": "Arquivo",
             "menu_theme": "Tema",
             "menu_language": "Idioma",
+            "menu_profile": "Perfil de desempenho",
+            "menu_show_pragmas": "Ver PRAGMAs ativos",
+            "menu_live_refresh": "Atualizar quando outro programa gravar",
+            "profile_safe": "Seguro",
+            "profile_fast-write": "Escrita rapida",
+            "profile_bulk-load": "Carga em massa",
+            "profile_read-heavy": "Leitura intensa",
             "menu_create_db": "Criar DB",
             "menu_open_db": "Abrir DB",
+            "menu_open_db_ro": "Abrir somente leitura...",
+            "menu_open_db_immutable": "Abrir imutavel (arquivo estatico)...",
+            "db_read_only": "somente leitura",
+            "db_immutable": "imutavel",
+            "menu_attach_db": "Anexar banco...",
+            "menu_detach_db": "Desanexar banco",
+            "menu_copy_table": "Copiar tabela...",
+            "menu_import_csv": "Importar CSV",
+            "menu_export_timings": "Exportar tempos (JSON)",
+            "timing_last": "{name}: {total} ms ({phases}) | {rows} linhas",
+            "timing_query": "consulta",
+            "timing_fetch": "leitura",
+            "timing_render": "tela",
+            "menu_export": "Exportar dados",
             "theme_dark": "Escuro",
             "theme_divas": "For Divas",
             "lang_pt": "Portugues",
@@ -248,28 +434,66 @@ class DBBrowser:
     }
     SUPPORTED_LANGUAGES = ("pt", "en", "kg")
 
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
+        self.profiler = profiler or StartupProfiler()
         self.root.title("DataManager")
         self.root.geometry("1180x700")
         self.root.minsize(980, 620)
         self.theme_options = ("dark", "for_divas")
         self.current_table = None
         self.columns = []
+        self.batch_mode = False
+        self.pending_changes = []
         self.rounded_buttons = []
         self._icon_cache = {}
+        self._icon_dirs = None
         self._egg_overlay = None
         self._egg_after_id = None
-        self._settings_path = self._get_settings_path()
-        self._load_theme_preference()
-        self._load_language_preference()
+        self.sql_console = None
+        self.file_menu = None
+        self.tasks = TaskRunner(self.root, on_busy=self._on_busy_changed)
+        tracer.listeners.append(self._on_span_finished)
+        with self.profiler.phase("settings"):
+            # Read once; changes are written in the background (see SettingsStore).
+            self.settings = SettingsStore(self._get_settings_path())
+            self._load_theme_preference()
+            self._load_language_preference()
+        self.watcher = LiveRefresh(self.root, self.tasks, self._on_external_change)
+        self.watcher.enabled = bool(self.settings.get("live_refresh", True))
+        self.live_refresh_var = tk.BooleanVar(value=self.watcher.enabled)
         self.theme_var = tk.StringVar(value=theme.current)
+        self.profile_var = tk.StringVar(value=DEFAULT_PROFILE)
         self.language_var = tk.StringVar(value=self.language)
-        self._set_window_icon()
-        self.create_ui()
-        self._bind_shortcuts()
-        self.apply_theme()
-        self.root.after(0, self._try_open_last_sqlite)
+        # Only what the first frame shows is built here; menus, the window
+        # icon, the SQL console and the last database come after the paint.
+        with self.profiler.phase("build ui"):
+            self.create_ui()
+            self._bind_shortcuts()
+        with self.profiler.phase("apply theme"):
+            self.apply_theme()
+        self.root.bind("<Map>", self._on_first_map, add="+")
+
+    def _on_first_map(self, event):
+        if event.widget is not self.root:
+            return
+        self.root.unbind("<Map>")
+        # Idle callbacks run after Tk has redrawn, so this is the first paint.
+        self.root.after_idle(self._finish_startup)
+
+    def _finish_startup(self):
+        self.profiler.mark("first paint")
+        with self.profiler.phase("deferred ui"):
+            self._create_menu()
+            self._set_window_icon()
+        self._try_open_last_sqlite()
+        self._wait_startup_settled()
+
+    def _wait_startup_settled(self):
+        if self.tasks.busy:
+            self.root.after(self.tasks.POLL_MS, self._wait_startup_settled)
+            return
+        self.profiler.settle()
 
     # ========================================================
     # UI
@@ -346,7 +570,6 @@ class DBBrowser:
             style="Topbar.TLabel",
         )
         self.db_label.pack(side="right", padx=12)
-        self._create_menu()
 
     def create_body(self):
         body = ttk.Frame(self.main)
@@ -357,6 +580,24 @@ class DBBrowser:
     def create_footer(self):
         self.footer = ttk.Frame(self.main, style="Topbar.TFrame")
         self.footer.pack(fill="x")
+        self.progress = ttk.Progressbar(
+            self.footer,
+            mode="indeterminate",
+            length=120,
+            style="Footer.Horizontal.TProgressbar",
+        )
+        self.status_label = ttk.Label(
+            self.footer,
+            text="",
+            style="Topbar.TLabel",
+        )
+        self.status_label.pack(side="left", padx=12, pady=(0, 8))
+        self.timing_label = ttk.Label(
+            self.footer,
+            text="",
+            style="Topbar.TLabel",
+        )
+        self.timing_label.pack(side="left", padx=12, pady=(0, 8))
         self.credit_label = ttk.Label(
             self.footer,
             text="",
@@ -375,15 +616,78 @@ class DBBrowser:
         )
         self.sidebar_label.pack(anchor="w", padx=12, pady=(12, 6))
 
-        self.tables_list = tk.Listbox(self.sidebar, activestyle="none", bd=0)
+        self.tables_list = tk.Listbox(self.sidebar, activestyle="none", bd=0, exportselection=False)
         self.tables_list.pack(fill="both", expand=True, padx=12, pady=(0, 12))
         self.tables_list.bind("<<ListboxSelect>>", self.on_table_select)
+        # One entry per listbox row; None for the header of an attached file,
+        # whose alias is in _schema_rows.
+        self._table_names = []
+        self._schema_rows = {}
+        self._attached = {}
+        self._table_stats = {}
+        self._table_sizes = {}
+        self._stats_epoch = 0
+
+        self.indexes_label = ttk.Label(
+            self.sidebar,
+            text="",
+            style="Sidebar.TLabel",
+        )
+        self.indexes_label.pack(anchor="w", padx=12, pady=(0, 6))
+
+        self.indexes_list = tk.Listbox(self.sidebar, activestyle="none", bd=0, height=6, exportselection=False)
+        self.indexes_list.pack(fill="x", padx=12, pady=(0, 6))
+        self._index_names = []
+
+        index_actions = ttk.Frame(self.sidebar, style="Sidebar.TFrame")
+        index_actions.pack(fill="x", padx=8, pady=(0, 12))
+
+        self.index_add_button = RoundedButton(
+            index_actions,
+            text="",
+            command=self.create_index,
+            icon_text="+",
+            radius=10,
+            padding=(8, 5),
+            font=("Segoe UI", 9, "bold"),
+        )
+        self.index_add_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.index_add_button)
+
+        self.index_drop_button = RoundedButton(
+            index_actions,
+            text="",
+            command=self.drop_index,
+            icon_text="×",
+            radius=10,
+            padding=(8, 5),
+            font=("Segoe UI", 9, "bold"),
+        )
+        self.index_drop_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.index_drop_button)
+
+        self.index_advice_button = RoundedButton(
+            index_actions,
+            text="",
+            command=self.show_index_advice,
+            icon_text="?",
+            radius=10,
+            padding=(8, 5),
+            font=("Segoe UI", 9, "bold"),
+        )
+        self.index_advice_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.index_advice_button)
 
     def create_table_area(self, parent):
         self.area = ttk.Frame(parent)
         self.area.pack(side="right", fill="both", expand=True)
 
-        self.toolbar = ttk.Frame(self.area)
+        self.notebook = ttk.Notebook(self.area)
+        self.notebook.pack(fill="both", expand=True)
+        self.table_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.table_tab, text="")
+
+        self.toolbar = ttk.Frame(self.table_tab)
         self.toolbar.pack(fill="x", pady=(0, 8))
 
         self.insert_button = RoundedButton(
@@ -419,11 +723,392 @@ class DBBrowser:
         self.delete_button.pack(side="left", padx=4)
         self.rounded_buttons.append(self.delete_button)
 
-        self.table_card = ttk.Frame(self.area, style="Card.TFrame")
+        self.value_button = RoundedButton(
+            self.toolbar,
+            text="",
+            command=self.open_value_viewer,
+            icon_text="⊡",
+            radius=12,
+        )
+        self.value_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.value_button)
+
+        self.batch_button = RoundedButton(
+            self.toolbar,
+            text="",
+            command=self.toggle_batch_mode,
+            icon_text="≡",
+            radius=12,
+        )
+        self.batch_button.pack(side="left", padx=(16, 4))
+        self.rounded_buttons.append(self.batch_button)
+
+        self.revert_button = RoundedButton(
+            self.toolbar,
+            text="",
+            command=self.revert_changes,
+            icon_text="↺",
+            radius=12,
+        )
+        self.rounded_buttons.append(self.revert_button)
+
+        self.apply_button = RoundedButton(
+            self.toolbar,
+            text="",
+            command=self.apply_changes,
+            icon_text="✓",
+            radius=12,
+        )
+        self.rounded_buttons.append(self.apply_button)
+
+        self.pending_label = ttk.Label(self.toolbar, text="")
+
+        self.create_filter_bar(self.table_tab)
+
+        self.table_card = ttk.Frame(self.table_tab, style="Card.TFrame")
         self.table_card.pack(fill="both", expand=True)
 
+        self.tree_scrollbar = ttk.Scrollbar(
+            self.table_card,
+            orient="vertical",
+            style="Vertical.TScrollbar",
+        )
+        self.tree_scrollbar.pack(side="right", fill="y", padx=(0, 8), pady=8)
+
         self.tree = ttk.Treeview(self.table_card)
-        self.tree.pack(fill="both", expand=True, padx=8, pady=8)
+        self.tree.pack(fill="both", expand=True, padx=(8, 0), pady=8)
+        self.table_grid = TableGrid(
+            self.tree,
+            self.tree_scrollbar,
+            self.tasks,
+            on_status=self._show_job_status,
+            on_error=lambda exc: self._show_error("Erro ao carregar tabela", str(exc)),
+        )
+        self._clicked_column = None
+        self.tree.bind("<ButtonRelease-1>", self._remember_column, add="+")
+        self.tree.bind("<Double-1>", self._on_tree_double_click, add="+")
+
+        self.create_console_tab(self.notebook)
+
+    def create_console_tab(self, notebook):
+        # The tab's widgets are built the first time it is selected.
+        self.console_tab = ttk.Frame(notebook)
+        notebook.add(self.console_tab, text="")
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed, add="+")
+
+    def _on_tab_changed(self, _event=None):
+        if self.notebook.select() == str(self.console_tab) and self.sql_console is None:
+            self._build_console()
+
+    def _build_console(self):
+        console_toolbar = ttk.Frame(self.console_tab)
+        console_toolbar.pack(fill="x", pady=(8, 8))
+
+        self.run_sql_button = RoundedButton(
+            console_toolbar,
+            text="",
+            command=self.run_sql,
+            icon_text="▶",
+            radius=12,
+        )
+        self.run_sql_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.run_sql_button)
+
+        self.plan_sql_button = RoundedButton(
+            console_toolbar,
+            text="",
+            command=self.explain_sql,
+            icon_text="⌥",
+            radius=12,
+        )
+        self.plan_sql_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.plan_sql_button)
+
+        self.stop_sql_button = RoundedButton(
+            console_toolbar,
+            text="",
+            command=self.stop_sql,
+            icon_text="■",
+            radius=12,
+        )
+        self.stop_sql_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.stop_sql_button)
+
+        self.console_status = ttk.Label(console_toolbar, text="")
+        self.console_status.pack(side="left", padx=12)
+
+        self.sql_editor = tk.Text(self.console_tab, height=7, wrap="none", undo=True, bd=0)
+        self.sql_editor.pack(fill="x", padx=4)
+        self.sql_editor.bind("<Control-Return>", lambda _event: self.run_sql() or "break")
+        self.sql_editor.bind("<F5>", lambda _event: self.run_sql() or "break")
+
+        panes = ttk.PanedWindow(self.console_tab, orient="horizontal")
+        panes.pack(fill="both", expand=True, pady=(8, 0))
+
+        results_card = ttk.Frame(panes, style="Card.TFrame")
+        panes.add(results_card, weight=3)
+        results_scroll_y = ttk.Scrollbar(results_card, orient="vertical", style="Vertical.TScrollbar")
+        results_scroll_y.pack(side="right", fill="y", padx=(0, 8), pady=8)
+        results_scroll_x = ttk.Scrollbar(results_card, orient="horizontal")
+        results_scroll_x.pack(side="bottom", fill="x", padx=(8, 0), pady=(0, 8))
+        self.results_tree = ttk.Treeview(results_card, show="headings")
+        self.results_tree.pack(fill="both", expand=True, padx=(8, 0), pady=(8, 0))
+        self.results_tree.configure(
+            yscrollcommand=results_scroll_y.set,
+            xscrollcommand=results_scroll_x.set,
+        )
+        results_scroll_y.configure(command=self.results_tree.yview)
+        results_scroll_x.configure(command=self.results_tree.xview)
+
+        plan_card = ttk.Frame(panes, style="Card.TFrame")
+        panes.add(plan_card, weight=1)
+        self.plan_label = ttk.Label(plan_card, text="", style="Card.TLabel")
+        self.plan_label.pack(anchor="w", padx=8, pady=(8, 4))
+        self.plan_tree = ttk.Treeview(plan_card, show="tree")
+        self.plan_tree.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+
+        self.sql_console = SqlConsole(
+            self.sql_editor,
+            self.results_tree,
+            self.plan_tree,
+            self.tasks,
+            on_status=self._show_console_status,
+            on_error=lambda exc: self._show_error("Erro no SQL", str(exc)),
+            on_finished=self._on_sql_finished,
+        )
+        self._apply_console_texts()
+        self._apply_console_theme(theme.COLORS[theme.current])
+        self._apply_rounded_button_theme(self.run_sql_button, theme.COLORS[theme.current])
+        self._apply_rounded_button_theme(self.plan_sql_button, theme.COLORS[theme.current])
+        self._apply_rounded_button_theme(self.stop_sql_button, theme.COLORS[theme.current])
+
+    def run_sql(self):
+        if not db_manager.current:
+            self._show_warning("Aviso", "Abra um banco de dados primeiro.")
+            return
+        with tracer.action("run_sql"):
+            self.sql_console.execute()
+
+    def explain_sql(self):
+        if not db_manager.current:
+            self._show_warning("Aviso", "Abra um banco de dados primeiro.")
+            return
+        self.sql_console.explain()
+
+    def stop_sql(self):
+        self.sql_console.cancel()
+        self.console_status.config(text="")
+
+    def _show_console_status(self, job, result):
+        if result is None:
+            self.console_status.config(text=self._t("console_running").format(rows=job.rows))
+            return
+        ms = f"{result['seconds'] * 1000:.0f}"
+        if not self.sql_console.columns:
+            text = self._t("console_affected").format(count=max(result["rowcount"], 0), ms=ms)
+        else:
+            text = self._t("console_rows").format(rows=result["rows"], ms=ms, rate=f"{result['rate']:,.0f}")
+            if result["truncated"]:
+                text += self._t("console_truncated").format(shown=self.sql_console.MAX_ROWS)
+        self.console_status.config(text=text)
+
+    def _on_sql_finished(self, _sql, result):
+        # Statements without a result set, and DML with RETURNING, may have
+        # changed tables or rows.
+        if not result.get("changed"):
+            return
+        self.refresh_tables()
+        if self.current_table:
+            self.table_grid.refresh()
+
+    def create_filter_bar(self, parent):
+        self.filter_bar = ttk.Frame(parent)
+        self.filter_bar.pack(fill="x", pady=(0, 8))
+
+        self.filter_title = ttk.Label(self.filter_bar, text="")
+        self.filter_title.pack(side="left", padx=(4, 8))
+
+        self.filter_column = ttk.Combobox(self.filter_bar, values=[], width=16, state="readonly")
+        self.filter_column.pack(side="left", padx=4)
+
+        self.filter_operator = ttk.Combobox(self.filter_bar, values=[], width=12, state="readonly")
+        self.filter_operator.pack(side="left", padx=4)
+
+        self.filter_value = ttk.Entry(self.filter_bar, width=24)
+        self.filter_value.pack(side="left", padx=4)
+        self.filter_value.bind("<Return>", lambda _event: self.add_filter())
+
+        self.filter_button = RoundedButton(
+            self.filter_bar,
+            text="",
+            command=self.add_filter,
+            icon_text="⚲",
+            radius=12,
+        )
+        self.filter_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.filter_button)
+
+        self.clear_filter_button = RoundedButton(
+            self.filter_bar,
+            text="",
+            command=self.clear_filters,
+            radius=12,
+        )
+        self.clear_filter_button.pack(side="left", padx=4)
+        self.rounded_buttons.append(self.clear_filter_button)
+
+        self.search_index_button = RoundedButton(
+            self.filter_bar,
+            text="",
+            command=self.configure_search_index,
+            radius=12,
+        )
+        self.search_index_button.pack(side="right", padx=4)
+        self.rounded_buttons.append(self.search_index_button)
+
+        self.search_button = RoundedButton(
+            self.filter_bar,
+            text="",
+            command=self.search_table,
+            icon_text="⌕",
+            radius=12,
+        )
+        self.search_button.pack(side="right", padx=4)
+        self.rounded_buttons.append(self.search_button)
+
+        self.search_entry = ttk.Entry(self.filter_bar, width=24)
+        self.search_entry.pack(side="right", padx=4)
+        self.search_entry.bind("<Return>", lambda _event: self.search_table())
+
+        self.filter_summary = ttk.Label(self.filter_bar, text="")
+        self.filter_summary.pack(side="left", padx=8)
+
+    def _filter_operator_labels(self):
+        labels = {}
+        for op in FILTER_OPERATORS:
+            labels[self._t(f"op_{op}") if op[0].isalpha() else op] = op
+        return labels
+
+    def _update_filter_bar(self):
+        self.filter_title.config(text=self._t("filter_label"))
+        self.filter_button.set_text(self._t("btn_filter"))
+        self.clear_filter_button.set_text(self._t("btn_clear_filter"))
+        self.search_button.set_text(self._t("btn_search"))
+        self.search_index_button.set_text(self._t("btn_search_index"))
+        labels = list(self._filter_operator_labels())
+        self.filter_operator.configure(values=labels)
+        if self.filter_operator.get() not in labels:
+            self.filter_operator.set(labels[0])
+        columns = list(self.columns)
+        self.filter_column.configure(values=columns)
+        if self.filter_column.get() not in columns:
+            self.filter_column.set(columns[0] if columns else "")
+        filters = self.table_grid.filters
+        if not filters:
+            self.filter_summary.config(text=self._t("filter_none"))
+            return
+        reverse = {op: label for label, op in self._filter_operator_labels().items()}
+        parts = []
+        for column, op, value in filters:
+            text = f"{column} {reverse.get(op, op)}"
+            if FILTER_OPERATORS[op][1] is not None:
+                text += f" '{value}'"
+            parts.append(text)
+        self.filter_summary.config(text=" AND ".join(parts))
+
+    def add_filter(self):
+        if not self.current_table:
+            self._show_warning("Aviso", "Selecione uma tabela para filtrar.")
+            return
+        column = self.filter_column.get()
+        op = self._filter_operator_labels().get(self.filter_operator.get())
+        if not column or not op:
+            return
+        filters = self.table_grid.filters + [(column, op, self.filter_value.get())]
+        self.filter_value.delete(0, tk.END)
+        self.table_grid.set_filters(filters)
+        self._update_filter_bar()
+
+    def search_table(self):
+        if not self.current_table:
+            self._show_warning("Aviso", "Selecione uma tabela para buscar.")
+            return
+        query = self.search_entry.get().strip()
+        if not query:
+            if self.table_grid.search:
+                self.table_grid.set_search(None)
+            return
+        table = self.current_table
+
+        def on_columns(columns):
+            if table != self.current_table:
+                return
+            if columns:
+                self.table_grid.set_search(query)
+                return
+            self._build_search_index(table, on_built=lambda: self.table_grid.set_search(query))
+
+        with tracer.action("search_table", table=table):
+            self.tasks.submit(
+                db_manager.get_fts_columns,
+                table,
+                on_done=on_columns,
+                on_error=lambda exc: self._show_error("Erro na busca", str(exc)),
+            )
+
+    def configure_search_index(self):
+        if not self._check_writable():
+            return
+        if not self.current_table:
+            self._show_warning("Aviso", "Selecione uma tabela.")
+            return
+        table = self.current_table
+        self.tasks.submit(
+            db_manager.get_fts_columns,
+            table,
+            on_done=lambda columns: self._build_search_index(table, selected=columns),
+            on_error=lambda exc: self._show_error("Erro na busca", str(exc)),
+        )
+
+    def _build_search_index(self, table, selected=None, on_built=None):
+        text_columns = [
+            name
+            for name, info in self.table_grid.column_info.items()
+            if column_affinity(info.data_type) == "TEXT"
+        ]
+        if not text_columns:
+            self._show_warning("Aviso", "A tabela nao possui colunas de texto para indexar.")
+            return
+        columns = self.open_search_index_form(table, text_columns, selected or text_columns)
+        if columns is None:
+            return
+        if not columns:
+            self.tasks.submit(
+                db_manager.drop_fts_index,
+                table,
+                on_done=lambda _result: self.table_grid.search and self.table_grid.set_search(None),
+                on_error=lambda exc: self._show_error("Erro ao remover indice", str(exc)),
+            )
+            return
+
+        def on_done(_result):
+            if on_built and table == self.current_table:
+                on_built()
+
+        self.tasks.submit(
+            db_manager.create_fts_index,
+            table,
+            columns,
+            on_done=on_done,
+            on_error=lambda exc: self._show_error("Erro ao criar indice de busca", str(exc)),
+        )
+
+    def clear_filters(self):
+        if not self.table_grid.filters:
+            return
+        self.table_grid.set_filters([])
+        self._update_filter_bar()
+
     # ========================================================
     # DATABASE
     # ========================================================
@@ -437,84 +1122,127 @@ class DBBrowser:
         os.makedirs(base_dir, exist_ok=True)
         return os.path.join(base_dir, "settings.json")
 
-    def _load_settings(self):
-        if not os.path.exists(self._settings_path):
-            return {}
-        try:
-            with open(self._settings_path, "r", encoding="utf-8") as fh:
-                data = json.load(fh)
-            return data if isinstance(data, dict) else {}
-        except Exception:
-            return {}
-
-    def _save_settings(self, settings):
-        os.makedirs(os.path.dirname(self._settings_path), exist_ok=True)
-        with open(self._settings_path, "w", encoding="utf-8") as fh:
-            json.dump(settings, fh, ensure_ascii=True, indent=2)
-
-    def _save_last_db_path(self, path):
-        settings = self._load_settings()
-        settings["last_db_path"] = path
-        self._save_settings(settings)
+    def _save_last_db_path(self, path, mode="read_write"):
+        self.settings.set("last_db_path", path)
+        self.settings.set("last_db_mode", mode)
 
     def _save_theme_preference(self):
-        settings = self._load_settings()
-        settings["theme"] = theme.current
-        self._save_settings(settings)
+        self.settings.set("theme", theme.current)
 
     def _save_language_preference(self):
-        settings = self._load_settings()
-        settings["language"] = self.language
-        self._save_settings(settings)
+        self.settings.set("language", self.language)
 
     def _load_theme_preference(self):
-        settings = self._load_settings()
-        saved_theme = settings.get("theme")
+        saved_theme = self.settings.get("theme")
         if saved_theme in theme.COLORS:
             theme.current = saved_theme
         else:
             theme.current = "dark"
 
     def _load_language_preference(self):
-        settings = self._load_settings()
-        saved_language = settings.get("language")
+        saved_language = self.settings.get("language")
         if saved_language in self.SUPPORTED_LANGUAGES:
             self.language = saved_language
         else:
             self.language = "pt"
 
+    def _load_db_profile(self, path):
+        profiles = self.settings.get("db_profiles")
+        profile = profiles.get(os.path.abspath(path)) if isinstance(profiles, dict) else None
+        return profile if profile in PROFILES else DEFAULT_PROFILE
+
+    def _save_db_profile(self, path, profile):
+        self.settings.set_item("db_profiles", os.path.abspath(path), profile)
+
     def _clear_last_db_path(self):
-        settings = self._load_settings()
-        if "last_db_path" in settings:
-            settings.pop("last_db_path", None)
-            self._save_settings(settings)
-
-    def _open_sqlite_path(self, path, persist_last=True):
-        conn = db_manager.connect_sqlite(path)
-        self.db_label.config(text=conn.name)
-        self.refresh_tables()
-        if persist_last:
-            self._save_last_db_path(path)
+        self.settings.pop("last_db_path")
+
+    def _on_database_opened(self, conn, on_error=None):
+        # Pending batch edits belong to the previous database; they were
+        # applied or discarded before switching (see _settle_pending_changes).
+        self.pending_changes = []
+        self.batch_mode = False
+        self._update_pending_indicator()
+        self.current_table = None
+        self.table_grid.reset()
+        self.watcher.reset()
+        self._update_db_label(conn)
+        self._update_write_actions()
+        self.refresh_tables(on_error=on_error)
+
+    def _settle_pending_changes(self, then):
+        # Runs `then` once no batch edits are pending: asks whether to apply
+        # (on the database they were made on) or discard them first.
+        if not self.pending_changes:
+            then()
+            return
+        answer = messagebox.askyesnocancel(
+            "Alteracoes pendentes",
+            f"Aplicar as {len(self.pending_changes)} alteracoes pendentes antes de trocar de banco?",
+            parent=self.root,
+        )
+        if answer is None:
+            return
+        if answer:
+            self.apply_changes(on_applied=then)
+        else:
+            self.revert_changes()
+            then()
+
+    def _open_sqlite_path(self, path, persist_last=True, on_error=None, mode="read_write"):
+        # Connecting (and importing peewee, the first time) runs on the worker.
+        # mode is "read_write", "read_only" (URI mode=ro) or "immutable".
+        def on_opened(conn):
+            self._on_database_opened(conn, on_error=on_error)
+            if persist_last:
+                self._save_last_db_path(path, mode)
+
+        def on_failed(exc):
+            if on_error:
+                on_error(exc)
+            else:
+                self._show_error("Erro ao abrir", str(exc))
+
+        with tracer.action("open_database"):
+            self.tasks.submit(
+                db_manager.connect_sqlite,
+                path,
+                profile=self._load_db_profile(path),
+                read_only=mode == "read_only",
+                immutable=mode == "immutable",
+                on_done=on_opened,
+                on_error=on_failed,
+            )
 
     def _try_open_last_sqlite(self):
-        settings = self._load_settings()
-        last_db_path = settings.get("last_db_path")
+        last_db_path = self.settings.get("last_db_path")
         if not last_db_path:
             return
         if not os.path.exists(last_db_path):
             self._clear_last_db_path()
             return
-        try:
-            self._open_sqlite_path(last_db_path, persist_last=False)
-        except Exception:
+
+        def on_error(_exc):
             self._clear_last_db_path()
+            db_manager.current = None
+            self.db_label.config(text=self._t("db_none_open"))
+
+        try:
+            self._open_sqlite_path(
+                last_db_path,
+                persist_last=False,
+                on_error=on_error,
+                mode=self.settings.get("last_db_mode", "read_write"),
+            )
+        except Exception as exc:
+            on_error(exc)
 
-    def open_sqlite(self):
+    def open_sqlite(self, mode="read_write"):
         try:
             path = filedialog.askopenfilename(filetypes=[("SQLite", "*.db *.sqlite")])
             if not path:
                 return
-            self._open_sqlite_path(path)
+            self._settle_pending_changes(lambda: self._open_sqlite_path(path, mode=mode))
         except Exception as exc:
             self._show_error("Erro ao abrir", str(exc))
 
@@ -526,14 +1254,121 @@ class DBBrowser:
             )
             if not path:
                 return
-            conn = db_manager.create_sqlite(path)
-            self.db_label.config(text=conn.name)
-            self.refresh_tables()
-            self._save_last_db_path(path)
         except Exception as exc:
             self._show_error("Erro ao criar banco", str(exc))
+            return
+
+        # Creating the file runs on the worker, like opening one.
+        def on_created(conn):
+            self._on_database_opened(conn)
+            self._save_last_db_path(path)
+
+        def create():
+            with tracer.action("create_database"):
+                self.tasks.submit(
+                    db_manager.create_sqlite,
+                    path,
+                    profile=self._load_db_profile(path),
+                    on_done=on_created,
+                    on_error=lambda exc: self._show_error("Erro ao criar banco", str(exc)),
+                )
+
+        self._settle_pending_changes(create)
+
+    def _update_db_label(self, conn=None):
+        conn = conn or db_manager.current
+        if not conn:
+            self.db_label.config(text=self._t("db_none_open"))
+            return
+        self.profile_var.set(conn.profile)
+        if conn.immutable:
+            detail = self._t("db_immutable")
+        elif conn.read_only:
+            detail = self._t("db_read_only")
+        else:
+            detail = self._t("profile_" + conn.profile)
+        self.db_label.config(text=f"{conn.name} | {detail}")
+
+    def _is_read_only(self):
+        return bool(db_manager.current and db_manager.current.read_only)
+
+    def _check_writable(self):
+        if self._is_read_only():
+            self._show_warning("Aviso", "O banco foi aberto somente para leitura.")
+            return False
+        return True
+
+    def _update_write_actions(self):
+        # Browsing a read-only file: everything that writes is greyed out.
+        state = "disabled" if self._is_read_only() else "normal"
+        for button in (
+            self.table_button,
+            self.drop_button,
+            self.insert_button,
+            self.edit_button,
+            self.delete_button,
+            self.batch_button,
+            self.apply_button,
+            self.index_add_button,
+            self.index_drop_button,
+            self.search_index_button,
+        ):
+            button.set_state(state)
+        if self.file_menu is not None:
+            for key in ("menu_import_csv", "menu_copy_table"):
+                self.file_menu.entryconfig(self._t(key), state=state)
+
+    def _on_profile_selected(self):
+        profile = self.profile_var.get()
+        conn = db_manager.current
+        if not conn:
+            self.profile_var.set(DEFAULT_PROFILE)
+            self._show_warning("Aviso", "Abra ou crie um banco antes de escolher o perfil.")
+            return
+        if profile == conn.profile or profile not in PROFILES:
+            return
+
+        def on_done(new_conn):
+            self._save_db_profile(new_conn.path, profile)
+            self._update_db_label(new_conn)
+            if self.current_table:
+                self.table_grid.refresh()
+
+        def on_error(exc):
+            self.profile_var.set(conn.profile)
+            self._show_error("Erro ao aplicar perfil", str(exc))
+
+        self.tasks.submit(db_manager.set_profile, profile, on_done=on_done, on_error=on_error)
+
+    def show_pragmas(self):
+        if not db_manager.current:
+            self._show_warning("Aviso", "Abra ou crie um banco antes.")
+            return
+
+        def on_done(pragmas):
+            lines = [f"{name} = {value}" for name, value in pragmas.items()]
+            stats = db_manager.statement_stats()
+            lines.append("")
+            lines.append(
+                f"SQL cache: {stats['hits']} hits / {stats['misses']} misses "
+                f"({stats['size']}/{stats['capacity']})"
+            )
+            pages = db_manager.page_cache_stats()
+            lines.append(
+                f"Page cache: {pages['hits']} hits / {pages['misses']} misses "
+                f"({pages['size']} paginas, {_format_bytes(pages['bytes'])}/{_format_bytes(pages['budget'])})"
+            )
+            self._show_info(self._t("menu_show_pragmas"), "\n".join(lines))
+
+        self.tasks.submit(
+            db_manager.get_pragmas,
+            on_done=on_done,
+            on_error=lambda exc: self._show_error("Erro", str(exc)),
+        )
 
     def create_table(self):
+        if not self._check_writable():
+            return
         if not db_manager.current:
             self._show_warning("Aviso", "Abra ou crie um banco antes de criar tabela.")
             return
@@ -542,12 +1377,19 @@ class DBBrowser:
             if result is None:
                 return
             table_name, columns = result
-            db_manager.create_table(table_name, columns)
-            self.refresh_tables()
+            self.tasks.submit(
+                db_manager.create_table,
+                table_name,
+                columns,
+                on_done=lambda _result: self.refresh_tables(),
+                on_error=lambda exc: self._show_error("Erro ao criar tabela", str(exc)),
+            )
         except Exception as exc:
             self._show_error("Erro ao criar tabela", str(exc))
 
     def drop_table(self):
+        if not self._check_writable():
+            return
         if not db_manager.current:
             self._show_warning("Aviso", "Abra ou crie um banco antes de excluir tabela.")
             return
@@ -565,38 +1407,1552 @@ class DBBrowser:
 
         header = tk.Label(
             form,
-            text="Excluir tabela",
+            text="Excluir tabela",
+            bg=colors["panel"],
+            fg=colors["fg"],
+            font=("Segoe UI", 12, "bold"),
+        )
+        header.pack(anchor="w", padx=18, pady=(14, 6))
+
+        message = tk.Label(
+            form,
+            text=f"Tem certeza que deseja excluir a tabela '{self.current_table}'?\nEssa acao nao pode ser desfeita.",
+            bg=colors["panel"],
+            fg=colors["muted"],
+            font=("Segoe UI", 9),
+            justify="left",
+        )
+        message.pack(anchor="w", padx=18, pady=(0, 12))
+
+        footer = tk.Frame(form, bg=colors["panel"])
+        footer.pack(fill="x", padx=18, pady=(0, 16))
+
+        def on_cancel():
+            form.destroy()
+
+        def on_dropped(_result):
+            self.current_table = None
+            self.table_grid.reset()
+            self.refresh_tables()
+
+        def on_confirm():
+            self.tasks.submit(
+                db_manager.drop_table,
+                self.current_table,
+                on_done=on_dropped,
+                on_error=lambda exc: self._show_error("Erro ao excluir tabela", str(exc)),
+            )
+            form.destroy()
+
+        cancel_button = RoundedButton(
+            footer,
+            text="Cancelar",
+            command=on_cancel,
+            radius=12,
+        )
+        cancel_button.pack(side="right", padx=(6, 0))
+
+        confirm_button = RoundedButton(
+            footer,
+            text="Excluir",
+            command=on_confirm,
+            radius=12,
+        )
+        confirm_button.pack(side="right", padx=(0, 6))
+
+        self._apply_rounded_button_theme(cancel_button, colors, secondary=True)
+        self._apply_rounded_button_theme(confirm_button, colors, secondary=False)
+
+        form.bind("<Escape>", lambda _event: on_cancel())
+        form.bind("<Return>", lambda _event: on_confirm())
+
+        form.update_idletasks()
+        self._center_window(form)
+        form.wait_window()
+
+    def import_csv(self):
+        if not self._check_writable():
+            return
+        if not db_manager.current:
+            self._show_warning("Aviso", "Abra ou crie um banco antes de importar.")
+            return
+        options = self.open_import_form()
+        if options is None:
+            return
+
+        def on_finished(result):
+            self.refresh_tables()
+            if options["table"] == self.current_table:
+                self.load_table()
+            if result:
+                self._show_info(
+                    "Importacao concluida",
+                    f"{result['rows']} linhas importadas em {result['seconds']:.1f} s "
+                    f"({result['rate']:.0f} linhas/s).",
+                )
+
+        self._open_progress_dialog(
+            "Importando CSV",
+            iter_import_csv,
+            db_manager,
+            options["path"],
+            options["table"],
+            batch_size=options["batch_size"],
+            create_table=options["create_table"],
+            has_header=options["has_header"],
+            on_finished=on_finished,
+            error_title="Erro ao importar",
+        )
+
+    def export_data(self):
+        if not db_manager.current:
+            self._show_warning("Aviso", "Abra ou crie um banco antes de exportar.")
+            return
+        options = self.open_export_form()
+        if options is None:
+            return
+        extension = f".{options['fmt']}" + (".gz" if options["compress"] else "")
+        path = filedialog.asksaveasfilename(
+            defaultextension=extension,
+            initialfile=(options["table"] or "consulta") + extension,
+            filetypes=[(options["fmt"].upper(), f"*{extension}"), ("Todos", "*.*")],
+        )
+        if not path:
+            return
+
+        def on_finished(result):
+            if result:
+                self._show_info(
+                    "Exportacao concluida",
+                    f"{result['rows']} linhas exportadas em {result['seconds']:.1f} s "
+                    f"({result['rate']:.0f} linhas/s).",
+                )
+
+        self._open_progress_dialog(
+            "Exportando dados",
+            iter_export,
+            db_manager,
+            path,
+            table=options["table"],
+            query=options["query"],
+            fmt=options["fmt"],
+            compress=options["compress"],
+            on_finished=on_finished,
+            error_title="Erro ao exportar",
+        )
+
+    def refresh_tables(self, on_error=None):
+        def job():
+            return db_manager.get_tables(), db_manager.get_attached()
+
+        def on_done(result):
+            tables, attached = result
+            self._table_names = list(tables)
+            self._schema_rows = {}
+            self._attached = {alias: path for alias, path, _tables in attached}
+            for alias, _path, schema_tables in attached:
+                self._schema_rows[len(self._table_names)] = alias
+                self._table_names.append(None)
+                self._table_names.extend(f"{alias}.{table}" for table in schema_tables)
+            self.tables_list.delete(0, tk.END)
+            for index, table in enumerate(self._table_names):
+                self.tables_list.insert(tk.END, self._table_label(table, index))
+            self._style_schema_rows()
+            if self.current_table in self._table_names:
+                index = self._table_names.index(self.current_table)
+                self.tables_list.selection_set(index)
+                self.tables_list.see(index)
+            self.refresh_indexes()
+            self.refresh_table_stats()
+
+        def on_failed(exc):
+            if on_error:
+                on_error(exc)
+            else:
+                self._show_error("Erro ao listar tabelas", str(exc))
+
+        with tracer.action("refresh_tables"):
+            self.tasks.submit(job, on_done=on_done, on_error=on_failed)
+
+    def on_table_select(self, event):
+        selection = self.tables_list.curselection()
+        if not selection:
+            return
+        table = self._table_names[selection[0]]
+        if table is None:
+            return
+        self.current_table = table
+        self.load_table()
+
+    # ========================================================
+    # BANCOS ANEXADOS
+    # ========================================================
+
+    def attach_database(self):
+        if not db_manager.current:
+            self._show_warning("Aviso", "Abra um banco de dados primeiro.")
+            return
+        path = filedialog.askopenfilename(filetypes=[("SQLite", "*.db *.sqlite")])
+        if not path:
+            return
+
+        def on_done(alias):
+            self.status_label.config(text=f"Banco anexado como '{alias}'")
+            self.refresh_tables()
+
+        with tracer.action("attach_database"):
+            self.tasks.submit(
+                db_manager.attach_database,
+                path,
+                on_done=on_done,
+                on_error=lambda exc: self._show_error("Erro ao anexar banco", str(exc)),
+            )
+
+    def _selected_schema(self):
+        # The attached file of the selected sidebar row (header or table).
+        selection = self.tables_list.curselection()
+        if selection:
+            index = selection[0]
+            if index in self._schema_rows:
+                return self._schema_rows[index]
+            schema, dot, _name = self._table_names[index].partition(".")
+            if dot and schema in self._attached:
+                return schema
+        if len(self._attached) == 1:
+            return next(iter(self._attached))
+        return None
+
+    def detach_database(self):
+        alias = self._selected_schema()
+        if alias is None:
+            self._show_warning("Aviso", "Selecione um banco anexado na barra lateral.")
+            return
+
+        def on_done(_result):
+            if self.current_table and self.current_table.startswith(f"{alias}."):
+                self.current_table = None
+                self.table_grid.reset()
+            self.status_label.config(text=f"Banco '{alias}' desanexado")
+            self.refresh_tables()
+
+        self.tasks.submit(
+            db_manager.detach_database,
+            alias,
+            on_done=on_done,
+            on_error=lambda exc: self._show_error("Erro ao desanexar banco", str(exc)),
+        )
+
+    def copy_table(self):
+        if not self._check_writable():
+            return
+        if not self.current_table:
+            self._show_warning("Aviso", "Selecione a tabela de origem.")
+            return
+        source = self.current_table
+        data = self.open_copy_table_form(source, ["main"] + list(self._attached))
+        if data is None:
+            return
+        target = data["name"] if data["schema"] == "main" else f"{data['schema']}.{data['name']}"
+
+        def on_done(count):
+            self.status_label.config(text=f"{count} linha(s) copiada(s) para {target}")
+            self.refresh_tables()
+
+        self.status_label.config(text=f"Copiando {source} para {target}...")
+        with tracer.action("copy_table", source=source, target=target):
+            self.tasks.submit(
+                db_manager.copy_table,
+                source,
+                target,
+                on_done=on_done,
+                on_error=lambda exc: self._show_error("Erro ao copiar tabela", str(exc)),
+            )
+
+    # ========================================================
+    # ESTATISTICAS DAS TABELAS
+    # ========================================================
+
+    def _on_external_change(self):
+        # Another program committed to the open file: re-read the rows on
+        # screen and the sidebar counts, nothing else. Pending batch edits
+        # are drawn on the current rows, so the grid waits until they are
+        # applied or reverted. A commit invalidates every cached count, so
+        # only the table on screen is counted again; the others show their
+        # estimates until the table list is refreshed.
+        if self.current_table and not self.table_grid.loading and not self.pending_changes:
+            self.table_grid.refresh()
+        self.refresh_table_stats(sizes=False, recount=[self.current_table] if self.current_table else [])
+
+    def refresh_table_stats(self, sizes=True, recount=None):
+        # Estimates (sqlite_stat1) and still-valid exact counts are shown at
+        # once; sizes (dbstat) and the missing exact counts follow in the
+        # background, one table at a time so user actions are not held up.
+        # `recount` limits the exact counts to those tables.
+        self._stats_epoch += 1
+        epoch = self._stats_epoch
+
+        def on_stats(stats):
+            if epoch != self._stats_epoch:
+                return
+            self._table_stats = stats
+            self._update_table_labels()
+            if sizes:
+                self.tasks.submit(db_manager.get_table_sizes, on_done=on_sizes, on_error=on_failed, background=True)
+            pending = [
+                table
+                for table, info in stats.items()
+                if not info["exact"] and (recount is None or table in recount)
+            ]
+            if self.current_table in pending:
+                pending.remove(self.current_table)
+                pending.insert(0, self.current_table)
+            count_next(pending)
+
+        def on_sizes(table_sizes):
+            if epoch != self._stats_epoch:
+                return
+            self._table_sizes = table_sizes or {}
+            self._update_table_labels()
+
+        def count_next(pending):
+            if not pending or epoch != self._stats_epoch:
+                return
+            table = pending.pop(0)
+
+            def on_counted(rows):
+                if epoch != self._stats_epoch:
+                    return
+                self._table_stats[table] = {"rows": rows, "exact": True}
+                self._update_table_labels([table])
+                count_next(pending)
+
+            self.tasks.submit(db_manager.count_rows, table, on_done=on_counted, on_error=on_failed, background=True)
+
+        def on_failed(exc):
+            # Statistics are a convenience; a locked or busy file is not worth a dialog.
+            if epoch == self._stats_epoch:
+                self.status_label.config(text=f"Estatisticas indisponiveis: {exc}")
+
+        if not db_manager.current:
+            return
+        self.tasks.submit(db_manager.get_table_stats, on_done=on_stats, on_error=on_failed, background=True)
+
+    def _table_label(self, table, index=None):
+        if table is None:
+            alias = self._schema_rows.get(index)
+            return f"[{alias}] {os.path.basename(self._attached.get(alias, ''))}"
+        # Tables of attached files are listed, indented, under their header.
+        schema, dot, name = table.partition(".")
+        display = f"  {name}" if dot and schema in self._attached else table
+        info = self._table_stats.get(table) or {}
+        parts = []
+        if info.get("rows") is not None:
+            parts.append(f"{'' if info['exact'] else '~'}{info['rows']:,}")
+        if self._table_sizes.get(table) is not None:
+            parts.append(_format_bytes(self._table_sizes[table]))
+        if not parts:
+            return display
+        return f"{display}   {' · '.join(parts)}"
+
+    def _style_schema_rows(self):
+        colors = theme.COLORS[theme.current]
+        for index in self._schema_rows:
+            self.tables_list.itemconfig(index, foreground=colors["muted"], selectforeground=colors["muted"])
+
+    def _update_table_labels(self, tables=None):
+        selected = set(self.tables_list.curselection())
+        for index, table in enumerate(self._table_names):
+            if table is None or (tables is not None and table not in tables):
+                continue
+            label = self._table_label(table, index)
+            if self.tables_list.get(index) == label:
+                continue
+            self.tables_list.delete(index)
+            self.tables_list.insert(index, label)
+            if index in selected:
+                self.tables_list.selection_set(index)
+
+    def load_table(self):
+        def on_loaded():
+            self.columns = self.table_grid.columns
+            self._update_filter_bar()
+
+        with tracer.action("load_table", table=self.current_table):
+            self.table_grid.load(self.current_table, on_loaded=on_loaded)
+        self.refresh_indexes()
+
+    # ========================================================
+    # INDICES
+    # ========================================================
+
+    def refresh_indexes(self):
+        table = self.current_table
+        if not table:
+            self.indexes_list.delete(0, tk.END)
+            self._index_names = []
+            return
+
+        def on_done(indexes):
+            if table != self.current_table:
+                return
+            self.indexes_list.delete(0, tk.END)
+            self._index_names = []
+            # Indexes of attached files are dropped by their qualified name.
+            schema, dot, _name = table.partition(".")
+            prefix = f"{schema}." if dot and schema in self._attached else ""
+            for index in indexes:
+                self._index_names.append(f"{prefix}{index.name}")
+                unique = " *" if index.unique else ""
+                self.indexes_list.insert(tk.END, f"{index.name}{unique} ({', '.join(index.columns)})")
+
+        self.tasks.submit(
+            db_manager.get_indexes,
+            table,
+            on_done=on_done,
+            on_error=lambda exc: self._show_error("Erro ao listar indices", str(exc)),
+        )
+
+    def create_index(self):
+        if not self._check_writable():
+            return
+        if not self.current_table:
+            self._show_warning("Aviso", "Selecione uma tabela para criar o indice.")
+            return
+        table = self.current_table
+        data = self.open_index_form(table, self.columns)
+        if data is None:
+            return
+        self._submit_index(table, data["columns"], name=data["name"], unique=data["unique"])
+
+    def _submit_index(self, table, columns, name=None, unique=False):
+        # Builds on the worker, so the grid stays usable while large indexes are written.
+        def on_done(index_name):
+            self.status_label.config(text=f"Indice {index_name} criado")
+            if table == self.current_table:
+                self.refresh_indexes()
+
+        self.status_label.config(text=f"Criando indice em {table}...")
+        with tracer.action("create_index", table=table, columns=list(columns)):
+            self.tasks.submit(
+                db_manager.create_index,
+                table,
+                columns,
+                name=name,
+                unique=unique,
+                on_done=on_done,
+                on_error=lambda exc: self._show_error("Erro ao criar indice", str(exc)),
+            )
+
+    def drop_index(self):
+        if not self._check_writable():
+            return
+        selection = self.indexes_list.curselection()
+        if not selection:
+            self._show_warning("Aviso", "Selecione um indice para remover.")
+            return
+        name = self._index_names[selection[0]]
+        if not messagebox.askyesno("Remover indice", f"Remover o indice '{name}'?", parent=self.root):
+            return
+        self.tasks.submit(
+            db_manager.drop_index,
+            name,
+            on_done=lambda _result: self.refresh_indexes(),
+            on_error=lambda exc: self._show_error("Erro ao remover indice", str(exc)),
+        )
+
+    def show_index_advice(self):
+        if not db_manager.current:
+            self._show_warning("Aviso", "Abra um banco de dados primeiro.")
+            return
+
+        def on_done(suggestions):
+            if not suggestions:
+                self._show_info(
+                    "Sugestoes de indices",
+                    "Nenhuma sugestao: as consultas registradas ja usam indices.\n"
+                    "Ordene e filtre tabelas para registrar novos padroes.",
+                )
+                return
+            chosen = self.open_index_advice_form(suggestions)
+            for suggestion in chosen or []:
+                self._submit_index(suggestion["table"], suggestion["columns"], name=suggestion["name"])
+
+        self.tasks.submit(
+            db_manager.advise_indexes,
+            on_done=on_done,
+            on_error=lambda exc: self._show_error("Erro ao analisar consultas", str(exc)),
+        )
+    # ========================================================
+    # CRUD
+    # ========================================================
+
+    def insert_row(self):
+        if not self._check_writable():
+            return
+        if not self.current_table:
+            self._show_warning("Aviso", "Selecione uma tabela para inserir.")
+            return
+        table = self.current_table
+        key = self.table_grid.key
+
+        def job(data):
+            lastrowid = db_manager.insert(table, data)
+            row_key = key or db_manager.get_row_key(table)
+            return db_manager.select_row(
+                table,
+                row_key,
+                db_manager.resolve_key(table, row_key, (lastrowid,), data),
+            )
+
+        def on_done(result):
+            if result is not None and table == self.table_grid.table:
+                self.table_grid.insert_row(*result)
+            self.refresh_table_stats(sizes=False)
+
+        try:
+            data = self.open_form("Inserir registro", self.columns, {}, self.table_grid.column_info)
+            if data is None:
+                return
+            if self.batch_mode:
+                self._queue_change({"op": "insert", "table": table, "data": data})
+                return
+            with tracer.action("insert_row", table=table):
+                self.tasks.submit(
+                    job,
+                    data,
+                    on_done=on_done,
+                    on_error=lambda exc: self._show_error("Erro ao inserir", str(exc)),
+                )
+        except Exception as exc:
+            self._show_error("Erro ao inserir", str(exc))
+
+    def edit_row(self):
+        if not self._check_writable():
+            return
+        selected = self.tree.focus()
+        if not selected:
+            self._show_warning("Aviso", "Selecione um registro para editar.")
+            return
+        values = list(self.tree.item(selected)["values"])
+        table = self.current_table
+        key = self.table_grid.key
+        key_value = self.table_grid.key_for(selected)
+        initial = {col: values[i] for i, col in enumerate(self.columns)}
+
+        def job(data):
+            db_manager.update(table, key, key_value, data)
+            return db_manager.select_row(
+                table,
+                key,
+                db_manager.resolve_key(table, key, key_value, data),
+            )
+
+        def on_done(result):
+            if table != self.table_grid.table:
+                return
+            if result is None:
+                self.table_grid.remove_row(selected)
+            else:
+                self.table_grid.replace_row(selected, *result)
+
+        try:
+            data = self.open_form("Editar registro", self.columns, initial, self.table_grid.column_info)
+            if data is None:
+                return
+            # A truncated value left as it was must not overwrite the real one.
+            previews = self.table_grid.previews.get(selected, {})
+            data = {col: value for col, value in data.items() if col not in previews or value != str(previews[col])}
+            if not data:
+                return
+            if self.batch_mode:
+                self._queue_change(
+                    {"op": "update", "table": table, "key": key, "key_value": key_value, "data": data}
+                )
+                self.tree.item(
+                    selected,
+                    values=[data.get(col, values[i]) for i, col in enumerate(self.columns)],
+                    tags=("pending",),
+                )
+                return
+            with tracer.action("edit_row", table=table):
+                self.tasks.submit(
+                    job,
+                    data,
+                    on_done=on_done,
+                    on_error=lambda exc: self._show_error("Erro ao editar", str(exc)),
+                )
+        except Exception as exc:
+            self._show_error("Erro ao editar", str(exc))
+
+    def delete_row(self):
+        if not self._check_writable():
+            return
+        selected = self.tree.focus()
+        if not selected:
+            self._show_warning("Aviso", "Selecione um registro para excluir.")
+            return
+        table = self.current_table
+
+        def on_done(_result):
+            if table == self.table_grid.table:
+                self.table_grid.remove_row(selected)
+            self.refresh_table_stats(sizes=False)
+
+        if self.batch_mode:
+            self._queue_change(
+                {
+                    "op": "delete",
+                    "table": table,
+                    "key": self.table_grid.key,
+                    "key_value": self.table_grid.key_for(selected),
+                }
+            )
+            self.tree.item(selected, tags=("pending_delete",))
+            return
+        try:
+            with tracer.action("delete_row", table=table):
+                self.tasks.submit(
+                    db_manager.delete,
+                    table,
+                    self.table_grid.key,
+                    self.table_grid.key_for(selected),
+                    on_done=on_done,
+                    on_error=lambda exc: self._show_error("Erro ao excluir", str(exc)),
+                )
+        except Exception as exc:
+            self._show_error("Erro ao excluir", str(exc))
+
+    def _remember_column(self, event):
+        column = self.tree.identify_column(event.x)
+        if column.startswith("#") and column[1:].isdigit():
+            index = int(column[1:]) - 1
+            if 0 <= index < len(self.columns):
+                self._clicked_column = self.columns[index]
+
+    def _on_tree_double_click(self, event):
+        self._remember_column(event)
+        item = self.tree.identify_row(event.y)
+        if item and self.table_grid.preview_for(item, self._clicked_column) is not None:
+            self.open_value_viewer()
+            return "break"
+        return None
+
+    def open_value_viewer(self):
+        # Shows one cell in full. The grid only holds a preview of long TEXT
+        # and BLOB values; the viewer streams the rest from the database.
+        selected = self.tree.focus()
+        if not selected or not self.current_table:
+            self._show_warning("Aviso", "Selecione um registro para ver o valor.")
+            return
+        column = self._clicked_column if self._clicked_column in self.columns else None
+        if column is None:
+            previews = self.table_grid.previews.get(selected, {})
+            column = next(iter(previews), None)
+        if column is None:
+            self._show_warning("Aviso", "Clique na coluna cujo valor deseja ver.")
+            return
+        table = self.current_table
+        key = self.table_grid.key
+        key_value = self.table_grid.key_for(selected)
+        self.tasks.submit(
+            db_manager.get_value_info,
+            table,
+            column,
+            key,
+            key_value,
+            on_done=lambda info: self._show_value_window(table, column, info),
+            on_error=lambda exc: self._show_error("Erro ao ler valor", str(exc)),
+        )
+
+    def _show_value_window(self, table, column, info):
+        colors = theme.COLORS[theme.current]
+        form = tk.Toplevel(self.root)
+        form.title(f"{table}.{column}")
+        form.transient(self.root)
+        form.configure(bg=colors["panel"])
+        form.geometry("720x480")
+
+        header = tk.Label(
+            form,
+            text=f"{column}: {info['type'].upper()} | {_format_bytes(info['size'])}",
+            bg=colors["panel"],
+            fg=colors["fg"],
+            font=("Segoe UI", 12, "bold"),
+        )
+        header.pack(anchor="w", padx=18, pady=(14, 4))
+
+        note = tk.Label(
+            form,
+            text="",
+            bg=colors["panel"],
+            fg=colors["muted"],
+            font=("Segoe UI", 9),
+        )
+        note.pack(anchor="w", padx=18, pady=(0, 8))
+
+        footer = tk.Frame(form, bg=colors["panel"])
+        footer.pack(side="bottom", fill="x", padx=18, pady=(0, 16))
+
+        body = tk.Frame(form, bg=colors["panel"])
+        body.pack(fill="both", expand=True, padx=18, pady=(0, 12))
+        scroll = ttk.Scrollbar(body, orient="vertical", style="Vertical.TScrollbar")
+        scroll.pack(side="right", fill="y")
+        text = tk.Text(
+            body,
+            bg=colors["input_bg"],
+            fg=colors["input_fg"],
+            relief="flat",
+            highlightthickness=1,
+            highlightbackground=colors["input_border"],
+            wrap="char",
+            font=("Consolas", 10),
+            yscrollcommand=scroll.set,
+        )
+        text.pack(fill="both", expand=True)
+        scroll.config(command=text.yview)
+
+        # Only the start of a huge value is put in the Text widget; the whole
+        # of it can still be saved to a file.
+        is_blob = info["type"] == "blob"
+        limit = VALUE_VIEW_BLOB_BYTES if is_blob else VALUE_VIEW_TEXT_BYTES
+        state = {"offset": 0, "job": None}
+
+        def on_chunk(chunk):
+            if not text.winfo_exists():
+                return
+            if is_blob:
+                lines = []
+                for start in range(0, len(chunk), 16):
+                    row = chunk[start : start + 16]
+                    ascii_part = "".join(chr(b) if 32 <= b < 127 else "." for b in row)
+                    lines.append(f"{state['offset'] + start:08X}  {row.hex(' ').upper():<47}  {ascii_part}\n")
+                state["offset"] += len(chunk)
+                chunk = "".join(lines)
+            text.insert(tk.END, chunk)
+
+        def on_done(_sent):
+            state["job"] = None
+            if not note.winfo_exists():
+                return
+            if info["type"] not in ("text", "blob"):
+                note.config(text="Valor sem dados de texto ou binarios.")
+            elif info["size"] > limit:
+                note.config(text=f"Mostrando os primeiros {_format_bytes(limit)}; salve em arquivo para ver tudo.")
+            else:
+                note.config(text="")
+            text.config(state="disabled")
+
+        def on_error(exc):
+            state["job"] = None
+            self._show_error("Erro ao ler valor", str(exc))
+
+        note.config(text="Carregando...")
+        state["job"] = self.tasks.submit(
+            db_manager.iter_value,
+            table,
+            column,
+            info["rowid"],
+            limit=limit,
+            on_chunk=on_chunk,
+            on_done=on_done,
+            on_error=on_error,
+        )
+
+        def on_close():
+            if state["job"] is not None:
+                self.tasks.cancel(state["job"])
+            form.destroy()
+
+        def on_save():
+            path = filedialog.asksaveasfilename(parent=form, initialfile=f"{table}_{column}_{info['rowid']}")
+            if not path:
+                return
+            self._open_progress_dialog(
+                "Salvando valor",
+                db_manager.save_value,
+                table,
+                column,
+                info["rowid"],
+                path,
+                error_title="Erro ao salvar valor",
+            )
+
+        def on_replace():
+            if not self._check_writable():
+                return
+            path = filedialog.askopenfilename(parent=form)
+            if not path:
+                return
+
+            def on_finished(_result):
+                if table == self.table_grid.table:
+                    self.table_grid.refresh()
+                self.refresh_table_stats()
+
+            on_close()
+            self._open_progress_dialog(
+                "Substituindo valor",
+                db_manager.replace_value,
+                table,
+                column,
+                info["rowid"],
+                path,
+                on_finished=on_finished,
+                error_title="Erro ao substituir valor",
+            )
+
+        close_button = RoundedButton(footer, text="Fechar", command=on_close, radius=12)
+        close_button.pack(side="right", padx=(6, 0))
+        replace_button = RoundedButton(footer, text="Substituir por arquivo...", command=on_replace, radius=12)
+        replace_button.pack(side="right", padx=(6, 0))
+        save_button = RoundedButton(footer, text="Salvar em arquivo...", command=on_save, radius=12)
+        save_button.pack(side="right", padx=(0, 6))
+
+        self._apply_rounded_button_theme(close_button, colors, secondary=True)
+        self._apply_rounded_button_theme(replace_button, colors, secondary=True)
+        self._apply_rounded_button_theme(save_button, colors, secondary=False)
+        if self._is_read_only():
+            replace_button.set_state("disabled")
+        if info["type"] not in ("text", "blob"):
+            save_button.set_state("disabled")
+
+        form.bind("<Escape>", lambda _event: on_close())
+        form.protocol("WM_DELETE_WINDOW", on_close)
+        self._center_window(form)
+
+    def toggle_batch_mode(self):
+        if not self.batch_mode and not self._check_writable():
+            return
+        if self.batch_mode and self.pending_changes:
+            self._show_warning("Aviso", "Aplique ou reverta as alteracoes pendentes antes de sair do modo lote.")
+            return
+        self.batch_mode = not self.batch_mode
+        self._update_pending_indicator()
+
+    def apply_changes(self, on_applied=None):
+        if not self.pending_changes:
+            return
+        changes = list(self.pending_changes)
+
+        def on_done(_count):
+            del self.pending_changes[: len(changes)]
+            self._update_pending_indicator()
+            if on_applied:
+                on_applied()
+                return
+            self.table_grid.refresh()
+            self.refresh_table_stats(sizes=False)
+
+        with tracer.action("apply_changes", changes=len(changes)):
+            self.tasks.submit(
+                db_manager.apply_batch,
+                changes,
+                on_done=on_done,
+                on_error=lambda exc: self._show_error("Erro ao aplicar alteracoes", str(exc)),
+            )
+
+    def revert_changes(self):
+        if not self.pending_changes:
+            return
+        self.pending_changes = []
+        self._update_pending_indicator()
+        self.table_grid.refresh()
+
+    def _queue_change(self, change):
+        self.pending_changes.append(change)
+        self._update_pending_indicator()
+
+    def _update_pending_indicator(self):
+        self.batch_button.set_text(self._t("btn_batch_on" if self.batch_mode else "btn_batch"))
+        if not self.batch_mode:
+            for widget in (self.pending_label, self.apply_button, self.revert_button):
+                widget.pack_forget()
+            return
+        self.apply_button.set_text(self._t("btn_apply"))
+        self.revert_button.set_text(self._t("btn_revert"))
+        self.pending_label.config(text=self._t("pending_changes").format(count=len(self.pending_changes)))
+        if not self.apply_button.winfo_manager():
+            self.revert_button.pack(side="right", padx=4)
+            self.apply_button.pack(side="right", padx=4)
+            self.pending_label.pack(side="right", padx=8)
+
+    def open_form(self, title, columns, initial_values, column_info=None):
+        colors = theme.COLORS[theme.current]
+        form = tk.Toplevel(self.root)
+        form.title(title)
+        form.transient(self.root)
+        form.grab_set()
+        form.configure(bg=colors["panel"])
+        form.resizable(False, False)
+
+        header = tk.Label(
+            form,
+            text=title,
+            bg=colors["panel"],
+            fg=colors["fg"],
+            font=("Segoe UI", 12, "bold"),
+        )
+        header.pack(anchor="w", padx=18, pady=(14, 8))
+
+        body = tk.Frame(form, bg=colors["panel"])
+        body.pack(fill="both", padx=18, pady=(0, 12))
+        body.grid_rowconfigure(1, weight=1)
+
+        entries = {}
+        column_info = column_info or {}
+        for row, col in enumerate(columns):
+            info = column_info.get(col)
+            label_text = col
+            if info is not None:
+                details = [info.data_type or "ANY"]
+                if info.primary_key:
+                    details.append("PK")
+                label_text = f"{col} ({', '.join(details)})"
+            label = tk.Label(
+                body,
+                text=label_text,
+                bg=colors["panel"],
+                fg=colors["muted"],
+                font=("Segoe UI", 9, "bold"),
+            )
+            label.grid(row=row, column=0, sticky="w", pady=6)
+
+            entry = tk.Entry(
+                body,
+                bg=colors["input_bg"],
+                fg=colors["input_fg"],
+                insertbackground=colors["input_focus"],
+                relief="flat",
+                highlightthickness=1,
+                highlightbackground=colors["input_border"],
+                highlightcolor=colors["input_focus"],
+                width=42,
+                font=("Segoe UI", 10),
+            )
+            entry.grid(row=row, column=1, sticky="ew", padx=(12, 0), pady=6)
+            entry.insert(0, initial_values.get(col, ""))
+            entries[col] = entry
+
+        body.grid_columnconfigure(1, weight=1)
+
+        footer = tk.Frame(form, bg=colors["panel"])
+        footer.pack(fill="x", padx=18, pady=(0, 16))
+
+        result = {"data": None}
+
+        def on_cancel():
+            result["data"] = None
+            form.destroy()
+
+        def on_save():
+            try:
+                payload = {col: entries[col].get() for col in columns}
+                result["data"] = payload
+                form.destroy()
+            except Exception as exc:
+                self._show_error("Erro no formulario", str(exc), parent=form)
+
+        cancel_button = RoundedButton(
+            footer,
+            text="Cancelar",
+            command=on_cancel,
+            radius=12,
+        )
+        cancel_button.pack(side="right", padx=(6, 0))
+
+        save_button = RoundedButton(
+            footer,
+            text="Salvar",
+            command=on_save,
+            radius=12,
+        )
+        save_button.pack(side="right", padx=(0, 6))
+
+        self._apply_rounded_button_theme(cancel_button, colors, secondary=True)
+        self._apply_rounded_button_theme(save_button, colors, secondary=False)
+
+        form.bind("<Escape>", lambda _event: on_cancel())
+        form.bind("<Return>", lambda _event: on_save())
+
+        form.update_idletasks()
+        self._center_window(form)
+        form.wait_window()
+        return result["data"]
+
+    def open_import_form(self):
+        colors = theme.COLORS[theme.current]
+        form = tk.Toplevel(self.root)
+        form.title("Importar CSV")
+        form.transient(self.root)
+        form.grab_set()
+        form.configure(bg=colors["panel"])
+        form.resizable(False, False)
+
+        header = tk.Label(
+            form,
+            text="Importar CSV",
+            bg=colors["panel"],
+            fg=colors["fg"],
+            font=("Segoe UI", 12, "bold"),
+        )
+        header.pack(anchor="w", padx=18, pady=(14, 8))
+
+        body = tk.Frame(form, bg=colors["panel"])
+        body.pack(fill="both", padx=18, pady=(0, 12))
+
+        def make_label(text, row):
+            tk.Label(
+                body,
+                text=text,
+                bg=colors["panel"],
+                fg=colors["muted"],
+                font=("Segoe UI", 9, "bold"),
+            ).grid(row=row, column=0, sticky="w", pady=6)
+
+        def make_entry(row, width=42):
+            entry = tk.Entry(
+                body,
+                bg=colors["input_bg"],
+                fg=colors["input_fg"],
+                insertbackground=colors["input_focus"],
+                relief="flat",
+                highlightthickness=1,
+                highlightbackground=colors["input_border"],
+                highlightcolor=colors["input_focus"],
+                width=width,
+                font=("Segoe UI", 10),
+            )
+            entry.grid(row=row, column=1, sticky="ew", padx=(12, 0), pady=6)
+            return entry
+
+        def make_check(text, variable, row):
+            tk.Checkbutton(
+                body,
+                text=text,
+                variable=variable,
+                bg=colors["panel"],
+                fg=colors["fg"],
+                selectcolor=colors["panel"],
+                activebackground=colors["panel"],
+                activeforeground=colors["fg"],
+            ).grid(row=row, column=1, sticky="w", padx=(8, 0), pady=2)
+
+        make_label("Arquivo", 0)
+        path_entry = make_entry(0)
+        make_label("Tabela", 1)
+        table_entry = make_entry(1)
+        table_entry.insert(0, self.current_table or "")
+        make_label("Linhas por lote", 2)
+        batch_entry = make_entry(2, width=12)
+        batch_entry.grid(sticky="w")
+        batch_entry.insert(0, "5000")
+        header_var = tk.IntVar(value=1)
+        create_var = tk.IntVar(value=0 if self.current_table else 1)
+        make_check("Primeira linha e cabecalho", header_var, 3)
+        make_check("Criar tabela a partir do cabecalho", create_var, 4)
+
+        def on_browse():
+            path = filedialog.askopenfilename(
+                parent=form,
+                filetypes=[("CSV", "*.csv *.txt"), ("Todos", "*.*")],
+            )
+            if not path:
+                return
+            path_entry.delete(0, tk.END)
+            path_entry.insert(0, path)
+            if not table_entry.get().strip():
+                stem = os.path.splitext(os.path.basename(path))[0]
+                table_entry.insert(0, stem.strip().replace(" ", "_"))
+
+        browse_button = RoundedButton(
+            body,
+            text="...",
+            command=on_browse,
+            radius=10,
+        )
+        browse_button.grid(row=0, column=2, padx=(6, 0))
+        self._apply_rounded_button_theme(browse_button, colors, secondary=True)
+
+        body.grid_columnconfigure(1, weight=1)
+
+        footer = tk.Frame(form, bg=colors["panel"])
+        footer.pack(fill="x", padx=18, pady=(0, 16))
+
+        result = {"data": None}
+
+        def on_cancel():
+            result["data"] = None
+            form.destroy()
+
+        def on_save():
+            path = path_entry.get().strip()
+            table = table_entry.get().strip().replace(" ", "_")
+            if not path or not os.path.exists(path) or not table:
+                self._show_error(
+                    "Dados incompletos",
+                    "Informe um arquivo CSV existente e o nome da tabela.",
+                    parent=form,
+                )
+                return
+            try:
+                batch_size = int(batch_entry.get().strip())
+            except ValueError:
+                batch_size = 0
+            if batch_size <= 0:
+                self._show_error("Dados invalidos", "Linhas por lote deve ser um inteiro positivo.", parent=form)
+                return
+            result["data"] = {
+                "path": path,
+                "table": table,
+                "batch_size": batch_size,
+                "has_header": bool(header_var.get()),
+                "create_table": bool(create_var.get()),
+            }
+            form.destroy()
+
+        cancel_button = RoundedButton(
+            footer,
+            text="Cancelar",
+            command=on_cancel,
+            radius=12,
+        )
+        cancel_button.pack(side="right", padx=(6, 0))
+
+        save_button = RoundedButton(
+            footer,
+            text="Importar",
+            command=on_save,
+            radius=12,
+        )
+        save_button.pack(side="right", padx=(0, 6))
+
+        self._apply_rounded_button_theme(cancel_button, colors, secondary=True)
+        self._apply_rounded_button_theme(save_button, colors, secondary=False)
+
+        form.bind("<Escape>", lambda _event: on_cancel())
+        form.bind("<Return>", lambda _event: on_save())
+
+        form.update_idletasks()
+        self._center_window(form)
+        form.wait_window()
+        return result["data"]
+
+    def open_export_form(self):
+        colors = theme.COLORS[theme.current]
+        form = tk.Toplevel(self.root)
+        form.title("Exportar dados")
+        form.transient(self.root)
+        form.grab_set()
+        form.configure(bg=colors["panel"])
+        form.resizable(False, False)
+
+        header = tk.Label(
+            form,
+            text="Exportar dados",
+            bg=colors["panel"],
+            fg=colors["fg"],
+            font=("Segoe UI", 12, "bold"),
+        )
+        header.pack(anchor="w", padx=18, pady=(14, 8))
+
+        body = tk.Frame(form, bg=colors["panel"])
+        body.pack(fill="both", padx=18, pady=(0, 12))
+
+        def make_label(text, row):
+            tk.Label(
+                body,
+                text=text,
+                bg=colors["panel"],
+                fg=colors["muted"],
+                font=("Segoe UI", 9, "bold"),
+            ).grid(row=row, column=0, sticky="nw", pady=6)
+
+        source_var = tk.StringVar(value="table" if self.current_table else "query")
+        make_label("Origem", 0)
+        source_frame = tk.Frame(body, bg=colors["panel"])
+        source_frame.grid(row=0, column=1, sticky="w", padx=(8, 0), pady=6)
+        for value, text in (("table", f"Tabela: {self.current_table or '-'}"), ("query", "Consulta SQL")):
+            tk.Radiobutton(
+                source_frame,
+                text=text,
+                value=value,
+                variable=source_var,
+                state="normal" if value == "query" or self.current_table else "disabled",
+                bg=colors["panel"],
+                fg=colors["fg"],
+                selectcolor=colors["panel"],
+                activebackground=colors["panel"],
+                activeforeground=colors["fg"],
+            ).pack(side="left", padx=(0, 10))
+
+        make_label("Consulta", 1)
+        query_text = tk.Text(
+            body,
+            bg=colors["input_bg"],
+            fg=colors["input_fg"],
+            insertbackground=colors["input_focus"],
+            relief="flat",
+            highlightthickness=1,
+            highlightbackground=colors["input_border"],
+            highlightcolor=colors["input_focus"],
+            width=48,
+            height=5,
+            font=("Consolas", 10),
+        )
+        query_text.grid(row=1, column=1, sticky="ew", padx=(12, 0), pady=6)
+        if self.current_table:
+            query_text.insert("1.0", f"SELECT * FROM {self.current_table}")
+
+        make_label("Formato", 2)
+        format_combo = ttk.Combobox(body, values=list(EXPORT_FORMATS), width=10, state="readonly")
+        format_combo.set(EXPORT_FORMATS[0])
+        format_combo.grid(row=2, column=1, sticky="w", padx=(12, 0), pady=6)
+
+        compress_var = tk.IntVar(value=0)
+        tk.Checkbutton(
+            body,
+            text="Compactar com gzip",
+            variable=compress_var,
+            bg=colors["panel"],
+            fg=colors["fg"],
+            selectcolor=colors["panel"],
+            activebackground=colors["panel"],
+            activeforeground=colors["fg"],
+        ).grid(row=3, column=1, sticky="w", padx=(8, 0), pady=2)
+
+        body.grid_columnconfigure(1, weight=1)
+
+        footer = tk.Frame(form, bg=colors["panel"])
+        footer.pack(fill="x", padx=18, pady=(0, 16))
+
+        result = {"data": None}
+
+        def on_cancel():
+            result["data"] = None
+            form.destroy()
+
+        def on_save():
+            table = None
+            query = None
+            if source_var.get() == "table":
+                table = self.current_table
+            else:
+                query = query_text.get("1.0", tk.END).strip()
+                if not query:
+                    self._show_error("Dados incompletos", "Informe a consulta SQL.", parent=form)
+                    return
+            result["data"] = {
+                "table": table,
+                "query": query,
+                "fmt": format_combo.get(),
+                "compress": bool(compress_var.get()),
+            }
+            form.destroy()
+
+        cancel_button = RoundedButton(
+            footer,
+            text="Cancelar",
+            command=on_cancel,
+            radius=12,
+        )
+        cancel_button.pack(side="right", padx=(6, 0))
+
+        save_button = RoundedButton(
+            footer,
+            text="Exportar",
+            command=on_save,
+            radius=12,
+        )
+        save_button.pack(side="right", padx=(0, 6))
+
+        self._apply_rounded_button_theme(cancel_button, colors, secondary=True)
+        self._apply_rounded_button_theme(save_button, colors, secondary=False)
+
+        form.bind("<Escape>", lambda _event: on_cancel())
+
+        form.update_idletasks()
+        self._center_window(form)
+        form.wait_window()
+        return result["data"]
+
+    def open_search_index_form(self, table, columns, selected):
+        colors = theme.COLORS[theme.current]
+        form = tk.Toplevel(self.root)
+        form.title("Indice de busca")
+        form.transient(self.root)
+        form.grab_set()
+        form.configure(bg=colors["panel"])
+        form.resizable(False, False)
+
+        header = tk.Label(
+            form,
+            text=f"Indice de busca: {table}",
+            bg=colors["panel"],
+            fg=colors["fg"],
+            font=("Segoe UI", 12, "bold"),
+        )
+        header.pack(anchor="w", padx=18, pady=(14, 6))
+
+        message = tk.Label(
+            form,
+            text="Escolha as colunas de texto pesquisaveis (FTS5).\nDesmarque todas para remover o indice.",
+            bg=colors["panel"],
+            fg=colors["muted"],
+            font=("Segoe UI", 9),
+            justify="left",
+        )
+        message.pack(anchor="w", padx=18, pady=(0, 8))
+
+        body = tk.Frame(form, bg=colors["panel"])
+        body.pack(fill="both", padx=18, pady=(0, 12))
+
+        variables = {}
+        for col in columns:
+            var = tk.IntVar(value=1 if col in selected else 0)
+            variables[col] = var
+            tk.Checkbutton(
+                body,
+                text=col,
+                variable=var,
+                bg=colors["panel"],
+                fg=colors["fg"],
+                selectcolor=colors["panel"],
+                activebackground=colors["panel"],
+                activeforeground=colors["fg"],
+            ).pack(anchor="w")
+
+        footer = tk.Frame(form, bg=colors["panel"])
+        footer.pack(fill="x", padx=18, pady=(0, 16))
+
+        result = {"data": None}
+
+        def on_cancel():
+            result["data"] = None
+            form.destroy()
+
+        def on_save():
+            result["data"] = [col for col, var in variables.items() if var.get()]
+            form.destroy()
+
+        cancel_button = RoundedButton(
+            footer,
+            text="Cancelar",
+            command=on_cancel,
+            radius=12,
+        )
+        cancel_button.pack(side="right", padx=(6, 0))
+
+        save_button = RoundedButton(
+            footer,
+            text="Salvar",
+            command=on_save,
+            radius=12,
+        )
+        save_button.pack(side="right", padx=(0, 6))
+
+        self._apply_rounded_button_theme(cancel_button, colors, secondary=True)
+        self._apply_rounded_button_theme(save_button, colors, secondary=False)
+
+        form.bind("<Escape>", lambda _event: on_cancel())
+        form.bind("<Return>", lambda _event: on_save())
+
+        form.update_idletasks()
+        self._center_window(form)
+        form.wait_window()
+        return result["data"]
+
+    def open_index_form(self, table, columns):
+        colors = theme.COLORS[theme.current]
+        form = tk.Toplevel(self.root)
+        form.title("Novo indice")
+        form.transient(self.root)
+        form.grab_set()
+        form.configure(bg=colors["panel"])
+        form.resizable(False, False)
+
+        header = tk.Label(
+            form,
+            text=f"Novo indice em {table}",
+            bg=colors["panel"],
+            fg=colors["fg"],
+            font=("Segoe UI", 12, "bold"),
+        )
+        header.pack(anchor="w", padx=18, pady=(14, 6))
+
+        body = tk.Frame(form, bg=colors["panel"])
+        body.pack(fill="both", padx=18, pady=(0, 12))
+
+        tk.Label(
+            body,
+            text="Nome (opcional)",
+            bg=colors["panel"],
+            fg=colors["muted"],
+            font=("Segoe UI", 9),
+        ).pack(anchor="w")
+        name_entry = ttk.Entry(body, width=36)
+        name_entry.pack(anchor="w", pady=(2, 10))
+
+        tk.Label(
+            body,
+            text="Colunas, na ordem em que forem marcadas",
+            bg=colors["panel"],
+            fg=colors["muted"],
+            font=("Segoe UI", 9),
+        ).pack(anchor="w")
+
+        order = []
+        order_label = tk.Label(
+            body,
+            text="-",
+            bg=colors["panel"],
+            fg=colors["accent"],
+            font=("Segoe UI", 9, "bold"),
+        )
+
+        def on_toggle(col, var):
+            if var.get() and col not in order:
+                order.append(col)
+            elif not var.get() and col in order:
+                order.remove(col)
+            order_label.config(text=", ".join(order) or "-")
+
+        for col in columns:
+            var = tk.IntVar(value=0)
+            tk.Checkbutton(
+                body,
+                text=col,
+                variable=var,
+                command=lambda name=col, value=var: on_toggle(name, value),
+                bg=colors["panel"],
+                fg=colors["fg"],
+                selectcolor=colors["panel"],
+                activebackground=colors["panel"],
+                activeforeground=colors["fg"],
+            ).pack(anchor="w")
+        order_label.pack(anchor="w", pady=(6, 6))
+
+        unique_var = tk.IntVar(value=0)
+        tk.Checkbutton(
+            body,
+            text="Unico (UNIQUE)",
+            variable=unique_var,
+            bg=colors["panel"],
+            fg=colors["fg"],
+            selectcolor=colors["panel"],
+            activebackground=colors["panel"],
+            activeforeground=colors["fg"],
+        ).pack(anchor="w")
+
+        footer = tk.Frame(form, bg=colors["panel"])
+        footer.pack(fill="x", padx=18, pady=(0, 16))
+
+        result = {"data": None}
+
+        def on_cancel():
+            result["data"] = None
+            form.destroy()
+
+        def on_save():
+            if not order:
+                self._show_warning("Aviso", "Marque pelo menos uma coluna.", parent=form)
+                return
+            result["data"] = {
+                "name": name_entry.get().strip() or None,
+                "columns": list(order),
+                "unique": bool(unique_var.get()),
+            }
+            form.destroy()
+
+        cancel_button = RoundedButton(
+            footer,
+            text="Cancelar",
+            command=on_cancel,
+            radius=12,
+        )
+        cancel_button.pack(side="right", padx=(6, 0))
+
+        save_button = RoundedButton(
+            footer,
+            text="Criar",
+            command=on_save,
+            radius=12,
+        )
+        save_button.pack(side="right", padx=(0, 6))
+
+        self._apply_rounded_button_theme(cancel_button, colors, secondary=True)
+        self._apply_rounded_button_theme(save_button, colors, secondary=False)
+
+        form.bind("<Escape>", lambda _event: on_cancel())
+        form.bind("<Return>", lambda _event: on_save())
+
+        form.update_idletasks()
+        self._center_window(form)
+        name_entry.focus_set()
+        form.wait_window()
+        return result["data"]
+
+    def open_copy_table_form(self, source, schemas):
+        colors = theme.COLORS[theme.current]
+        form = tk.Toplevel(self.root)
+        form.title("Copiar tabela")
+        form.transient(self.root)
+        form.grab_set()
+        form.configure(bg=colors["panel"])
+        form.resizable(False, False)
+
+        header = tk.Label(
+            form,
+            text=f"Copiar {source}",
             bg=colors["panel"],
             fg=colors["fg"],
             font=("Segoe UI", 12, "bold"),
         )
         header.pack(anchor="w", padx=18, pady=(14, 6))
 
-        message = tk.Label(
-            form,
-            text=f"Tem certeza que deseja excluir a tabela '{self.current_table}'?\nEssa acao nao pode ser desfeita.",
+        body = tk.Frame(form, bg=colors["panel"])
+        body.pack(fill="both", padx=18, pady=(0, 12))
+
+        tk.Label(
+            body,
+            text="Banco de destino",
             bg=colors["panel"],
             fg=colors["muted"],
             font=("Segoe UI", 9),
-            justify="left",
+        ).pack(anchor="w")
+        # Suggests another file than the source's: usually the point of copying.
+        source_schema = source.partition(".")[0] if source.partition(".")[0] in schemas[1:] else "main"
+        schema_var = tk.StringVar(value="main" if source_schema != "main" else schemas[-1])
+        ttk.Combobox(body, textvariable=schema_var, values=schemas, state="readonly", width=34).pack(
+            anchor="w", pady=(2, 10)
         )
-        message.pack(anchor="w", padx=18, pady=(0, 12))
+
+        tk.Label(
+            body,
+            text="Tabela de destino (criada se nao existir)",
+            bg=colors["panel"],
+            fg=colors["muted"],
+            font=("Segoe UI", 9),
+        ).pack(anchor="w")
+        name_entry = ttk.Entry(body, width=36)
+        name_entry.insert(0, source.rpartition(".")[2])
+        name_entry.pack(anchor="w", pady=(2, 0))
 
         footer = tk.Frame(form, bg=colors["panel"])
         footer.pack(fill="x", padx=18, pady=(0, 16))
 
+        result = {"data": None}
+
         def on_cancel():
+            result["data"] = None
             form.destroy()
 
-        def on_confirm():
-            try:
-                db_manager.drop_table(self.current_table)
-                self.current_table = None
-                self.tree.delete(*self.tree.get_children())
-                self.refresh_tables()
-                form.destroy()
-            except Exception as exc:
-                self._show_error("Erro ao excluir tabela", str(exc), parent=form)
+        def on_save():
+            name = name_entry.get().strip().replace(" ", "_")
+            if not name:
+                self._show_warning("Aviso", "Informe o nome da tabela de destino.", parent=form)
+                return
+            result["data"] = {"schema": schema_var.get(), "name": name}
+            form.destroy()
 
         cancel_button = RoundedButton(
             footer,
@@ -606,107 +2962,30 @@ class DBBrowser:
         )
         cancel_button.pack(side="right", padx=(6, 0))
 
-        confirm_button = RoundedButton(
+        save_button = RoundedButton(
             footer,
-            text="Excluir",
-            command=on_confirm,
+            text="Copiar",
+            command=on_save,
             radius=12,
         )
-        confirm_button.pack(side="right", padx=(0, 6))
+        save_button.pack(side="right", padx=(0, 6))
 
         self._apply_rounded_button_theme(cancel_button, colors, secondary=True)
-        self._apply_rounded_button_theme(confirm_button, colors, secondary=False)
+        self._apply_rounded_button_theme(save_button, colors, secondary=False)
 
         form.bind("<Escape>", lambda _event: on_cancel())
-        form.bind("<Return>", lambda _event: on_confirm())
+        form.bind("<Return>", lambda _event: on_save())
 
         form.update_idletasks()
         self._center_window(form)
+        name_entry.focus_set()
         form.wait_window()
+        return result["data"]
 
-    def refresh_tables(self):
-        try:
-            self.tables_list.delete(0, tk.END)
-            for table in db_manager.get_tables():
-                self.tables_list.insert(tk.END, table)
-        except Exception as exc:
-            self._show_error("Erro ao listar tabelas", str(exc))
-
-    def on_table_select(self, event):
-        selection = self.tables_list.curselection()
-        if not selection:
-            return
-        table = self.tables_list.get(selection[0])
-        self.current_table = table
-        self.load_table()
-
-    def load_table(self):
-        try:
-            cols, rows = db_manager.select_all(self.current_table)
-            self.columns = cols
-            self.tree.delete(*self.tree.get_children())
-            self.tree["columns"] = cols
-            self.tree["show"] = "headings"
-            for col in cols:
-                self.tree.heading(col, text=col, anchor="center")
-                self.tree.column(col, anchor="center", width=120, minwidth=80)
-            for row in rows:
-                self.tree.insert("", "end", values=row)
-        except Exception as exc:
-            self._show_error("Erro ao carregar tabela", str(exc))
-    # ========================================================
-    # CRUD
-    # ========================================================
-
-    def insert_row(self):
-        if not self.current_table:
-            self._show_warning("Aviso", "Selecione uma tabela para inserir.")
-            return
-        try:
-            data = self.open_form("Inserir registro", self.columns, {})
-            if data is None:
-                return
-            db_manager.insert(self.current_table, data)
-            self.load_table()
-        except Exception as exc:
-            self._show_error("Erro ao inserir", str(exc))
-
-    def edit_row(self):
-        selected = self.tree.focus()
-        if not selected:
-            self._show_warning("Aviso", "Selecione um registro para editar.")
-            return
-        values = list(self.tree.item(selected)["values"])
-        pk_name = self.columns[0]
-        pk_value = values[0]
-        initial = {col: values[i] for i, col in enumerate(self.columns)}
-        try:
-            data = self.open_form("Editar registro", self.columns, initial)
-            if data is None:
-                return
-            db_manager.update(self.current_table, pk_name, pk_value, data)
-            self.load_table()
-        except Exception as exc:
-            self._show_error("Erro ao editar", str(exc))
-
-    def delete_row(self):
-        selected = self.tree.focus()
-        if not selected:
-            self._show_warning("Aviso", "Selecione um registro para excluir.")
-            return
-        values = self.tree.item(selected)["values"]
-        pk_name = self.columns[0]
-        pk_value = values[0]
-        try:
-            db_manager.delete(self.current_table, pk_name, pk_value)
-            self.load_table()
-        except Exception as exc:
-            self._show_error("Erro ao excluir", str(exc))
-
-    def open_form(self, title, columns, initial_values):
+    def open_index_advice_form(self, suggestions):
         colors = theme.COLORS[theme.current]
         form = tk.Toplevel(self.root)
-        form.title(title)
+        form.title("Sugestoes de indices")
         form.transient(self.root)
         form.grab_set()
         form.configure(bg=colors["panel"])
@@ -714,45 +2993,52 @@ class DBBrowser:
 
         header = tk.Label(
             form,
-            text=title,
+            text="Sugestoes de indices",
             bg=colors["panel"],
             fg=colors["fg"],
             font=("Segoe UI", 12, "bold"),
         )
-        header.pack(anchor="w", padx=18, pady=(14, 8))
+        header.pack(anchor="w", padx=18, pady=(14, 6))
+
+        message = tk.Label(
+            form,
+            text="Consultas da grade que leem a tabela inteira ou ordenam em memoria.\n"
+            "Os indices marcados sao criados em segundo plano.",
+            bg=colors["panel"],
+            fg=colors["muted"],
+            font=("Segoe UI", 9),
+            justify="left",
+        )
+        message.pack(anchor="w", padx=18, pady=(0, 8))
 
         body = tk.Frame(form, bg=colors["panel"])
         body.pack(fill="both", padx=18, pady=(0, 12))
-        body.grid_rowconfigure(1, weight=1)
 
-        entries = {}
-        for row, col in enumerate(columns):
-            label = tk.Label(
+        variables = []
+        for suggestion in suggestions:
+            var = tk.IntVar(value=1)
+            variables.append(var)
+            covering = " (cobertura)" if suggestion["covering"] else ""
+            tk.Checkbutton(
                 body,
-                text=col,
+                text=(
+                    f"{suggestion['table']} ({', '.join(suggestion['columns'])}){covering}"
+                    f" - {suggestion['count']}x"
+                ),
+                variable=var,
                 bg=colors["panel"],
-                fg=colors["muted"],
-                font=("Segoe UI", 9, "bold"),
-            )
-            label.grid(row=row, column=0, sticky="w", pady=6)
-
-            entry = tk.Entry(
+                fg=colors["fg"],
+                selectcolor=colors["panel"],
+                activebackground=colors["panel"],
+                activeforeground=colors["fg"],
+            ).pack(anchor="w")
+            tk.Label(
                 body,
-                bg=colors["input_bg"],
-                fg=colors["input_fg"],
-                insertbackground=colors["input_focus"],
-                relief="flat",
-                highlightthickness=1,
-                highlightbackground=colors["input_border"],
-                highlightcolor=colors["input_focus"],
-                width=42,
-                font=("Segoe UI", 10),
-            )
-            entry.grid(row=row, column=1, sticky="ew", padx=(12, 0), pady=6)
-            entry.insert(0, initial_values.get(col, ""))
-            entries[col] = entry
-
-        body.grid_columnconfigure(1, weight=1)
+                text="   " + " | ".join(suggestion["plan"]),
+                bg=colors["panel"],
+                fg=colors["danger"],
+                font=("Consolas", 9),
+            ).pack(anchor="w", pady=(0, 6))
 
         footer = tk.Frame(form, bg=colors["panel"])
         footer.pack(fill="x", padx=18, pady=(0, 16))
@@ -764,16 +3050,12 @@ class DBBrowser:
             form.destroy()
 
         def on_save():
-            try:
-                payload = {col: entries[col].get() for col in columns}
-                result["data"] = payload
-                form.destroy()
-            except Exception as exc:
-                self._show_error("Erro no formulario", str(exc), parent=form)
+            result["data"] = [item for item, var in zip(suggestions, variables) if var.get()]
+            form.destroy()
 
         cancel_button = RoundedButton(
             footer,
-            text="Cancelar",
+            text="Fechar",
             command=on_cancel,
             radius=12,
         )
@@ -781,7 +3063,7 @@ class DBBrowser:
 
         save_button = RoundedButton(
             footer,
-            text="Salvar",
+            text="Criar selecionados",
             command=on_save,
             radius=12,
         )
@@ -791,7 +3073,6 @@ class DBBrowser:
         self._apply_rounded_button_theme(save_button, colors, secondary=False)
 
         form.bind("<Escape>", lambda _event: on_cancel())
-        form.bind("<Return>", lambda _event: on_save())
 
         form.update_idletasks()
         self._center_window(form)
@@ -1111,6 +3392,15 @@ class DBBrowser:
             darkcolor=colors["input_border"],
             arrowcolor=colors["input_focus"],
         )
+        style.configure(
+            "TEntry",
+            fieldbackground=colors["input_bg"],
+            foreground=colors["input_fg"],
+            bordercolor=colors["input_border"],
+            lightcolor=colors["input_border"],
+            darkcolor=colors["input_border"],
+            insertcolor=colors["input_focus"],
+        )
         style.map(
             "TCombobox",
             fieldbackground=[("readonly", colors["input_bg"])],
@@ -1120,6 +3410,29 @@ class DBBrowser:
         self.root.option_add("*TCombobox*Listbox.foreground", colors["input_fg"])
         self.root.option_add("*TCombobox*Listbox.selectBackground", colors["select_bg"])
         self.root.option_add("*TCombobox*Listbox.selectForeground", colors["select_fg"])
+        style.configure(
+            "Footer.Horizontal.TProgressbar",
+            background=colors["accent"],
+            troughcolor=colors["card"],
+            bordercolor=colors["border"],
+            lightcolor=colors["accent"],
+            darkcolor=colors["accent"],
+        )
+        style.configure("Card.TLabel", background=colors["card"], foreground=colors["muted"])
+        style.configure("TNotebook", background=colors["bg"], borderwidth=0)
+        style.configure(
+            "TNotebook.Tab",
+            background=colors["panel"],
+            foreground=colors["muted"],
+            padding=(14, 6),
+            borderwidth=0,
+        )
+        style.map(
+            "TNotebook.Tab",
+            background=[("selected", colors["card"])],
+            foreground=[("selected", colors["fg"])],
+        )
+        style.configure("TPanedwindow", background=colors["bg"])
         style.configure(
             "Vertical.TScrollbar",
             background=colors["panel"],
@@ -1132,18 +3445,43 @@ class DBBrowser:
 
         self.root.configure(bg=colors["bg"])
 
-        self.tables_list.configure(
-            bg=colors["panel"],
-            fg=colors["fg"],
-            selectbackground=colors["select_bg"],
-            selectforeground=colors["select_fg"],
-            highlightthickness=0,
-        )
+        for listbox in (self.tables_list, self.indexes_list):
+            listbox.configure(
+                bg=colors["panel"],
+                fg=colors["fg"],
+                selectbackground=colors["select_bg"],
+                selectforeground=colors["select_fg"],
+                highlightthickness=0,
+            )
+        self._style_schema_rows()
+
+        self._apply_console_theme(colors)
+
+        self.tree.tag_configure("pending", foreground=colors["accent"])
+        self.tree.tag_configure("pending_delete", foreground=colors["muted"])
 
         for button in self.rounded_buttons:
             self._apply_rounded_button_theme(button, colors, secondary=False)
         self._apply_menu_theme()
 
+    def _apply_console_theme(self, colors):
+        if self.sql_console is None:
+            return
+        self.sql_editor.configure(
+            bg=colors["input_bg"],
+            fg=colors["input_fg"],
+            insertbackground=colors["input_focus"],
+            selectbackground=colors["select_bg"],
+            selectforeground=colors["select_fg"],
+            highlightthickness=1,
+            highlightbackground=colors["input_border"],
+            highlightcolor=colors["input_focus"],
+            font=("Consolas", 11),
+        )
+        self.plan_tree.tag_configure("scan", foreground=colors["danger"])
+        self.plan_tree.tag_configure("temp", foreground=colors["accent"])
+        self.plan_tree.tag_configure("search", foreground=colors["success"])
+
     def _apply_rounded_button_theme(self, button, colors, secondary=False):
         if secondary:
             palette = {
@@ -1152,6 +3490,7 @@ class DBBrowser:
                 "press": colors["button_pressed"],
                 "border": colors["border"],
                 "fg": colors["fg"],
+                "disabled_fg": colors["muted"],
                 "surface": colors["panel"],
             }
         else:
@@ -1161,10 +3500,109 @@ class DBBrowser:
                 "press": colors["button_pressed"],
                 "border": colors["button_border"],
                 "fg": colors["button_fg"],
+                "disabled_fg": colors["muted"],
                 "surface": colors["panel"],
             }
         button.set_colors(palette)
 
+    def _open_progress_dialog(self, title, fn, *args, on_finished=None, error_title="Erro", **kwargs):
+        # Runs a progress-yielding job on the worker while a small dialog shows
+        # rows/s (or bytes/s) and, when the job reports bytes, a determinate
+        # progress bar.
+        colors = theme.COLORS[theme.current]
+        form = tk.Toplevel(self.root)
+        form.title(title)
+        form.transient(self.root)
+        form.configure(bg=colors["panel"])
+        form.resizable(False, False)
+
+        header = tk.Label(
+            form,
+            text=title,
+            bg=colors["panel"],
+            fg=colors["fg"],
+            font=("Segoe UI", 12, "bold"),
+        )
+        header.pack(anchor="w", padx=18, pady=(14, 8))
+
+        bar = ttk.Progressbar(
+            form,
+            mode="determinate",
+            maximum=1000,
+            length=360,
+            style="Footer.Horizontal.TProgressbar",
+        )
+        bar.pack(fill="x", padx=18, pady=(0, 8))
+
+        message = tk.Label(
+            form,
+            text="",
+            bg=colors["panel"],
+            fg=colors["muted"],
+            font=("Segoe UI", 9),
+            justify="left",
+        )
+        message.pack(anchor="w", padx=18, pady=(0, 12))
+
+        footer = tk.Frame(form, bg=colors["panel"])
+        footer.pack(fill="x", padx=18, pady=(0, 16))
+
+        def on_chunk(progress):
+            total = progress.get("total_bytes")
+            if total:
+                bar.configure(value=1000 * progress.get("bytes", 0) / total)
+            elif str(bar.cget("mode")) != "indeterminate":
+                bar.configure(mode="indeterminate")
+                bar.start(12)
+            if "rows" in progress:
+                text = f"{progress['rows']} linhas | {progress['rate']:.0f} linhas/s | {progress['seconds']:.1f} s"
+            else:
+                text = (
+                    f"{_format_bytes(progress['bytes'])} de {_format_bytes(progress['total_bytes'])} | "
+                    f"{_format_bytes(progress['rate'])}/s | {progress['seconds']:.1f} s"
+                )
+            message.config(text=text)
+
+        def on_done(result):
+            if form.winfo_exists():
+                form.destroy()
+            if on_finished:
+                on_finished(result)
+
+        def on_error(exc):
+            if form.winfo_exists():
+                form.destroy()
+            self._show_error(error_title, str(exc))
+
+        with tracer.action(fn.__name__):
+            job = self.tasks.submit(
+                fn,
+                *args,
+                on_chunk=on_chunk,
+                on_done=on_done,
+                on_error=on_error,
+                **kwargs,
+            )
+
+        def on_cancel():
+            self.tasks.cancel(job)
+            form.destroy()
+
+        cancel_button = RoundedButton(
+            footer,
+            text="Cancelar",
+            command=on_cancel,
+            radius=12,
+        )
+        cancel_button.pack(side="right")
+        self._apply_rounded_button_theme(cancel_button, colors, secondary=True)
+
+        form.protocol("WM_DELETE_WINDOW", on_cancel)
+        form.bind("<Escape>", lambda _event: on_cancel())
+        form.update_idletasks()
+        self._center_window(form)
+        return job
+
     def _center_window(self, window):
         window.update_idletasks()
         width = window.winfo_width()
@@ -1334,7 +3772,11 @@ class DBBrowser:
         return dirs
 
     def _find_icon_file(self, name, exts):
-        for icons_dir in self._icons_dirs():
+        # The candidate directories are probed once; later icons only look
+        # in the ones that exist.
+        if self._icon_dirs is None:
+            self._icon_dirs = [path for path in self._icons_dirs() if os.path.isdir(path)]
+        for icons_dir in self._icon_dirs:
             for ext in exts:
                 path = os.path.abspath(os.path.join(icons_dir, f"{name}.{ext}"))
                 if os.path.exists(path):
@@ -1384,9 +3826,24 @@ class DBBrowser:
         self.options_menu = tk.Menu(self.root, tearoff=0)
         self.theme_menu = tk.Menu(self.options_menu, tearoff=0)
         self.language_menu = tk.Menu(self.options_menu, tearoff=0)
+        self.profile_menu = tk.Menu(self.options_menu, tearoff=0)
 
         self.file_menu.add_command(label=self._t("menu_create_db"), command=self.create_sqlite)
         self.file_menu.add_command(label=self._t("menu_open_db"), command=self.open_sqlite)
+        self.file_menu.add_command(
+            label=self._t("menu_open_db_ro"), command=lambda: self.open_sqlite(mode="read_only")
+        )
+        self.file_menu.add_command(
+            label=self._t("menu_open_db_immutable"), command=lambda: self.open_sqlite(mode="immutable")
+        )
+        self.file_menu.add_command(label=self._t("menu_attach_db"), command=self.attach_database)
+        self.file_menu.add_command(label=self._t("menu_detach_db"), command=self.detach_database)
+        self.file_menu.add_command(label=self._t("menu_copy_table"), command=self.copy_table)
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label=self._t("menu_import_csv"), command=self.import_csv)
+        self.file_menu.add_command(label=self._t("menu_export"), command=self.export_data)
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label=self._t("menu_export_timings"), command=self.export_timings)
 
         self.theme_menu.add_radiobutton(
             label=self._t("theme_dark"),
@@ -1420,11 +3877,28 @@ class DBBrowser:
             command=self._on_language_selected,
         )
 
+        for profile in PROFILES:
+            self.profile_menu.add_radiobutton(
+                label=self._t(f"profile_{profile}"),
+                variable=self.profile_var,
+                value=profile,
+                command=self._on_profile_selected,
+            )
+        self.profile_menu.add_separator()
+        self.profile_menu.add_command(label=self._t("menu_show_pragmas"), command=self.show_pragmas)
+
         self.options_menu.add_cascade(label=self._t("menu_theme"), menu=self.theme_menu)
         self.options_menu.add_cascade(label=self._t("menu_language"), menu=self.language_menu)
+        self.options_menu.add_cascade(label=self._t("menu_profile"), menu=self.profile_menu)
+        self.options_menu.add_checkbutton(
+            label=self._t("menu_live_refresh"),
+            variable=self.live_refresh_var,
+            command=self._on_live_refresh_toggled,
+        )
         self.file_menu_button.config(text=self._t("menu_file"), menu=self.file_menu)
         self.options_menu_button.config(text=self._t("menu_options"), menu=self.options_menu)
         self._apply_menu_theme()
+        self._update_write_actions()
 
     def _apply_ui_texts(self):
         self.root.title(self._t("app_title"))
@@ -1437,12 +3911,29 @@ class DBBrowser:
         self.insert_button.set_text(self._t("btn_insert"))
         self.edit_button.set_text(self._t("btn_edit"))
         self.delete_button.set_text(self._t("btn_delete"))
-
-        if not db_manager.current:
-            self.db_label.config(text=self._t("db_none_open"))
+        self.value_button.set_text(self._t("btn_value"))
+        self.notebook.tab(self.table_tab, text=self._t("tab_table"))
+        self.notebook.tab(self.console_tab, text=self._t("tab_sql"))
+        self._apply_console_texts()
+        self._update_pending_indicator()
+        self._update_filter_bar()
+
+        self._update_db_label()
         self.sidebar_label.config(text=self._t("sidebar_tables"))
+        self.indexes_label.config(text=self._t("sidebar_indexes"))
+        self.index_add_button.set_text(self._t("btn_index_add"))
+        self.index_drop_button.set_text(self._t("btn_index_drop"))
+        self.index_advice_button.set_text(self._t("btn_index_advice"))
         self.credit_label.config(text=self._t("footer_credit"))
 
+    def _apply_console_texts(self):
+        if self.sql_console is None:
+            return
+        self.run_sql_button.set_text(self._t("btn_run"))
+        self.plan_sql_button.set_text(self._t("btn_plan"))
+        self.stop_sql_button.set_text(self._t("btn_stop"))
+        self.plan_label.config(text=self._t("plan_label"))
+
     def _on_theme_selected(self, _event=None):
         selected_theme = self.theme_var.get()
         if selected_theme not in theme.COLORS:
@@ -1451,6 +3942,11 @@ class DBBrowser:
         self._save_theme_preference()
         self.apply_theme()
 
+    def _on_live_refresh_toggled(self):
+        self.watcher.enabled = bool(self.live_refresh_var.get())
+        self.watcher.reset()
+        self.settings.set("live_refresh", self.watcher.enabled)
+
     def _on_language_selected(self):
         selected_language = self.language_var.get()
         if selected_language not in self.SUPPORTED_LANGUAGES:
@@ -1486,6 +3982,59 @@ class DBBrowser:
             self._egg_overlay.destroy()
         self._egg_overlay = None
 
+    def _on_busy_changed(self, busy):
+        if busy:
+            if not self.progress.winfo_manager():
+                self.progress.pack(side="left", padx=(12, 0), pady=(0, 8), before=self.status_label)
+                self.progress.start(12)
+            self.status_label.config(text=self._t("status_loading"))
+        else:
+            self.progress.stop()
+            self.progress.pack_forget()
+            if self.status_label.cget("text") == self._t("status_loading"):
+                self.status_label.config(text="")
+
+    def _show_job_status(self, job):
+        first = job.time_to_first_row()
+        self.status_label.config(
+            text=self._t("status_rows").format(
+                rows=job.rows,
+                first="-" if first is None else f"{first * 1000:.0f}",
+                total=f"{job.elapsed() * 1000:.0f}",
+            )
+        )
+
+    def _on_span_finished(self, span):
+        # Worker-side "db" spans also end up here; only UI actions are shown.
+        if span.kind != "action" or not hasattr(self, "timing_label"):
+            return
+        phases = " | ".join(
+            f"{self._t(f'timing_{phase}')} {seconds * 1000:.0f} ms" for phase, seconds in span.phases.items()
+        )
+        self.timing_label.config(
+            text=self._t("timing_last").format(
+                name=span.name,
+                total=f"{span.wall * 1000:.0f}",
+                phases=phases,
+                rows=span.rows,
+            )
+        )
+
+    def export_timings(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile="datamanager-timings.json",
+        )
+        if not path:
+            return
+        try:
+            count = tracer.export(path)
+        except OSError as exc:
+            self._show_error("Erro ao exportar tempos", str(exc))
+            return
+        self.status_label.config(text=f"{count} medicoes exportadas para {os.path.basename(path)}")
+
     def _show_error(self, title, message, parent=None):
         messagebox.showerror(title, message, parent=parent or self.root)
 
@@ -1496,7 +4045,8 @@ class DBBrowser:
         messagebox.showinfo(title, message, parent=parent or self.root)
 
     def _apply_menu_theme(self):
-        if not hasattr(self, "file_menu"):
+        # Menus are built after the first paint; _create_menu themes them then.
+        if self.file_menu is None:
             return
         colors = theme.COLORS[theme.current]
         common = {
@@ -1509,3 +4059,4 @@ class DBBrowser:
         self.options_menu.config(**common)
         self.theme_menu.config(**common)
         self.language_menu.config(**common)
+        self.profile_menu.config(**common)
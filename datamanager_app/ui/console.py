@@ -0,0 +1,110 @@
+﻿from datamanager_app.db.manager import db_manager
+
+
+class SqlConsole:
+    # Result rows kept in the console grid; larger results are still read to
+    # the end so the row count and rate are exact.
+    MAX_ROWS = 10000
+
+    def __init__(self, editor, results, plan, runner, on_status=None, on_error=None, on_finished=None):
+        self.editor = editor
+        self.results = results
+        self.plan = plan
+        self.runner = runner
+        self.on_status = on_status
+        self.on_error = on_error
+        self.on_finished = on_finished
+        self.columns = []
+        self._job = None
+
+    @property
+    def running(self):
+        return self._job is not None
+
+    def statement(self):
+        sql = self.editor.get("sel.first", "sel.last") if self.editor.tag_ranges("sel") else ""
+        return (sql or self.editor.get("1.0", "end")).strip()
+
+    def execute(self):
+        sql = self.statement()
+        if not sql:
+            return
+        self.cancel()
+        self.clear_results()
+        self.explain(sql)
+        state = {"columns": None}
+
+        def on_chunk(payload):
+            columns, rows = payload
+            if state["columns"] is None:
+                state["columns"] = columns
+                self._setup_columns(columns)
+            for row in rows:
+                self.results.insert("", "end", values=row)
+            self._report(job, None)
+
+        def on_done(result):
+            self._job = None
+            if state["columns"] is None:
+                self._setup_columns([])
+            self._report(job, result)
+            if self.on_finished:
+                self.on_finished(sql, result)
+
+        job = self._job = self.runner.submit(
+            db_manager.iter_query,
+            sql,
+            max_rows=self.MAX_ROWS,
+            on_chunk=on_chunk,
+            on_done=on_done,
+            on_error=self._on_job_error,
+        )
+
+    def explain(self, sql=None):
+        sql = sql or self.statement()
+        if not sql:
+            return
+        self.plan.delete(*self.plan.get_children())
+        if sql.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        def on_done(steps):
+            self.plan.delete(*self.plan.get_children())
+            for step in steps:
+                parent = str(step["parent"]) if self.plan.exists(str(step["parent"])) else ""
+                self.plan.insert(
+                    parent,
+                    "end",
+                    iid=str(step["id"]),
+                    text=step["detail"],
+                    open=True,
+                    tags=(step["kind"],),
+                )
+
+        # Statements that cannot be planned (PRAGMA, DDL) simply show no plan.
+        self.runner.submit(db_manager.explain_query_plan, sql, on_done=on_done)
+
+    def cancel(self):
+        if self._job is not None:
+            self.runner.cancel(self._job)
+            self._job = None
+
+    def clear_results(self):
+        self.results.delete(*self.results.get_children())
+
+    def _setup_columns(self, columns):
+        self.columns = columns
+        self.results["columns"] = columns
+        self.results["show"] = "headings"
+        for col in columns:
+            self.results.heading(col, text=col, anchor="center")
+            self.results.column(col, anchor="center", width=120, minwidth=60, stretch=False)
+
+    def _report(self, job, result):
+        if self.on_status:
+            self.on_status(job, result)
+
+    def _on_job_error(self, exc):
+        self._job = None
+        if self.on_error:
+            self.on_error(exc)
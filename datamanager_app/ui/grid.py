@@ -0,0 +1,401 @@
+﻿import json
+
+from datamanager_app.db.manager import db_manager
+from datamanager_app.db.timing import tracer
+from datamanager_app.db.values import Preview
+
+
+class TableGrid:
+    MAX_PAGES = 3
+    PREFETCH_THRESHOLD = 0.15
+
+    def __init__(self, tree, scrollbar, runner, page_size=None, on_status=None, on_error=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.runner = runner
+        self.page_size = page_size or db_manager.PAGE_SIZE
+        self.on_status = on_status
+        self.on_error = on_error
+        self.table = None
+        self.key = None
+        self.columns = []
+        self.column_info = {}
+        self.sort = None
+        self.filters = []
+        self.search = None
+        self.keys = {}
+        self.positions = {}
+        # {iid: {column: Preview}} for cells that only hold the head of a value.
+        self.previews = {}
+        self.has_more_before = False
+        self.has_more_after = False
+        self._job = None
+        self.tree.configure(yscrollcommand=self._on_yscroll)
+        self.scrollbar.configure(command=self.tree.yview)
+
+    @property
+    def loading(self):
+        return self._job is not None
+
+    def load(self, table, on_loaded=None):
+        self._cancel()
+        if table != self.table:
+            self.sort = None
+            self.filters = []
+            self.search = None
+        self.table = table
+        self.key = None
+        state = {"columns": None}
+
+        def on_chunk(payload):
+            key, column_info, columns, positions, rows = payload
+            if state["columns"] is None:
+                state["columns"] = columns
+                self.key = key
+                self.column_info = column_info
+                self._setup_columns(columns)
+            self._append(positions, rows)
+
+        def on_done(_result):
+            self._job = None
+            if state["columns"] is None:
+                self.clear()
+            self.has_more_before = False
+            self.has_more_after = len(self.keys) >= self.page_size
+            self._report(job)
+            if on_loaded:
+                on_loaded()
+
+        job = self._job = self.runner.submit(
+            _load_first_page,
+            table,
+            self.page_size,
+            self.sort,
+            self.filters,
+            self.search,
+            on_chunk=on_chunk,
+            on_done=on_done,
+            on_error=self._on_job_error,
+        )
+
+    def reload(self):
+        if self.table:
+            self.load(self.table)
+
+    def toggle_sort(self, column):
+        # Cycles ascending -> descending -> natural order; sorting runs in SQL.
+        if self.sort and self.sort[0] == column:
+            self.sort = (column, True) if not self.sort[1] else None
+        else:
+            self.sort = (column, False)
+        self.search = None
+        self.reload()
+
+    def set_filters(self, filters):
+        self.filters = list(filters)
+        self.reload()
+
+    def set_search(self, query):
+        # Search results are ordered by FTS rank, so a column sort does not apply.
+        self.search = query or None
+        self.sort = None
+        self.reload()
+
+    @property
+    def narrowed(self):
+        return bool(self.sort or self.filters or self.search)
+
+    def refresh(self, on_refreshed=None):
+        # Re-reads the rows of the loaded window in place, keeping the scroll position.
+        children = self.tree.get_children()
+        if not self.table or self.key is None or not children:
+            self.reload()
+            return
+        self._cancel()
+        limit = max(len(children), self.page_size)
+        received = []
+
+        def on_chunk(payload):
+            _columns, positions, rows = payload
+            received.append((positions, rows))
+
+        def on_done(_result):
+            self._job = None
+            anchor = self.tree.identify_row(1)
+            focused = self.tree.focus()
+            has_more_before = self.has_more_before
+            self.clear()
+            count = 0
+            for positions, rows in received:
+                count += len(rows)
+                self._append(positions, rows)
+            self.has_more_before = has_more_before
+            self.has_more_after = count >= limit
+            if focused and self.tree.exists(focused):
+                self.tree.focus(focused)
+                self.tree.selection_set(focused)
+            if anchor:
+                self._restore_view(anchor)
+            self._report(job)
+            if on_refreshed:
+                on_refreshed()
+
+        fn, args, kwargs = self._page_source(
+            after=self.positions[children[0]],
+            inclusive=True,
+            limit=limit,
+        )
+        job = self._job = self.runner.submit(
+            fn,
+            *args,
+            on_chunk=on_chunk,
+            on_done=on_done,
+            on_error=self._on_job_error,
+            **kwargs,
+        )
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self.keys = {}
+        self.positions = {}
+        self.previews = {}
+        self.has_more_before = False
+        self.has_more_after = False
+
+    def reset(self):
+        self._cancel()
+        self.clear()
+        self.table = None
+        self.key = None
+        self.columns = []
+        self.column_info = {}
+        self.sort = None
+        self.filters = []
+        self.search = None
+
+    def key_for(self, item):
+        return self.keys.get(item)
+
+    def preview_for(self, item, column):
+        return self.previews.get(item, {}).get(column)
+
+    def _note_previews(self, iid, values):
+        found = {col: value for col, value in zip(self.columns, values) if isinstance(value, Preview)}
+        if found:
+            self.previews[iid] = found
+        else:
+            self.previews.pop(iid, None)
+
+    def insert_row(self, key, values):
+        # Rows past the loaded window are picked up when the user scrolls there.
+        if self.narrowed:
+            # Where the row lands depends on SQL ordering/filtering; re-read the window.
+            self.refresh()
+            return None
+        children = self.tree.get_children()
+        index = self._position_for(key, children)
+        if index is None:
+            return None
+        iid = self._iid(key)
+        if self.tree.exists(iid):
+            return self.replace_row(iid, key, values)
+        self.keys[iid] = key
+        self.positions[iid] = key
+        self._note_previews(iid, values)
+        self.tree.insert("", index, iid=iid, values=values)
+        return iid
+
+    def replace_row(self, iid, key, values):
+        if self.narrowed:
+            self.refresh()
+            return iid
+        new_iid = self._iid(key)
+        if new_iid == iid:
+            self.keys[iid] = key
+            self.positions[iid] = key
+            self._note_previews(iid, values)
+            self.tree.item(iid, values=values)
+            return iid
+        focused = self.tree.focus() == iid
+        self.remove_row(iid)
+        new_iid = self.insert_row(key, values)
+        if focused and new_iid:
+            self.tree.focus(new_iid)
+            self.tree.selection_set(new_iid)
+        return new_iid
+
+    def remove_row(self, iid):
+        self.keys.pop(iid, None)
+        self.positions.pop(iid, None)
+        self.previews.pop(iid, None)
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+
+    def _position_for(self, key, children):
+        if not children:
+            return "end"
+        try:
+            if key > self.keys[children[-1]]:
+                return None if self.has_more_after else "end"
+            if key < self.keys[children[0]]:
+                return None if self.has_more_before else 0
+            for index in range(len(children) - 1, -1, -1):
+                if self.keys[children[index]] < key:
+                    return index + 1
+            return 0
+        except TypeError:
+            # Mixed key types cannot be ordered in Python; leave them at the end.
+            return "end"
+
+    def _iid(self, key):
+        if len(key) == 1:
+            return str(key[0])
+        return json.dumps(list(key), default=str)
+
+    def _remember(self, position):
+        # Sorted and search pages seek on (sort value or rank, *key).
+        key = tuple(position[1:]) if self.sort or self.search else tuple(position)
+        iid = self._iid(key)
+        self.keys[iid] = key
+        self.positions[iid] = position
+        return iid
+
+    def _append(self, positions, rows):
+        for position, row in zip(positions, rows):
+            iid = self._remember(position)
+            self._note_previews(iid, row)
+            self.tree.insert("", "end", iid=iid, values=row)
+
+    def _prepend(self, positions, rows):
+        for position, row in reversed(list(zip(positions, rows))):
+            iid = self._remember(position)
+            self._note_previews(iid, row)
+            self.tree.insert("", 0, iid=iid, values=row)
+
+    def _trim(self, from_start):
+        children = self.tree.get_children()
+        excess = len(children) - (self.MAX_PAGES * self.page_size)
+        if excess <= 0:
+            return
+        doomed = children[:excess] if from_start else children[-excess:]
+        for iid in doomed:
+            self.keys.pop(iid, None)
+            self.positions.pop(iid, None)
+            self.previews.pop(iid, None)
+        self.tree.delete(*doomed)
+        if from_start:
+            self.has_more_before = True
+        else:
+            self.has_more_after = True
+
+    def _setup_columns(self, columns):
+        self.columns = columns
+        self.clear()
+        self.tree["columns"] = columns
+        self.tree["show"] = "headings"
+        for col in columns:
+            text = col
+            if self.sort and self.sort[0] == col:
+                text = f"{col} {'▼' if self.sort[1] else '▲'}"
+            self.tree.heading(
+                col,
+                text=text,
+                anchor="center",
+                command=lambda name=col: self.toggle_sort(name),
+            )
+            self.tree.column(col, anchor="center", width=120, minwidth=80)
+
+    def _cancel(self):
+        if self._job is not None:
+            self.runner.cancel(self._job)
+            self._job = None
+
+    def _report(self, job):
+        if self.on_status:
+            self.on_status(job)
+
+    def _on_job_error(self, exc):
+        self._job = None
+        if self.on_error:
+            self.on_error(exc)
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._job is not None or not self.table or not self.keys:
+            return
+        if float(last) >= 1.0 - self.PREFETCH_THRESHOLD and self.has_more_after:
+            self._fetch(forward=True)
+        elif float(first) <= self.PREFETCH_THRESHOLD and self.has_more_before:
+            self._fetch(forward=False)
+
+    def _fetch(self, forward):
+        children = self.tree.get_children()
+        if not children:
+            return
+        if forward:
+            bound = {"after": self.positions[children[-1]]}
+        else:
+            bound = {"before": self.positions[children[0]]}
+        received = []
+
+        def on_chunk(payload):
+            _columns, positions, rows = payload
+            received.append((positions, rows))
+
+        def on_done(_result):
+            self._job = None
+            anchor = self.tree.identify_row(1) or self.tree.get_children()[0]
+            count = 0
+            for positions, rows in received:
+                count += len(rows)
+                if forward:
+                    self._append(positions, rows)
+                else:
+                    self._prepend(positions, rows)
+            if forward:
+                self.has_more_after = count >= self.page_size
+            else:
+                self.has_more_before = count >= self.page_size
+            self._trim(from_start=forward)
+            self._restore_view(anchor)
+            self._report(job)
+
+        fn, args, kwargs = self._page_source(limit=self.page_size, **bound)
+        with tracer.action("fetch_page", table=self.table, forward=forward):
+            job = self._job = self.runner.submit(
+                fn,
+                *args,
+                on_chunk=on_chunk,
+                on_done=on_done,
+                on_error=self._on_job_error,
+                **kwargs,
+            )
+
+    def _page_source(self, **bound):
+        if self.search:
+            return db_manager.iter_search, (self.table, self.search), dict(filters=self.filters, **bound)
+        return (
+            db_manager.iter_page,
+            (self.table,),
+            dict(key=self.key, sort=self.sort, filters=self.filters, **bound),
+        )
+
+    def _restore_view(self, anchor):
+        # Keep the row the user was looking at in place after the window shifts.
+        children = self.tree.get_children()
+        if not children or not self.tree.exists(anchor):
+            return
+        self.tree.yview_moveto(self.tree.index(anchor) / len(children))
+
+
+def _load_first_page(table, limit, sort=None, filters=None, search=None):
+    # Runs on the worker thread: resolves the seek key and column metadata
+    # (both served by the schema cache) and streams the first page.
+    key = db_manager.get_row_key(table)
+    column_info = {col.name: col for col in db_manager.get_columns(table)}
+    if search:
+        pages = db_manager.iter_search(table, search, limit=limit, filters=filters)
+    else:
+        pages = db_manager.iter_page(table, key=key, limit=limit, sort=sort, filters=filters)
+    for columns, positions, rows in pages:
+        yield key, column_info, columns, positions, rows
@@ -0,0 +1,101 @@
+﻿import queue
+import time
+
+from datamanager_app.db.timing import tracer
+from datamanager_app.db.worker import QueryWorker
+
+
+class TaskRunner:
+    POLL_MS = 30
+    # Time budget per tick spent dispatching worker results on the Tk thread.
+    FRAME_BUDGET = 0.015
+
+    def __init__(self, root, on_busy=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.events = queue.Queue()
+        self.worker = QueryWorker(self.events)
+        self.pending = set()
+        self.root.after(self.POLL_MS, self._pump)
+
+    @property
+    def busy(self):
+        return bool(self.pending)
+
+    def submit(self, fn, *args, on_chunk=None, on_done=None, on_error=None, background=False, **kwargs):
+        # Background jobs (sidebar statistics) neither show the busy
+        # indicator nor count toward the action that submitted them.
+        job = self.worker.submit(
+            fn,
+            *args,
+            on_chunk=on_chunk,
+            on_done=on_done,
+            on_error=on_error,
+            detached=background,
+            **kwargs,
+        )
+        if background:
+            return job
+        self.pending.add(job)
+        if job.span is not None:
+            job.span.pending += 1
+        self._notify()
+        return job
+
+    def cancel(self, job):
+        if job is None:
+            return
+        job.cancel()
+
+    def _dispatch(self, job, callback, payload):
+        # Callbacks update Tk widgets; that time is the action's render phase.
+        # Jobs they submit are attached to the same action.
+        started = time.perf_counter()
+        try:
+            with tracer.activate(job.span):
+                callback(payload)
+        finally:
+            if job.span is not None:
+                tracer.add_to(job.span, "render", time.perf_counter() - started)
+
+    def _settle(self, job, error):
+        span = job.span
+        if span is None:
+            return
+        span.pending -= 1
+        span.rows += job.rows
+        if error is not None:
+            span.error = str(error)
+        if span.pending <= 0:
+            tracer.finish(span)
+
+    def _notify(self):
+        if self.on_busy:
+            self.on_busy(self.busy)
+
+    def _pump(self):
+        self.root.after(self.POLL_MS, self._pump)
+        deadline = time.perf_counter() + self.FRAME_BUDGET
+        changed = False
+        while time.perf_counter() < deadline:
+            try:
+                job, kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "chunk":
+                if job.on_chunk and not job.cancelled:
+                    self._dispatch(job, job.on_chunk, payload)
+                continue
+            self.pending.discard(job)
+            changed = True
+            try:
+                if job.cancelled:
+                    continue
+                if kind == "done" and job.on_done:
+                    self._dispatch(job, job.on_done, payload)
+                elif kind == "error" and job.on_error:
+                    self._dispatch(job, job.on_error, payload)
+            finally:
+                self._settle(job, payload if kind == "error" else None)
+        if changed:
+            self._notify()
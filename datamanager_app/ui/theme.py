@@ -26,6 +26,8 @@
                 "tree_fg": "#e8f0ff",
                 "select_bg": "#1d3b5a",
                 "select_fg": "#4cc2ff",
+                "danger": "#ff6b6b",
+                "success": "#5fd68a",
             },
             "for_divas": {
                 "bg": "#ffe8f3",
@@ -51,6 +53,8 @@
                 "tree_fg": "#6f1d4f",
                 "select_bg": "#ff9dce",
                 "select_fg": "#fff7fc",
+                "danger": "#d7263d",
+                "success": "#2e9e6a",
             },
         }
 
@@ -0,0 +1,65 @@
+from datamanager_app.db.changes import file_signature
+from datamanager_app.db.manager import db_manager
+
+
+class LiveRefresh:
+    # Notices commits made by other processes to the open database. Every
+    # POLL_MS the files are stat()ed on the Tk thread; only when that moved
+    # (or every FULL_CHECK polls, in case a write kept size and mtime) a
+    # background job reads PRAGMA data_version, which our own writes leave
+    # alone. `on_change` runs when it differs from the last reading.
+    POLL_MS = 1000
+    FULL_CHECK = 5
+
+    def __init__(self, root, runner, on_change):
+        self.root = root
+        self.runner = runner
+        self.on_change = on_change
+        self.enabled = True
+        self._signature = None
+        self._version = None
+        self._job = None
+        self._ticks = 0
+        self.root.after(self.POLL_MS, self._tick)
+
+    def reset(self):
+        # A different database (or connection) was opened: start over.
+        self.runner.cancel(self._job)
+        self._job = None
+        self._signature = None
+        self._version = None
+        self._ticks = 0
+
+    def _tick(self):
+        self.root.after(self.POLL_MS, self._tick)
+        conn = db_manager.current
+        # Immutable files are promised not to change; SQLite does not check.
+        if not self.enabled or self._job is not None or conn is None or conn.immutable:
+            return
+        self._ticks += 1
+        signature = file_signature(db_manager.watched_files())
+        if signature == self._signature and self._ticks < self.FULL_CHECK:
+            return
+        self._signature = signature
+        self._ticks = 0
+        self._job = self.runner.submit(
+            db_manager.get_data_version,
+            on_done=self._on_version,
+            on_error=self._on_error,
+            background=True,
+        )
+
+    def _on_version(self, version):
+        self._job = None
+        previous, self._version = self._version, version
+        # The first reading, or one from a new connection or after an
+        # ATTACH/DETACH, is the new baseline.
+        if previous is None or previous[0] != version[0] or len(previous[1]) != len(version[1]):
+            return
+        if previous != version:
+            self.on_change()
+
+    def _on_error(self, _exc):
+        # A busy or vanished file is retried on the next poll.
+        self._job = None
+        self._signature = None
@@ -0,0 +1,46 @@
+from datamanager_app.db.advisor import IndexAdvisor
+from datamanager_app.db.manager import DatabaseManager
+
+
+def test_covering_index_copies_small_columns():
+    columns, covering = IndexAdvisor().propose(("t", ("b",), None, None), [("b", "INTEGER"), ("c", "REAL")])
+    assert (columns, covering) == (["b", "c"], True)
+
+
+def test_text_or_blob_columns_fall_back_to_the_seek_index():
+    advisor = IndexAdvisor()
+    for data_type in ("TEXT", "VARCHAR(20)", "BLOB", ""):
+        table_columns = [("a", "TEXT"), ("b", "INTEGER"), ("body", data_type)]
+        columns, covering = advisor.propose(("t", ("a",), None, "b"), table_columns)
+        assert (columns, covering) == (["a", "b"], False)
+
+
+def test_index_on_a_column_that_is_not_a_plain_identifier(tmp_path):
+    manager = DatabaseManager()
+    manager.create_sqlite(str(tmp_path / "advisor.db"))
+    manager.create_table("people", ["id INTEGER PRIMARY KEY", '"e-mail" TEXT', '"first name" TEXT'])
+    for number in range(50):
+        manager.insert("people", {"e-mail": f"p{number}@x", "first name": f"n{number}"})
+    assert manager.create_index("people", ["first name"]) == "ix_people_first_name"
+    list(manager.iter_page("people", filters=[("e-mail", "=", "p1@x")]))
+    suggestions = manager.advise_indexes()
+    assert [item["name"] for item in suggestions] == ["ix_people_e_mail"]
+    manager.create_index("people", suggestions[0]["columns"], name=suggestions[0]["name"])
+    assert manager.advise_indexes() == []
+    manager.drop_index("ix_people_e_mail")
+    assert [index.name for index in manager.get_indexes("people")] == ["ix_people_first_name"]
+
+
+def test_scans_of_attached_tables_get_suggestions(tmp_path):
+    other = DatabaseManager()
+    other.create_sqlite(str(tmp_path / "other.db"))
+    other.create_table("events", ["id INTEGER PRIMARY KEY", "kind TEXT"])
+    other.current.database.close()
+    manager = DatabaseManager()
+    manager.create_sqlite(str(tmp_path / "main.db"))
+    alias = manager.attach_database(str(tmp_path / "other.db"), "arq")
+    list(manager.iter_page(f"{alias}.events", filters=[("kind", "=", "x")]))
+    suggestions = manager.advise_indexes()
+    assert [(item["table"], item["columns"]) for item in suggestions] == [("arq.events", ["kind"])]
+    manager.create_index("arq.events", ["kind"], name=suggestions[0]["name"])
+    assert manager.advise_indexes() == []
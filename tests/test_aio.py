@@ -0,0 +1,31 @@
+import asyncio
+
+from datamanager_app.db.aio import AsyncDatabaseManager
+from datamanager_app.db.importer import iter_import_csv
+
+
+def test_streams_that_may_write_run_on_the_writer(tmp_path):
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text("id,name\n1,a\n2,b\n", encoding="utf-8")
+
+    async def main():
+        adb = AsyncDatabaseManager(str(tmp_path / "aio.db"), workers=2)
+        routed = []
+        start = adb._start
+
+        async def spy(fn, args, kwargs, writer=False, **options):
+            routed.append((fn.__name__, writer))
+            return await start(fn, args, kwargs, writer=writer, **options)
+
+        adb._start = spy
+        async with adb:
+            async for _progress in adb.stream(iter_import_csv, adb.manager, str(csv_path), "t", create_table=True):
+                pass
+            async for _chunk in adb.iter_query("DELETE FROM t WHERE id = 1 RETURNING id"):
+                pass
+            pages = [chunk async for chunk in adb.iter_page("t")]
+        return routed, pages
+
+    routed, pages = asyncio.run(main())
+    assert routed[:3] == [("iter_import_csv", True), ("iter_query", True), ("iter_page", False)]
+    assert [row for _columns, _positions, rows in pages for row in rows] == [(2, "b")]
@@ -0,0 +1,22 @@
+from datamanager_app.db.manager import DatabaseManager
+
+
+def _search(manager, table, query):
+    return [row for _columns, _positions, rows in manager.iter_search(table, query) for row in rows]
+
+
+def test_search_index_on_columns_that_are_not_plain_identifiers(tmp_path):
+    manager = DatabaseManager()
+    manager.create_sqlite(str(tmp_path / "fts.db"))
+    manager.create_table("people", ["id INTEGER PRIMARY KEY", '"first name" TEXT', '"e-mail" TEXT'])
+    manager.insert("people", {"first name": "Ana Maria", "e-mail": "ana@x"})
+    manager.create_fts_index("people", ["first name", "e-mail"])
+    assert manager.get_fts_columns("people") == ["first name", "e-mail"]
+    assert _search(manager, "people", "maria") == [(1, "Ana Maria", "ana@x")]
+    # The triggers keep the index in sync.
+    manager.insert("people", {"first name": "Bia", "e-mail": "bia@x"})
+    manager.update("people", "id", 1, {"first name": "Ana"})
+    assert _search(manager, "people", "maria") == []
+    assert _search(manager, "people", "bia") == [(2, "Bia", "bia@x")]
+    manager.drop_fts_index("people")
+    assert manager.get_fts_columns("people") is None
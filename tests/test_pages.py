@@ -0,0 +1,73 @@
+import sqlite3
+
+from datamanager_app.db.manager import DatabaseManager
+
+
+def _rows(manager, table):
+    return [row for _columns, _positions, rows in manager.iter_page(table) for row in rows]
+
+
+def _manager(tmp_path):
+    manager = DatabaseManager()
+    manager.create_sqlite(str(tmp_path / "pages.db"))
+    manager.create_table("a", ["id INTEGER PRIMARY KEY", "name TEXT"])
+    manager.create_table("b", ["id INTEGER PRIMARY KEY", "name TEXT"])
+    return manager
+
+
+def test_revisited_table_is_served_from_the_cache(tmp_path):
+    manager = _manager(tmp_path)
+    manager.insert("a", {"name": "x"})
+    assert _rows(manager, "a") == _rows(manager, "a")
+    hits = manager.page_cache_stats()["hits"]
+    manager.insert("b", {"name": "y"})
+    _rows(manager, "a")
+    assert manager.page_cache_stats()["hits"] == hits + 1
+
+
+def test_own_and_external_writes_invalidate_pages(tmp_path):
+    manager = _manager(tmp_path)
+    assert _rows(manager, "a") == []
+    manager.insert("a", {"name": "x"})
+    assert _rows(manager, "a") == [(1, "x")]
+    other = sqlite3.connect(manager.current.path)
+    other.execute("UPDATE a SET name = 'ext'")
+    other.commit()
+    other.close()
+    assert _rows(manager, "a") == [(1, "ext")]
+
+
+def test_trigger_writes_invalidate_the_other_table(tmp_path):
+    manager = _manager(tmp_path)
+    db = manager.current.database
+    db.execute_sql("CREATE TRIGGER a_audit AFTER INSERT ON a BEGIN INSERT INTO b (name) VALUES (new.name); END")
+    manager.current.changes.touch()
+    assert _rows(manager, "b") == []
+    manager.insert("a", {"name": "x"})
+    assert _rows(manager, "b") == [(1, "x")]
+
+
+def test_cascading_deletes_invalidate_the_child_table(tmp_path):
+    manager = DatabaseManager()
+    manager.create_sqlite(str(tmp_path / "fk.db"))
+    manager.create_table("parent", ["id INTEGER PRIMARY KEY"])
+    manager.create_table("child", ["id INTEGER PRIMARY KEY", "parent_id INTEGER REFERENCES parent(id) ON DELETE CASCADE"])
+    manager.current.database.execute_sql("PRAGMA foreign_keys = ON")
+    manager.insert("parent", {"id": 1})
+    manager.insert("child", {"parent_id": 1})
+    assert len(_rows(manager, "child")) == 1
+    manager.delete("parent", "id", 1)
+    assert _rows(manager, "child") == []
+
+
+def test_dml_with_returning_invalidates_pages_and_counts(tmp_path):
+    manager = _manager(tmp_path)
+    for name in "vwxyz":
+        manager.insert("a", {"name": name})
+    assert len(_rows(manager, "a")) == 5
+    assert manager.count_rows("a") == 5
+    stream = manager.iter_query("DELETE FROM a WHERE id <= 3 RETURNING id")
+    deleted = [row for _columns, rows in stream for row in rows]
+    assert sorted(deleted) == [(1,), (2,), (3,)]
+    assert _rows(manager, "a") == [(4, "y"), (5, "z")]
+    assert manager.count_rows("a") == 2
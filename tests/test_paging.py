@@ -0,0 +1,89 @@
+from datamanager_app.db.manager import DatabaseManager
+from datamanager_app.db.values import PREVIEW_CHARS, Preview
+
+ROWS = 2000
+
+
+def _manager(tmp_path):
+    manager = DatabaseManager()
+    manager.create_sqlite(str(tmp_path / "paging.db"))
+    manager.create_table("docs", ['id INTEGER PRIMARY KEY', '"first name" TEXT'])
+    db = manager.current.database
+    # Values share their first PREVIEW_CHARS characters and differ after them,
+    # so anything that sorts or seeks on the preview gets the order wrong.
+    prefix = "p" * PREVIEW_CHARS
+    with db.atomic():
+        for i in range(ROWS):
+            db.execute_sql('INSERT INTO docs ("first name") VALUES (?)', (f"{prefix}{(i * 7919) % ROWS:05d}",))
+    manager.create_index("docs", ["first name"])
+    return manager
+
+
+def _walk(manager, sort):
+    seen = []
+    after = None
+    while True:
+        positions = []
+        rows = []
+        for _columns, chunk_positions, chunk_rows in manager.iter_page(
+            "docs", after=after, limit=150, sort=sort
+        ):
+            positions.extend(chunk_positions)
+            rows.extend(chunk_rows)
+        if not rows:
+            return seen
+        seen.extend(rows)
+        after = positions[-1]
+
+
+def test_sorted_walk_through_long_text_returns_every_row_in_order(tmp_path):
+    manager = _manager(tmp_path)
+    for descending in (False, True):
+        rows = _walk(manager, ("first name", descending))
+        assert len(rows) == ROWS
+        assert len({row[0] for row in rows}) == ROWS
+        names = manager.current.database.execute_sql(
+            f'SELECT "first name" FROM docs ORDER BY "first name" {"DESC" if descending else "ASC"}, id'
+        ).fetchall()
+        assert [row[1][: PREVIEW_CHARS] for row in rows] == [name[0][:PREVIEW_CHARS] for name in names]
+        assert all(isinstance(row[1], Preview) and row[1].size == PREVIEW_CHARS + 5 for row in rows)
+        ids = [row[0] for row in rows]
+        expected = [
+            row[0]
+            for row in manager.current.database.execute_sql(
+                f'SELECT id FROM docs ORDER BY "first name" {"DESC" if descending else "ASC"}, id'
+            ).fetchall()
+        ]
+        assert ids == expected
+
+
+def test_sorted_page_uses_the_index(tmp_path):
+    manager = _manager(tmp_path)
+    list(manager.iter_page("docs", limit=10, sort=("first name", False)))
+    pattern = manager.current.advisor.patterns()[0][1]
+    plan = manager.current.database.execute_sql(
+        "EXPLAIN QUERY PLAN " + pattern["sql"], pattern["params"]
+    ).fetchall()
+    details = " ".join(row[-1] for row in plan)
+    assert "TEMP B-TREE" not in details
+
+
+def test_quoted_column_name_in_row_reads(tmp_path):
+    manager = _manager(tmp_path)
+    key, row = manager.select_row("docs", ["rowid"], (1,))
+    assert key == (1,)
+    assert isinstance(row[1], Preview)
+    info = manager.get_value_info("docs", "first name", "id", 1)
+    assert info == {"type": "text", "size": PREVIEW_CHARS + 5, "rowid": 1}
+    value = "".join(manager.iter_value("docs", "first name", info["rowid"]))
+    assert len(value) == PREVIEW_CHARS + 5
+    manager.update("docs", "id", 1, {"first name": "short"})
+    assert manager.select_row("docs", ["rowid"], (1,))[1][1] == "short"
+
+
+def test_value_cut_by_a_byte_limit_ends_on_a_whole_character(tmp_path):
+    manager = _manager(tmp_path)
+    manager.update("docs", "id", 1, {"first name": "ação"})
+    # "ação" is 61 c3 a7 c3 a3 6f; a limit of 4 bytes cuts the "ã" in half.
+    assert "".join(manager.iter_value("docs", "first name", 1, limit=4)) == "aç"
+    assert "".join(manager.iter_value("docs", "first name", 1)) == "ação"